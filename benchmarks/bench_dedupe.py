@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark duplicate detection at production scale
+
+Compares the linear checkDuplicate scan from ccom.js against the
+DuplicateIndex exact lookup and near-duplicate search, after checking
+that known near-duplicate pairs are still flagged (exit status 1 if not).
+
+    python benchmarks/bench_dedupe.py --features 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cco.dedupe import DuplicateIndex  # noqa: E402
+from cco.util import normalize_name  # noqa: E402
+from generators import WORDS, synthetic_features  # noqa: E402
+
+
+# (query, existing feature) pairs that find_similar must flag
+KNOWN_DUPLICATES = [
+    ("auth system", "authentication system"),
+    ("config loader", "configuration loader"),
+    ("user login", "user logins"),
+    ("payment api", "payments api"),
+]
+
+
+def missed_duplicates(features):
+    """KNOWN_DUPLICATES pairs that find_similar does not flag among features"""
+    index = DuplicateIndex(features)
+    for _, existing in KNOWN_DUPLICATES:
+        index.add(existing, {"description": existing})
+    return [(query, existing) for query, existing in KNOWN_DUPLICATES
+            if existing not in [name for _, name in index.find_similar(query)]]
+
+
+def linear_check(features, name):
+    """checkDuplicate from ccom.js: compare every name and user term"""
+    normalized = normalize_name(name)
+    for existing, feature in features.items():
+        if normalize_name(existing) == normalized:
+            return existing
+        if feature.get("userTerm") and normalize_name(feature["userTerm"]) == normalized:
+            return existing
+    return False
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(count, queries=200):
+    """Run the benchmark and return results in seconds"""
+    features = synthetic_features(count)
+    rng = random.Random(7)
+    names = list(features)
+    probes = [rng.choice(names).upper() for _ in range(queries // 2)]
+    probes += [" ".join(rng.sample(WORDS, 3)) for _ in range(queries - len(probes))]
+
+    index, build = timed(DuplicateIndex, features)
+    _, linear = timed(lambda: [linear_check(features, p) for p in probes])
+    _, exact = timed(lambda: [index.find_duplicate(p) for p in probes])
+    _, similar = timed(lambda: [index.find_similar(p) for p in probes])
+
+    return {
+        "features": count,
+        "index_build_s": build,
+        "linear_check_ms": linear / len(probes) * 1000,
+        "indexed_check_ms": exact / len(probes) * 1000,
+        "similar_query_ms": similar / len(probes) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CCOM duplicate detection")
+    parser.add_argument("--features", type=int, default=100000, help="Number of synthetic features")
+    parser.add_argument("--queries", type=int, default=200, help="Number of lookups to time")
+    args = parser.parse_args()
+
+    missed = missed_duplicates(synthetic_features(min(args.features, 10000)))
+    if missed:
+        for query, existing in missed:
+            print(f'❌ "{query}" does not flag "{existing}"')
+        sys.exit(1)
+    print(f"✅ All {len(KNOWN_DUPLICATES)} known near-duplicates flagged")
+
+    results = run(args.features, args.queries)
+    print(f"Features:             {results['features']}")
+    print(f"Index build:          {results['index_build_s']:.2f} s")
+    print(f"Linear check:         {results['linear_check_ms']:.3f} ms/lookup")
+    print(f"Indexed exact check:  {results['indexed_check_ms']:.4f} ms/lookup")
+    print(f"Near-duplicate query: {results['similar_query_ms']:.3f} ms/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark cold start of the ccom entry points against a time budget
+
+Hooks run ccom at every session start and prompt, so its startup time
+is paid constantly. Each entry point runs as a fresh interpreter in a
+synthetic project, the way a hook or a shell runs it, and the median
+wall time of --runs runs is compared against --budget. The exit status
+is 1 when any entry point is over budget.
+
+    python benchmarks/bench_startup.py --budget 50
+    python benchmarks/bench_startup.py --importtime "ccom status"
+
+--importtime prints the slowest imports of one entry point
+(python -X importtime), which is where a budget overrun usually comes
+from.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generators import write_memory  # noqa: E402
+
+STARTUP_BUDGET_MS = 50
+
+# What the installed ccom console script runs
+CONSOLE_SCRIPT = ["-c", "import sys; from cco.cli import main; sys.exit(main())"]
+
+# Label -> arguments after the interpreter; run from the project directory
+ENTRY_POINTS = {
+    "ccom --help": CONSOLE_SCRIPT + ["--help"],
+    "ccom status": CONSOLE_SCRIPT + ["status"],
+    "ccom stats": CONSOLE_SCRIPT + ["stats"],
+    "ccom search": CONSOLE_SCRIPT + ["search", "payment"],
+    "ccom/cli.py": [str(ROOT / "ccom" / "cli.py")],
+    "ccom/cli.py --help": [str(ROOT / "ccom" / "cli.py"), "--help"],
+    "ccom/cli.py --dry-run": [str(ROOT / "ccom" / "cli.py"), "deploy", "--dry-run"],
+    "ccom/cli.py --status": [str(ROOT / "ccom" / "cli.py"), "--status"],
+}
+
+
+def environment():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env.pop("CCOM_ENGINE", None)
+    # Installed packages run from bytecode caches; let the warm-up run write them
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def run_once(arguments, project, env):
+    """Wall time of one run in milliseconds"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *arguments], cwd=project, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(arguments)} failed: {result.stderr.decode(errors='replace')}")
+    return elapsed
+
+
+def measure(arguments, project, env, runs):
+    """Median wall time in milliseconds, after one warm-up run for the OS file cache"""
+    run_once(arguments, project, env)
+    return statistics.median(run_once(arguments, project, env) for _ in range(runs))
+
+
+def import_times(arguments, project, env, top=15):
+    """(cumulative ms, module) of the slowest imports of one run"""
+    result = subprocess.run([sys.executable, "-X", "importtime", *arguments], cwd=project, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+    rows = []
+    for line in result.stderr.decode(errors='replace').splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def run(features, runs):
+    """Median startup per entry point: {label: ms}, plus the bare interpreter"""
+    env = environment()
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "startup-app"
+        write_memory(project / ".claude", features)
+        results = {"python (interpreter only)": measure(["-c", "pass"], project, env, runs)}
+        for label, arguments in ENTRY_POINTS.items():
+            results[label] = measure(arguments, project, env, runs)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ccom cold start against a budget")
+    parser.add_argument("--features", type=int, default=200, help="Features in the project memory")
+    parser.add_argument("--runs", type=int, default=15, help="Runs per entry point (median is reported)")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Startup budget in milliseconds (default: {STARTUP_BUDGET_MS})")
+    parser.add_argument("--importtime", metavar="ENTRY", choices=ENTRY_POINTS,
+                        help="Show the slowest imports of one entry point instead")
+    args = parser.parse_args()
+
+    if args.importtime:
+        env = environment()
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp) / "startup-app"
+            write_memory(project / ".claude", args.features)
+            for cumulative, module in import_times(ENTRY_POINTS[args.importtime], project, env):
+                print(f"{cumulative:8.1f} ms  {module}")
+        return
+
+    results = run(args.features, args.runs)
+    over = []
+    print(f"Median cold start over {args.runs} runs, {args.features} features, budget {args.budget:.0f} ms")
+    for label, elapsed in results.items():
+        verdict = ""
+        if label in ENTRY_POINTS:
+            verdict = "ok" if elapsed <= args.budget else "OVER BUDGET"
+            if elapsed > args.budget:
+                over.append(label)
+        print(f"  {label:28} {elapsed:7.1f} ms  {verdict}")
+    if over:
+        print(f"❌ {len(over)} entry points over the {args.budget:.0f} ms budget: {', '.join(over)}")
+        sys.exit(1)
+    print(f"✅ All entry points within {args.budget:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
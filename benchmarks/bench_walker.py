@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Benchmark the repository walker against the rglob scan it replaced
+
+Builds a synthetic project whose node_modules holds most of the files,
+as in a typical JavaScript app, then times the old
+rglob("*.js") + node_modules filter against walk_files.
+
+    python benchmarks/bench_walker.py --packages 400
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cco.walker import walk_files  # noqa: E402
+from generators import build_project  # noqa: E402
+
+
+def rglob_files(root):
+    """The scan_for_security_issues file list before walk_files"""
+    return [path for path in Path(root).rglob("*.js") if "node_modules" not in str(path)]
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run(packages, source_files, repeat=3):
+    """Run the benchmark and return results in milliseconds"""
+    with tempfile.TemporaryDirectory() as root:
+        build_project(root, packages, source_files)
+        total = sum(len(files) for _, _, files in os.walk(root))
+        old, old_time = timed(lambda: rglob_files(root), repeat)
+        new, new_time = timed(lambda: list(walk_files(root)), repeat)
+        js_only, js_time = timed(lambda: list(walk_files(root, (".js",))), repeat)
+    return {
+        "tree_files": total,
+        "rglob_files": len(old),
+        "rglob_ms": old_time * 1000,
+        "walker_files": len(new),
+        "walker_ms": new_time * 1000,
+        "walker_js_files": len(js_only),
+        "walker_js_ms": js_time * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CCOM repository walker")
+    parser.add_argument("--packages", type=int, default=400, help="Packages under node_modules")
+    parser.add_argument("--source-files", type=int, default=500, help="Project source files")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per method (best is reported)")
+    args = parser.parse_args()
+
+    results = run(args.packages, args.source_files, args.repeat)
+    print(f"Files in tree:        {results['tree_files']}")
+    print(f"rglob + filter:       {results['rglob_ms']:.1f} ms ({results['rglob_files']} .js files)")
+    print(f"walk_files (.js):     {results['walker_js_ms']:.1f} ms ({results['walker_js_files']} files)")
+    print(f"walk_files (all):     {results['walker_ms']:.1f} ms ({results['walker_files']} files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Synthetic data for the CCOM benchmarks
+
+synthetic_features and write_memory produce memories of any size with
+realistic names, creation dates spread over a year and a share of
+overlong descriptions, so archive and compact have work to do.
+build_project writes a JavaScript project whose node_modules holds most
+of the files; build_repo sizes one to a target number of .js files.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+WORDS = [
+    "auth", "authentication", "user", "profile", "payment", "checkout", "cart", "search",
+    "notification", "email", "push", "dashboard", "admin", "report", "export", "import",
+    "login", "logout", "session", "token", "cache", "upload", "image", "video", "chat",
+    "billing", "invoice", "subscription", "settings", "theme", "dark", "mode", "api",
+    "webhook", "audit", "log", "metrics", "analytics", "onboarding", "signup", "password",
+    "reset", "order", "inventory", "product", "catalog", "review", "rating", "comment",
+]
+
+SOURCE_EXTENSIONS = [".js", ".ts", ".jsx", ".tsx", ".py", ".css", ".md"]
+
+# Average .js files per generated package (3 directories of 3-12 files)
+FILES_PER_PACKAGE = 22.5
+
+MODULE_TEMPLATE = """'use strict';
+
+const path = require('path');
+
+function handler{index}(request, response) {{
+  const name = request.query.name || 'world';
+  const target = path.join(__dirname, 'views', name);
+  response.send({{ greeting: `hello ${{name}}`, target }});
+}}
+
+module.exports = {{ handler{index} }};
+"""
+
+# Source lines the security scanner reports
+INSECURE_LINES = [
+    "eval(request.body.code);",
+    "element.innerHTML = request.query.html;",
+    "const password = \"hunter2-hunter2\";",
+    "const api_key = \"sk_live_0123456789abcdef\";",
+]
+
+
+def vocabulary(rng, size=2000):
+    """Product-domain words plus random pseudo-words, like a real feature list"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set(WORDS)
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+
+def _iso(date):
+    return date.strftime("%Y-%m-%dT%H:%M:%S.") + "%03dZ" % (date.microsecond // 1000)
+
+
+def synthetic_features(count, seed=42, days=365, long_descriptions=0.1):
+    """Feature dict with count unique multi-word names
+
+    Creation dates are spread over the last days days and a
+    long_descriptions share of features get descriptions longer than
+    compact_memory allows.
+    """
+    rng = random.Random(seed)
+    vocab = vocabulary(rng)
+    now = datetime.now(timezone.utc)
+    features = {}
+    while len(features) < count:
+        words = rng.sample(vocab, rng.randint(2, 4))
+        name = " ".join(words)
+        if rng.random() < long_descriptions:
+            description = " ".join(rng.choice(vocab) for _ in range(30))
+        else:
+            description = f"{words[0]} for {words[-1]}"
+        created = now - timedelta(seconds=rng.randint(0, days * 86400))
+        features[name] = {"created": _iso(created), "description": description,
+                          "files": [f"src/{words[0]}.js"], "userTerm": name}
+    return features
+
+
+def synthetic_memory(count, seed=42, project="bench-app"):
+    """Complete v0.2 memory holding count synthetic features, token counts included"""
+    from cco.tokens import feature_tokens, token_state
+
+    now = _iso(datetime.now(timezone.utc))
+    features = synthetic_features(count, seed)
+    for name, data in features.items():
+        data["tokens"] = feature_tokens(name, data)
+    total = sum(data["tokens"] for data in features.values())
+    return {
+        "project": {"name": project, "created": now.split("T")[0]},
+        "features": features,
+        "metadata": {"version": "0.2", "created": now, "lastCleanup": now,
+                     "tokens": token_state(total, len(features))},
+    }
+
+
+def write_memory(claude_dir, count, backend="json", seed=42):
+    """Create a .claude directory whose memory holds count features"""
+    from cco.store import open_store, switch_backend
+
+    claude_dir = Path(claude_dir)
+    claude_dir.mkdir(parents=True, exist_ok=True)
+    store = open_store(claude_dir, "json")
+    store.snapshot(synthetic_memory(count, seed, claude_dir.parent.name))
+    store.close()
+    if backend != "json":
+        switch_backend(claude_dir, backend)
+    return claude_dir
+
+
+def build_project(root, packages, source_files, seed=42, realistic=False):
+    """Write a project with a large node_modules tree and a small src tree
+
+    realistic fills files with a module body (and src files with an
+    occasional insecure line) instead of a one-line stub, for scanner
+    benchmarks.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    for i in range(packages):
+        package = root / "node_modules" / f"pkg-{i}"
+        for sub in ("lib", "dist", "test"):
+            (package / sub).mkdir(parents=True, exist_ok=True)
+            for j in range(rng.randint(3, 12)):
+                body = MODULE_TEMPLATE.format(index=j) if realistic else "module.exports = {};\n"
+                (package / sub / f"file{j}.js").write_text(body)
+        (package / "package.json").write_text("{}\n")
+    for i in range(source_files):
+        directory = root / "src" / f"module{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        if realistic:
+            extension = ".js"
+            body = MODULE_TEMPLATE.format(index=i)
+            if rng.random() < 0.05:
+                body += rng.choice(INSECURE_LINES) + "\n"
+        else:
+            extension = rng.choice(SOURCE_EXTENSIONS)
+            body = "export {};\n"
+        (directory / f"file{i}{extension}").write_text(body)
+    (root / "build").mkdir(exist_ok=True)
+    (root / "build" / "bundle.js").write_text("var a;\n")
+    (root / ".gitignore").write_text("node_modules/\nbuild/\n")
+
+
+def build_repo(root, js_files, node_modules_share=0.9, seed=42):
+    """Realistic project with about js_files .js files, most of them in node_modules"""
+    packages = int(js_files * node_modules_share / FILES_PER_PACKAGE)
+    source_files = max(1, js_files - int(packages * FILES_PER_PACKAGE))
+    build_project(root, packages, source_files, seed, realistic=True)
+    (Path(root) / "package.json").write_text('{"name": "bench-app", "scripts": {}}\n')
+    return packages, source_files
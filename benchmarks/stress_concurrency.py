@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Stress concurrent writers and readers on one project's memory
+
+Parallel Claude Code sessions write the same .claude directory. This
+starts --writers processes at once, each remembering --features
+features of its own, all racing to remember one shared feature, and
+each saving a whole memory copied halfway through (the orchestrator's
+save path, which has to merge instead of overwriting). On the JSON
+backend, --node-writers processes remember features of their own
+through node .claude/ccom.js at the same time, one node run per
+feature as hooks do (skipped when node is not installed). --readers
+processes keep loading memory meanwhile. Afterwards it checks that:
+
+- every writer's features and saved copy survived, Node writers' included
+- the shared feature exists exactly once
+- metadata.tokens matches the features it counts
+- no reader saw a torn memory (token count out of step with the features)
+  or failed to read
+
+and exits with status 1 when any check fails.
+
+    python benchmarks/stress_concurrency.py
+    python benchmarks/stress_concurrency.py --backend sqlite --writers 64
+"""
+
+import argparse
+import copy
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SHARED_FEATURE = "Shared checkout flow"
+# Pause between a reader's loads, so readers do not starve writers of CPU
+READ_INTERVAL = 0.01
+
+
+def feature_name(writer, number):
+    return f"writer {writer} feature {number}"
+
+
+def snapshot_name(writer):
+    return f"writer {writer} saved copy"
+
+
+def node_feature_name(writer, number):
+    return f"node writer {writer} feature {number}"
+
+
+def writer(claude_dir, index, features, start):
+    sys.stdout = open(os.devnull, "w")
+    from cco.memory import CCOMMemory
+
+    start.wait()
+    engine = CCOMMemory(claude_dir)
+    copied = None
+    for number in range(features):
+        engine.remember_feature(feature_name(index, number),
+                                {"description": f"Written by stress writer {index}"})
+        if number == features // 2:
+            copied = copy.deepcopy(engine.memory)
+    engine.remember_feature(SHARED_FEATURE, {"description": f"Claimed by writer {index}"})
+
+    # A whole memory saved from a stale copy must merge, not overwrite
+    copied["features"][snapshot_name(index)] = {
+        "created": "2026-01-01T00:00:00.000Z", "description": "", "files": [],
+        "userTerm": snapshot_name(index)}
+    if not engine.save_memory(copied):
+        sys.exit(1)
+    engine.store.close()
+
+
+def node_writer(claude_dir, index, features, start):
+    start.wait()
+    script = os.path.join(claude_dir, "ccom.js")
+    for number in range(features):
+        result = subprocess.run(
+            ["node", script, "remember", node_feature_name(index, number),
+             f"Written by Node stress writer {index}"],
+            capture_output=True, text=True)
+        if result.returncode != 0 or "Failed to save memory" in result.stderr:
+            sys.exit(1)
+
+
+def reader(claude_dir, backend, stop, results):
+    from cco.store import open_store
+
+    reads = 0
+    slowest = 0.0
+    errors = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        store = open_store(claude_dir, backend)
+        try:
+            if store.open():
+                memory = store.memory
+                counted = (memory.get("metadata", {}).get("tokens") or {}).get("features")
+                if counted != len(memory["features"]):
+                    errors.append(f"torn read: {len(memory['features'])} features, "
+                                  f"metadata.tokens counts {counted}")
+                reads += 1
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            store.close()
+        slowest = max(slowest, time.perf_counter() - started)
+        time.sleep(READ_INTERVAL)
+    results.put((reads, slowest, errors))
+
+
+def run(backend, writers, features, readers, node_writers=0):
+    """Check failures of one run, as messages"""
+    from cco.memory import CCOMMemory
+    from cco.store import switch_backend
+    from cco.tokens import feature_tokens
+    from cco.util import normalize_name
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="ccom-stress-") as tmp:
+        claude_dir = os.path.join(tmp, ".claude")
+        sys.stdout, stdout = open(os.devnull, "w"), sys.stdout
+        try:
+            CCOMMemory(claude_dir).store.close()
+            if backend == "sqlite":
+                switch_backend(claude_dir, "sqlite")
+        finally:
+            sys.stdout = stdout
+        if node_writers:
+            shutil.copy(ROOT / "cco" / "templates" / "ccom.js", os.path.join(claude_dir, "ccom.js"))
+
+        start = context.Event()
+        stop = context.Event()
+        results = context.Queue()
+        writer_processes = [context.Process(target=writer, args=(claude_dir, index, features, start))
+                            for index in range(writers)]
+        writer_processes += [context.Process(target=node_writer,
+                                             args=(claude_dir, index, features, start))
+                             for index in range(node_writers)]
+        reader_processes = [context.Process(target=reader, args=(claude_dir, backend, stop, results))
+                            for _ in range(readers)]
+        for process in writer_processes + reader_processes:
+            process.start()
+        # Let every writer import before releasing them together
+        time.sleep(1.0)
+        began = time.perf_counter()
+        start.set()
+        for process in writer_processes:
+            process.join()
+        elapsed = time.perf_counter() - began
+        stop.set()
+        reports = [results.get() for _ in reader_processes]
+        for process in reader_processes:
+            process.join()
+
+        failures = [f"writer exited with status {process.exitcode}"
+                    for process in writer_processes if process.exitcode != 0]
+        engine = CCOMMemory(claude_dir)
+        memory = engine.memory
+        names = set(memory["features"])
+        expected = {feature_name(index, number) for index in range(writers) for number in range(features)}
+        expected |= {snapshot_name(index) for index in range(writers)}
+        expected |= {node_feature_name(index, number)
+                     for index in range(node_writers) for number in range(features)}
+        missing = expected - names
+        if missing:
+            failures.append(f"{len(missing)} features lost, e.g. {sorted(missing)[:3]}")
+        shared = [name for name in names if normalize_name(name) == normalize_name(SHARED_FEATURE)]
+        if len(shared) != 1:
+            failures.append(f"shared feature stored {len(shared)} times")
+        tokens = memory["metadata"].get("tokens") or {}
+        total = sum(data.get("tokens") or feature_tokens(name, data)
+                    for name, data in memory["features"].items())
+        if tokens.get("features") != len(names) or tokens.get("total") != total:
+            failures.append(f"metadata.tokens {tokens} does not match {len(names)} features, {total} tokens")
+        leftovers = [name for name in os.listdir(claude_dir) if name.endswith(".tmp")]
+        if leftovers:
+            failures.append(f"temp files left behind: {leftovers}")
+        engine.store.close()
+
+        reads = sum(report[0] for report in reports)
+        slowest = max((report[1] for report in reports), default=0.0)
+        for report in reports:
+            failures.extend(report[2][:3])
+        writes = writers * (features + 2) + node_writers * features
+        node = f" (+{node_writers} node)" if node_writers else ""
+        print(f"{backend:>6}: {writers} writers{node}, {writes} writes in {elapsed:.1f}s "
+              f"({writes / elapsed:.0f}/s), revision {memory['metadata'].get('revision')}; "
+              f"{readers} readers, {reads} reads, slowest {slowest * 1000:.0f} ms")
+        return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress concurrent writers on one project's memory")
+    parser.add_argument("--writers", type=int, default=32, help="writer processes (default 32)")
+    parser.add_argument("--features", type=int, default=25, help="features per writer (default 25)")
+    parser.add_argument("--readers", type=int, default=4, help="reader processes (default 4)")
+    parser.add_argument("--node-writers", type=int, default=4,
+                        help="ccom.js writer processes on the JSON backend (default 4)")
+    parser.add_argument("--backend", choices=("json", "sqlite", "both"), default="both")
+    args = parser.parse_args()
+
+    backends = ("json", "sqlite") if args.backend == "both" else (args.backend,)
+    node_writers = args.node_writers
+    if node_writers and "json" in backends and shutil.which("node") is None:
+        print("⚠️  node not found - running without ccom.js writers")
+        node_writers = 0
+    failed = False
+    for backend in backends:
+        failures = run(backend, args.writers, args.features, args.readers,
+                       node_writers if backend == "json" else 0)
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        failed = failed or bool(failures)
+    print("❌ Concurrency checks failed" if failed else "✅ No lost writes or torn reads")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""CCOM benchmark suite at production scale
+
+Generates a memory with 1k/10k/100k features and a project with
+10k/50k/200k .js files (90% of them in node_modules), then times the
+memory operations, the security scan and CLI cold start on them. Results
+are written as JSON and compared against a stored baseline; an operation
+more than --tolerance slower than its baseline is reported as a
+regression and the suite exits with status 1.
+
+    python benchmarks/suite.py --scale small
+    python benchmarks/suite.py --scale medium --save-baseline
+    python benchmarks/suite.py --scale large --data-dir /tmp/ccom-bench --only scan_cold,scan_warm
+
+Generated data is reused between runs when --data-dir is given.
+Baselines are specific to a machine: record one with --save-baseline
+before comparing.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from generators import WORDS, build_repo, synthetic_features, write_memory  # noqa: E402
+from cco.memory import CCOMMemory  # noqa: E402
+from cco.walker import walk_files  # noqa: E402
+
+RESULTS_VERSION = 1
+SCALES = {
+    "small": {"features": 1000, "files": 10000},
+    "medium": {"features": 10000, "files": 50000},
+    "large": {"features": 100000, "files": 200000},
+}
+DEFAULT_BASELINE = REPO_ROOT / "benchmarks" / "baseline.json"
+DEFAULT_RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+DEFAULT_TOLERANCE = 0.25
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.005
+DUPLICATE_PROBES = 200
+NEW_FEATURES = 100
+PACK_QUERIES = 10
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the emoji output of the code being timed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(func, repeat, setup=None, teardown=None):
+    """Median and best wall time of func(state) over repeat runs; setup is not timed"""
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        with quiet():
+            start = time.perf_counter()
+            func(state)
+            times.append(time.perf_counter() - start)
+        if teardown:
+            teardown(state)
+    return {"seconds": statistics.median(times), "best": min(times), "runs": repeat}
+
+
+class Workspace:
+    """Generated memory and project, kept in data_dir between runs when it is given"""
+
+    def __init__(self, data_dir, features, files, backend):
+        self.root = Path(data_dir)
+        self.params = {"features": features, "files": files, "backend": backend}
+        self.memory_project = self.root / "memory-project"
+        self.scratch = self.root / "scratch"
+        self.repo = self.root / "repo"
+
+    def prepare(self):
+        marker = self.root / "params.json"
+        try:
+            if json.loads(marker.read_text()) == self.params:
+                print(f"♻️  Reusing generated data in {self.root}")
+                return
+        except (OSError, ValueError):
+            pass
+        for path in (self.memory_project, self.repo, self.scratch):
+            shutil.rmtree(path, ignore_errors=True)
+        start = time.perf_counter()
+        print(f"🏗️  Generating {self.params['features']} features...")
+        write_memory(self.memory_project / ".claude", self.params["features"],
+                     self.params["backend"])
+        print(f"🏗️  Generating a project with {self.params['files']} .js files...")
+        build_repo(self.repo, self.params["files"])
+        (self.repo / ".claude").mkdir(exist_ok=True)
+        marker.write_text(json.dumps(self.params))
+        print(f"✅ Data ready in {time.perf_counter() - start:.1f}s")
+
+    def fresh_memory(self):
+        """Copy of the generated .claude directory for operations that modify it"""
+        shutil.rmtree(self.scratch, ignore_errors=True)
+        shutil.copytree(self.memory_project / ".claude", self.scratch / ".claude")
+        return self.scratch / ".claude"
+
+    def engine(self, fresh=False):
+        claude_dir = self.fresh_memory() if fresh else self.memory_project / ".claude"
+        with quiet():
+            return CCOMMemory(claude_dir)
+
+
+def _close(engine):
+    engine.store.close()
+
+
+def memory_benchmarks(workspace, repeat):
+    features = list(synthetic_features(workspace.params["features"]))
+    probes = [name.upper() for name in features[:DUPLICATE_PROBES // 2]]
+    probes += [" ".join(WORDS[i:i + 3]) + " probe" for i in range(DUPLICATE_PROBES - len(probes))]
+    new_names = [f"new feature {i}" for i in range(NEW_FEATURES)]
+
+    pack_queries = [" ".join(WORDS[i:i + 2]) for i in range(0, PACK_QUERIES * 2, 2)]
+
+    def warm_engine():
+        # The relevance index is built once per process (json) or stored (sqlite)
+        engine = workspace.engine()
+        engine.store.rank(pack_queries[0])
+        return engine
+
+    def load(_):
+        engine = CCOMMemory(workspace.memory_project / ".claude")
+        engine.load_memory()
+        engine.store.close()
+
+    return {
+        "load_memory": measure(load, repeat),
+        "save_memory": measure(lambda engine: engine.save_memory(), repeat,
+                               lambda: workspace.engine(fresh=True), _close),
+        "duplicate_check": dict(measure(
+            lambda engine: [engine.check_duplicate(name) for name in probes], repeat,
+            workspace.engine, _close), ops=len(probes)),
+        "remember": dict(measure(
+            lambda engine: [engine.remember_feature(name) for name in new_names], repeat,
+            lambda: workspace.engine(fresh=True), _close), ops=len(new_names)),
+        "stats": measure(lambda engine: engine.get_memory_stats(), repeat,
+                         workspace.engine, _close),
+        "pack": dict(measure(
+            lambda engine: [engine.pack_context(query) for query in pack_queries], repeat,
+            warm_engine, _close), ops=len(pack_queries)),
+        "archive": measure(lambda engine: engine.archive_old_features(180), repeat,
+                           lambda: workspace.engine(fresh=True), _close),
+        "compact": measure(lambda engine: engine.compact_memory(), repeat,
+                           lambda: workspace.engine(fresh=True), _close),
+    }
+
+
+def scan_benchmarks(workspace, repeat):
+    from ccom.orchestrator import CCOMOrchestrator
+
+    scan_cache = workspace.repo / ".claude" / "cache" / "security-scan.json"
+    previous = os.getcwd()
+    os.chdir(workspace.repo)
+    try:
+        with quiet():
+            orchestrator = CCOMOrchestrator()
+
+        def cold():
+            with contextlib.suppress(FileNotFoundError):
+                scan_cache.unlink()
+            return orchestrator
+
+        results = {
+            "walk": measure(lambda _: list(walk_files(workspace.repo)), repeat),
+            "scan_cold": measure(lambda o: o.scan_for_security_issues(), repeat, cold),
+        }
+        with quiet():
+            orchestrator.scan_for_security_issues()
+        results["scan_warm"] = measure(lambda o: o.scan_for_security_issues(), repeat,
+                                       lambda: orchestrator)
+        return results
+    finally:
+        os.chdir(previous)
+
+
+def cli_benchmarks(workspace, repeat):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+
+    def cli(*args):
+        def run(_):
+            subprocess.run([sys.executable, "-m", "cco.cli", *args], cwd=workspace.memory_project,
+                           env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           check=False)
+        return run
+
+    return {
+        "cli_help": measure(cli("--help"), repeat),
+        "cli_stats": measure(cli("stats"), repeat),
+    }
+
+
+GROUPS = (
+    (memory_benchmarks, ("load_memory", "save_memory", "duplicate_check", "remember", "stats",
+                         "pack", "archive", "compact")),
+    (scan_benchmarks, ("walk", "scan_cold", "scan_warm")),
+    (cli_benchmarks, ("cli_help", "cli_stats")),
+)
+OPERATIONS = tuple(name for _, names in GROUPS for name in names)
+
+
+def run_suite(workspace, repeat, only=None):
+    results = {}
+    for group, names in GROUPS:
+        if only and not only.intersection(names):
+            continue
+        measured = group(workspace, repeat)
+        results.update((name, value) for name, value in measured.items()
+                       if not only or name in only)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """(name, current, baseline, ratio, regressed) for operations in both"""
+    rows = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        ratio = current["seconds"] / reference["seconds"] if reference["seconds"] else 1.0
+        regressed = (ratio > 1 + tolerance
+                     and current["seconds"] - reference["seconds"] > MIN_REGRESSION_SECONDS)
+        rows.append((name, current["seconds"], reference["seconds"], ratio, regressed))
+    return rows
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CCOM at production scale")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="Preset data size (default: small)")
+    parser.add_argument("--features", type=int, help="Override the number of features")
+    parser.add_argument("--files", type=int, help="Override the number of .js files")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json",
+                        help="Memory backend to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operation (median is kept)")
+    parser.add_argument("--only", help="Comma-separated operations to report")
+    parser.add_argument("--data-dir", help="Keep generated data here and reuse it")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<scale>.json)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the baseline for this scale")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown against the baseline (default: 0.25)")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    unknown = (only or set()) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"unknown operations: {', '.join(sorted(unknown))}")
+    features = args.features or SCALES[args.scale]["features"]
+    files = args.files or SCALES[args.scale]["files"]
+    # Custom sizes get their own baseline entry
+    label = args.scale if not (args.features or args.files) else f"{features}f-{files}js"
+    if args.backend != "json":
+        label += f"-{args.backend}"
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or stack.enter_context(
+            tempfile.TemporaryDirectory(prefix="ccom-bench-"))
+        workspace = Workspace(data_dir, features, files, args.backend)
+        workspace.prepare()
+        results = run_suite(workspace, args.repeat, only)
+
+    document = {
+        "version": RESULTS_VERSION,
+        "scale": label,
+        "params": workspace.params,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(),
+        "results": results,
+    }
+    output = Path(args.output) if args.output else DEFAULT_RESULTS_DIR / f"{label}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2) + "\n")
+
+    baselines = load_baseline(args.baseline)
+    reference = baselines.get(label, {})
+    if reference.get("params") != workspace.params:
+        reference = {}
+    rows = {row[0]: row for row in compare(results, reference.get("results", {}), args.tolerance)}
+
+    print(f"\n📊 CCOM benchmarks ({label}: {features} features, {files} .js files, "
+          f"{args.backend} backend)")
+    print(f"{'operation':<16}{'median':>12}{'best':>12}{'baseline':>12}{'change':>10}")
+    for name, result in results.items():
+        line = f"{name:<16}{result['seconds'] * 1000:>10.1f}ms{result['best'] * 1000:>10.1f}ms"
+        if name in rows:
+            _, _, base, ratio, regressed = rows[name]
+            line += f"{base * 1000:>10.1f}ms{(ratio - 1) * 100:>+9.0f}%"
+            if regressed:
+                line += "  🚨"
+        print(line)
+    print(f"\n📝 Results written to {output}")
+
+    if args.save_baseline:
+        baselines[label] = document
+        Path(args.baseline).write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"📌 Baseline for {label} saved to {args.baseline}")
+        return
+
+    regressions = [name for name, row in rows.items() if row[4]]
+    if regressions:
+        print(f"🚨 {len(regressions)} regression(s) over {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+    if rows:
+        print("✅ No regressions against the baseline")
+    else:
+        print(f"ℹ️  No baseline for {label} - record one with --save-baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Offline dependency advisory index
+
+import_snapshot turns an advisory snapshot into .claude/advisories.json,
+an index from package name to advisories whose vulnerable version ranges
+are already parsed into comparator sets. audit_lockfile streams the
+packages of package-lock.json once, looks each one up by name and
+reports vulnerable packages with their highest severity, the same data
+security_guardian_fallback reads from npm audit --json, without network
+access.
+
+Accepted snapshot formats (JSON, or JSON lines):
+- npm bulk advisories: {"<package>": [{"id", "severity", "vulnerable_versions", ...}]}
+- npm audit v1 output: {"advisories": {"<id>": {"module_name", "vulnerable_versions", ...}}}
+- a list of records with name (or module_name/package), severity and
+  vulnerable_versions (or range)
+
+Ranges follow node-semver: comparators, x-ranges, ~, ^, hyphen ranges
+and ||, with prereleases matched only by comparators on the same
+major.minor.patch.
+"""
+
+import json
+import re
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from cco.journal import write_atomic
+from cco.lockfile import iter_lock_packages
+
+INDEX_VERSION = 1
+SEVERITIES = ("info", "low", "moderate", "high", "critical")
+SEVERITY_RANK = {name: rank for rank, name in enumerate(SEVERITIES)}
+
+Advisory = namedtuple("Advisory", "id severity title url range")
+AuditReport = namedtuple("AuditReport", "vulnerabilities packages_checked advisories duration")
+AuditReport.__doc__ = """Result of audit_lockfile
+
+vulnerabilities maps package name to {"severity", "versions",
+"advisories"}, like the vulnerabilities object of npm audit --json.
+"""
+
+_VERSION = re.compile(r'^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$')
+_PARTIAL = re.compile(r'^v?([0-9]+|[xX*])(?:\.([0-9]+|[xX*]))?(?:\.([0-9]+|[xX*]))?'
+                      r'(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$')
+_COMPARATOR = re.compile(r'^(<=|>=|<|>|=|~>|~|\^)?\s*(.*)$')
+_HYPHEN = re.compile(r'^\s*(\S+)\s+-\s+(\S+)\s*$')
+_OPERATOR_SPACE = re.compile(r'(<=|>=|<|>|=|~>|~|\^)\s+')
+
+
+class RangeError(ValueError):
+    """Raised for a version range that cannot be parsed"""
+
+
+def _prerelease(text):
+    if not text:
+        return ()
+    return tuple(int(part) if part.isdigit() else part for part in text.split("."))
+
+
+def parse_version(text):
+    """(major, minor, patch, prerelease) for an exact version, or None"""
+    match = _VERSION.match((text or "").strip())
+    if not match or match.group(2) is None or match.group(3) is None:
+        return None
+    return (int(match.group(1)), int(match.group(2)), int(match.group(3)),
+            _prerelease(match.group(4)))
+
+
+def version_key(version):
+    """Sort key implementing semver precedence"""
+    major, minor, patch, pre = version
+    # A release sorts after its prereleases; numeric identifiers before alphanumeric
+    return (major, minor, patch, not pre,
+            tuple((0, part, "") if isinstance(part, int) else (1, 0, part) for part in pre))
+
+
+def _partial(text):
+    match = _PARTIAL.match(text)
+    if not match:
+        raise RangeError(f"Invalid version: {text!r}")
+    parts = []
+    for group in match.groups()[:3]:
+        if group is None or group in ("x", "X", "*"):
+            break
+        parts.append(int(group))
+    return parts, _prerelease(match.group(4)) if len(parts) == 3 else ()
+
+
+def _bump(parts):
+    """Exclusive upper bound for a partial version: 1 -> 2.0.0, 1.2 -> 1.3.0"""
+    bumped = parts[:-1] + [parts[-1] + 1]
+    return tuple(bumped + [0] * (3 - len(bumped))) + ((),)
+
+
+def _full(parts, pre=()):
+    return tuple(parts + [0] * (3 - len(parts))) + (pre,)
+
+
+def _desugar(operator, text):
+    """Comparators [(op, version)] for one range token"""
+    parts, pre = _partial(text) if text else ([], ())
+    if not parts:
+        # Any version: "<*" and ">*" match nothing, everything else matches all
+        return [("<", (0, 0, 0, ()))] if operator in ("<", ">") else []
+    if operator in (None, "="):
+        if len(parts) == 3:
+            return [("=", _full(parts, pre))]
+        return [(">=", _full(parts)), ("<", _bump(parts))]
+    if operator in ("~", "~>"):
+        upper = _bump(parts[:2] if len(parts) >= 2 else parts)
+        return [(">=", _full(parts, pre)), ("<", upper)]
+    if operator == "^":
+        significant = next((i for i, part in enumerate(parts) if part != 0), len(parts) - 1)
+        if len(parts) < 3 and significant >= len(parts) - 1:
+            upper = _bump(parts)
+        else:
+            upper = _bump(parts[:significant + 1])
+        return [(">=", _full(parts, pre)), ("<", upper)]
+    if len(parts) == 3:
+        return [(operator, _full(parts, pre))]
+    if operator == ">":
+        return [(">=", _bump(parts))]
+    if operator == ">=":
+        return [(">=", _full(parts))]
+    if operator == "<":
+        return [("<", _full(parts))]
+    return [("<", _bump(parts))]  # <=
+
+
+def parse_range(text):
+    """Parse a node-semver range into a list of comparator sets (joined by ||)"""
+    sets = []
+    for alternative in (text or "*").split("||"):
+        alternative = alternative.strip()
+        hyphen = _HYPHEN.match(alternative)
+        if hyphen:
+            low, low_pre = _partial(hyphen.group(1))
+            high, high_pre = _partial(hyphen.group(2))
+            comparators = [(">=", _full(low, low_pre))] if low else []
+            if len(high) == 3:
+                comparators.append(("<=", _full(high, high_pre)))
+            elif high:
+                comparators.append(("<", _bump(high)))
+            sets.append(comparators)
+            continue
+        comparators = []
+        for token in _OPERATOR_SPACE.sub(r'\1', alternative).split():
+            operator, version = _COMPARATOR.match(token).groups()
+            comparators.extend(_desugar(operator, version))
+        sets.append(comparators)
+    return sets
+
+
+def _compare(version, operator, bound):
+    left, right = version_key(version), version_key(bound)
+    if operator == "=":
+        return left == right
+    if operator == "<":
+        return left < right
+    if operator == "<=":
+        return left <= right
+    if operator == ">":
+        return left > right
+    return left >= right
+
+
+def satisfies(version, sets):
+    """Whether a parsed version is in a parsed range"""
+    for comparators in sets:
+        if not all(_compare(version, op, bound) for op, bound in comparators):
+            continue
+        if version[3] and not any(bound[3] and bound[:3] == version[:3]
+                                  for _, bound in comparators):
+            continue
+        return True
+    return False
+
+
+def _encode_range(sets):
+    return [[[op, *bound[:3], ".".join(str(p) for p in bound[3])] for op, bound in comparators]
+            for comparators in sets]
+
+
+def _decode_range(encoded):
+    return [[(op, (major, minor, patch, _prerelease(pre))) for op, major, minor, patch, pre in c]
+            for c in encoded]
+
+
+def _snapshot_records(data):
+    """(package name, advisory dict) pairs from any supported snapshot format"""
+    if isinstance(data, dict) and isinstance(data.get("advisories"), dict):
+        for advisory in data["advisories"].values():
+            yield advisory.get("module_name"), advisory
+    elif isinstance(data, dict):
+        for name, advisories in data.items():
+            for advisory in advisories if isinstance(advisories, list) else [advisories]:
+                yield name, advisory
+    else:
+        for advisory in data:
+            yield (advisory.get("name") or advisory.get("module_name")
+                   or advisory.get("package")), advisory
+
+
+def _read_snapshot(path):
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    try:
+        return json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def import_snapshot(snapshot_path, index_path):
+    """Build the advisory index from a snapshot; returns (advisories, packages, skipped)"""
+    packages = {}
+    count = skipped = 0
+    for name, advisory in _snapshot_records(_read_snapshot(snapshot_path)):
+        spec = advisory.get("vulnerable_versions") or advisory.get("range")
+        severity = str(advisory.get("severity", "")).lower()
+        if not name or not spec or severity not in SEVERITY_RANK:
+            skipped += 1
+            continue
+        try:
+            compiled = _encode_range(parse_range(spec))
+        except RangeError:
+            skipped += 1
+            continue
+        packages.setdefault(name, []).append([
+            advisory.get("id") or advisory.get("source") or advisory.get("url"),
+            severity, advisory.get("title", ""), advisory.get("url", ""), spec, compiled])
+        count += 1
+
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(index_path, json.dumps({
+        "version": INDEX_VERSION,
+        "imported": time.time(),
+        "source": str(snapshot_path),
+        "packages": packages,
+    }, separators=(',', ':')))
+    return count, len(packages), skipped
+
+
+class AdvisoryIndex:
+    """Advisories by package name; ranges are decoded on first lookup of a package"""
+
+    def __init__(self, index_path):
+        self.path = Path(index_path)
+        with open(self.path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported advisory index version in {self.path}")
+        self.imported = data.get("imported")
+        self._raw = data.get("packages", {})
+        self._decoded = {}
+
+    def __len__(self):
+        return sum(len(advisories) for advisories in self._raw.values())
+
+    def advisories_for(self, name):
+        advisories = self._decoded.get(name)
+        if advisories is None:
+            advisories = [Advisory(id_, severity, title, url, _decode_range(compiled))
+                          for id_, severity, title, url, _, compiled in self._raw.get(name, ())]
+            self._decoded[name] = advisories
+        return advisories
+
+    def match(self, name, version):
+        """Advisories affecting one installed package version"""
+        if name not in self._raw:
+            return []
+        parsed = parse_version(version)
+        if parsed is None:
+            return []
+        return [advisory for advisory in self.advisories_for(name)
+                if satisfies(parsed, advisory.range)]
+
+
+def lockfile_packages(lockfile_path):
+    """(name, version) for every installed package in package-lock.json (v1-v3)
+
+    The lockfile is read incrementally (cco.lockfile), so memory does not
+    grow with its size.
+    """
+    return iter_lock_packages(lockfile_path)
+
+
+def audit_packages(index, packages):
+    """Match (name, version) pairs against the index in one pass"""
+    start = time.perf_counter()
+    vulnerabilities = {}
+    checked = 0
+    for name, version in packages:
+        checked += 1
+        for advisory in index.match(name, version):
+            entry = vulnerabilities.setdefault(
+                name, {"severity": advisory.severity, "versions": [], "advisories": []})
+            if SEVERITY_RANK[advisory.severity] > SEVERITY_RANK[entry["severity"]]:
+                entry["severity"] = advisory.severity
+            if version not in entry["versions"]:
+                entry["versions"].append(version)
+            if advisory.id not in (a["id"] for a in entry["advisories"]):
+                entry["advisories"].append({"id": advisory.id, "severity": advisory.severity,
+                                            "title": advisory.title, "url": advisory.url})
+    return AuditReport(vulnerabilities, checked, len(index), time.perf_counter() - start)
+
+
+def audit_lockfile(index, lockfile_path):
+    """AuditReport for package-lock.json against an AdvisoryIndex"""
+    return audit_packages(index, lockfile_packages(lockfile_path))
+
+
+def high_critical_count(report):
+    """Vulnerable packages rated high or critical, as security_guardian_fallback counts them"""
+    return sum(1 for entry in report.vulnerabilities.values()
+               if entry["severity"] in ("high", "critical"))
@@ -0,0 +1,220 @@
+"""Compressed archive segments for CCOM memory
+
+archive_old_features moves features into .claude/archive/ as gzip
+segment files (segment-<UTC time>.json.gz) holding the same document the
+plain archive-<date>.json files did. Next to them, archive/index.json is
+a small sidecar listing, per segment, each feature name with its
+creation date and the words of all archived names, aliases, descriptions
+and files. search reads only the index and decompresses just the
+segments whose words cover the query; restore finds a feature's segment
+from the index and pulls it back out.
+
+Words are the lowercase alphanumeric runs of the text, kept whole (no
+camelCase split, no stopwords), so the index filter never rejects a
+segment that the substring search done by the live stores would match.
+
+The index is reconciled with the directory on every open: segments it
+does not list (a crash between writing a segment and the index, or the
+legacy archive-*.json files, which are read in place) are indexed and
+deleted files dropped. ccom.js writes the same segments and index.
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+from cco.journal import write_atomic
+from cco.util import normalize_name
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".json.gz"
+LEGACY_PATTERN = re.compile(r'^archive-.*\.json$')
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def words(text):
+    """Lowercase alphanumeric runs of text"""
+    return _WORD.findall(normalize_name(text))
+
+
+def _is_segment(name):
+    return (name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)) or \
+        bool(LEGACY_PATTERN.match(name))
+
+
+def read_segment(path):
+    """Archive document of a segment, gzip or legacy plain JSON"""
+    if os.fspath(path).endswith(".gz"):
+        import gzip
+        opener = gzip.open
+    else:
+        opener = open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def segment_entry(document, size):
+    """Index entry for an archive document"""
+    features = document.get("features") or {}
+    vocabulary = set()
+    for name, data in features.items():
+        data = data or {}
+        text = " ".join([name, data.get("userTerm") or "", data.get("description") or "",
+                         " ".join(data.get("files") or [])])
+        vocabulary.update(words(text))
+    return {
+        "archived": document.get("archivedDate"),
+        "bytes": size,
+        "features": {name: (data or {}).get("created") for name, data in features.items()},
+        "words": " ".join(sorted(vocabulary)),
+    }
+
+
+def _matches(name, data, query):
+    haystack = normalize_name(f"{name} {data.get('description') or ''}")
+    return all(word in haystack for word in query)
+
+
+class Archive:
+    """Archive segments under one directory plus their sidecar index"""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = os.fspath(archive_dir)
+        self.index_path = os.path.join(self.archive_dir, INDEX_FILE)
+        self.segments = {}
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.archive_dir, name)
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.segments = data.get("segments") or {}
+        except (OSError, ValueError):
+            pass
+        self._reconcile()
+
+    def _reconcile(self):
+        try:
+            on_disk = {entry.name: entry.stat().st_size for entry in os.scandir(self.archive_dir)
+                       if entry.is_file() and _is_segment(entry.name)}
+        except FileNotFoundError:
+            on_disk = {}
+        changed = False
+        for name in list(self.segments):
+            if name not in on_disk:
+                del self.segments[name]
+                changed = True
+        for name, size in on_disk.items():
+            entry = self.segments.get(name)
+            if entry is not None and entry.get("bytes") == size:
+                continue
+            try:
+                document = read_segment(self._path(name))
+            except (OSError, ValueError, EOFError):
+                continue
+            self.segments[name] = segment_entry(document, size)
+            changed = True
+        if changed:
+            self._save()
+
+    def _save(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        write_atomic(self.index_path, json.dumps(
+            {"version": INDEX_VERSION, "segments": self.segments},
+            separators=(',', ':'), ensure_ascii=False))
+
+    def _write(self, name, document):
+        path = self._path(name)
+        tmp_path = f"{path}.tmp"
+        import gzip
+
+        payload = json.dumps(document, indent=2, ensure_ascii=False).encode('utf-8')
+        with open(tmp_path, 'wb') as raw:
+            with gzip.GzipFile(filename="", mode='wb', fileobj=raw, mtime=0) as f:
+                f.write(payload)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+        self.segments[name] = segment_entry(document, os.path.getsize(path))
+
+    def add_segment(self, document):
+        """Write an archive document as a new segment, returns its file name"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        name = f"{SEGMENT_PREFIX}{stamp}{SEGMENT_SUFFIX}"
+        counter = 1
+        while os.path.exists(self._path(name)):
+            counter += 1
+            name = f"{SEGMENT_PREFIX}{stamp}-{counter}{SEGMENT_SUFFIX}"
+        self._write(name, document)
+        self._save()
+        return name
+
+    def newest_first(self):
+        """Segment names, most recently archived first"""
+        return sorted(self.segments, key=lambda name: (self.segments[name].get("archived") or "", name),
+                      reverse=True)
+
+    def feature_count(self):
+        """Number of archived features over all segments"""
+        return sum(len(entry["features"]) for entry in self.segments.values())
+
+    def find(self, name):
+        """(segment, archived name) of the newest segment holding name, else None"""
+        wanted = normalize_name(name)
+        for segment in self.newest_first():
+            for archived in self.segments[segment]["features"]:
+                if normalize_name(archived) == wanted:
+                    return segment, archived
+        return None
+
+    def candidates(self, text):
+        """Segments whose indexed words cover every word of text"""
+        query = [run for word in normalize_name(text).split() for run in words(word)]
+        return [segment for segment in self.newest_first()
+                if all(run in self.segments[segment]["words"] for run in query)]
+
+    def search(self, text, limit=20):
+        """(segment, name, data) for archived features whose name or description contains every word"""
+        query = normalize_name(text).split()
+        found = []
+        for segment in self.candidates(text):
+            try:
+                features = read_segment(self._path(segment)).get("features") or {}
+            except (OSError, ValueError, EOFError):
+                continue
+            for name, data in features.items():
+                if _matches(name, data or {}, query):
+                    found.append((segment, name, data or {}))
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    def get(self, segment, name):
+        """Archived data of one feature"""
+        return read_segment(self._path(segment))["features"][name]
+
+    def discard(self, segment, name):
+        """Remove a feature from its segment, deleting the segment once empty"""
+        document = read_segment(self._path(segment))
+        document["features"].pop(name, None)
+        if document["features"]:
+            if segment.endswith(SEGMENT_SUFFIX):
+                self._write(segment, document)
+            else:
+                # Legacy plain JSON archive: keep its format
+                write_atomic(self._path(segment), json.dumps(document, indent=2, ensure_ascii=False))
+                self.segments[segment] = segment_entry(
+                    document, os.path.getsize(self._path(segment)))
+        else:
+            os.unlink(self._path(segment))
+            del self.segments[segment]
+        self._save()
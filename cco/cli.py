@@ -1,19 +1,72 @@
 #!/usr/bin/env python3
-"""CCOM CLI - Claude Code Orchestrator and Memory"""
+"""CCOM CLI - Claude Code Orchestrator and Memory
+
+Hooks run ccom on every session start and prompt, so startup time is
+paid constantly. Plain invocations ("ccom status", "ccom remember auth
+'JWT login'") are parsed by fast_parse straight from the COMMANDS table
+without building the argparse parser, and everything beyond os and sys
+is imported by the command that needs it. Options, --help and malformed
+arguments fall through to the full argparse parser built from the same
+table, so both paths accept and reject the same command lines.
+benchmarks/bench_startup.py holds this to a startup budget.
+
+Memory commands go to the project's daemon when one is running (ccom
+daemon start, see cco.daemon), and run in-process otherwise.
+"""
 
 import os
 import sys
-import shutil
-import argparse
-import subprocess
-from pathlib import Path
+from types import SimpleNamespace
+
+from cco.tokens import PACK_BUDGET_TOKENS
 
 def get_template_path():
     """Get path to template files"""
+    from pathlib import Path
     return Path(__file__).parent / "templates"
 
+def use_node_engine():
+    """Check whether the Node.js ccom.js backend was requested instead of the native engine"""
+    return os.environ.get("CCOM_ENGINE", "").lower() == "node"
+
 def run_ccom_command(args):
+    """Run a memory command in-process, or via Node.js when CCOM_ENGINE=node"""
+    if use_node_engine():
+        return run_node_command(args)
+
+    if not os.path.isdir(".claude"):
+        print("ERROR: CCOM not initialized. Run 'ccom init' first.", file=sys.stderr)
+        return False
+
+    try:
+        from cco.daemon_client import run_in_daemon
+        served = run_in_daemon("memory.run", {"args": args})
+        if served is not None:
+            return served["ok"]
+        from cco.memory import run_command as run_memory_command
+        return run_memory_command(args)
+    except Exception as e:
+        print(f"ERROR: Failed to run ccom command: {e}", file=sys.stderr)
+        return False
+
+def flush_daemon():
+    """Have a running daemon write its queued records before memory files are read directly"""
+    from cco.daemon_client import run_in_daemon
+    try:
+        run_in_daemon("daemon.flush")
+    except Exception as e:
+        print(f"WARNING: Could not flush the ccom daemon: {e}", file=sys.stderr)
+
+def run_node_command(args):
     """Run Node.js ccom.js command with proper error handling"""
+    import subprocess
+    from cco.store import current_backend
+
+    flush_daemon()
+    if current_backend(".claude") != "json":
+        print("ERROR: The Node.js backend only reads memory.json. Run 'ccom backend json' first.", file=sys.stderr)
+        return False
+
     try:
         cmd = ["node", ".claude/ccom.js"] + args
         result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace', check=False)
@@ -44,6 +97,9 @@ def run_ccom_command(args):
 
 def init_project():
     """Initialize CCO in current directory"""
+    import shutil
+    from pathlib import Path
+
     current_dir = Path.cwd()
     template_dir = get_template_path()
 
@@ -89,99 +145,262 @@ def init_project():
 
 def show_status():
     """Show CCOM status in current directory"""
-    claude_dir = Path.cwd() / ".claude"
-    memory_file = claude_dir / "memory.json"
-
-    if not claude_dir.exists():
+    if not os.path.isdir(".claude"):
         print("ERROR: CCOM not initialized. Run 'ccom init' first.")
         return False
 
-    if not memory_file.exists():
+    if not os.path.exists(os.path.join(".claude", "memory.json")):
         print("CCOM initialized but no memory yet.")
         return True
 
-    # Run the node command to show status
     return run_ccom_command(["start"])
 
-def main():
-    """Main CLI entry point"""
-    parser = argparse.ArgumentParser(
-        description="CCOM - Claude Code Orchestrator and Memory",
-        epilog="For more info: https://github.com/debashishroy00/ccom"
-    )
-
-    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+def set_backend(backend):
+    """Show or switch the memory backend (json or sqlite)"""
+    from pathlib import Path
+    from cco.store import BACKENDS, current_backend, switch_backend
 
-    # Init command
-    init_parser = subparsers.add_parser("init", help="Initialize CCOM in current directory")
+    claude_dir = Path.cwd() / ".claude"
+    if not claude_dir.exists():
+        print("ERROR: CCOM not initialized. Run 'ccom init' first.", file=sys.stderr)
+        return False
 
-    # Status command
-    status_parser = subparsers.add_parser("status", help="Show CCOM status")
+    if backend and backend not in BACKENDS:
+        print(f"ERROR: Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})", file=sys.stderr)
+        return False
 
-    # Memory command
-    memory_parser = subparsers.add_parser("memory", help="Show memory contents")
+    active = current_backend(claude_dir)
+    if not backend:
+        print(f"Memory backend: {active}")
+        return True
 
-    # Remember command
-    remember_parser = subparsers.add_parser("remember", help="Remember a feature")
-    remember_parser.add_argument("name", help="Feature name to remember")
-    remember_parser.add_argument("description", nargs="?", help="Optional feature description")
+    flush_daemon()
+    try:
+        moved = switch_backend(claude_dir, backend)
+    except Exception as e:
+        print(f"ERROR: Failed to switch backend: {e}", file=sys.stderr)
+        return False
 
-    # Clear command
-    clear_parser = subparsers.add_parser("clear", help="Clear memory")
+    if moved is None:
+        print(f"Memory backend already {backend}")
+    else:
+        print(f"Migrated {moved} features from {active} to {backend} backend")
+    return True
 
-    # v0.2 Memory Management Commands
-    stats_parser = subparsers.add_parser("stats", help="Show memory usage statistics")
+def export_project_memory(path):
+    """Export memory in memory.json format from whichever backend is active"""
+    from pathlib import Path
+    from cco.store import export_memory
 
-    list_parser = subparsers.add_parser("list", help="List features with age")
-    list_parser.add_argument("sort", nargs="?", default="created", help="Sort by: created or name")
+    flush_daemon()
+    try:
+        count = export_memory(Path.cwd() / ".claude", path)
+    except Exception as e:
+        print(f"ERROR: Failed to export memory: {e}", file=sys.stderr)
+        return False
+    print(f"Exported {count} features to {path}")
+    return True
 
-    archive_parser = subparsers.add_parser("archive", help="Archive old features")
-    archive_parser.add_argument("days", nargs="?", type=int, default=30, help="Archive features older than N days (default: 30)")
+def import_features(path, fmt=None, dry_run=False):
+    """Remember features from a JSONL or CSV file ("-" for stdin) with one write
 
-    remove_parser = subparsers.add_parser("remove", help="Remove specific feature")
-    remove_parser.add_argument("name", help="Feature name to remove")
+    Runs in this process even when the daemon is up, since only this
+    process can read its stdin; the daemon writes its queued records
+    first and reloads memory on its next request.
+    """
+    if not os.path.isdir(".claude"):
+        print("ERROR: CCOM not initialized. Run 'ccom init' first.", file=sys.stderr)
+        return False
 
-    compact_parser = subparsers.add_parser("compact", help="Compact memory by truncating long descriptions")
+    from cco.ingest import read_rows
+    from cco.memory import CCOMMemory
+    from cco.util import emit
 
-    args = parser.parse_args()
+    flush_daemon()
+    try:
+        stream = sys.stdin if path == "-" else open(path, encoding='utf-8', newline='')
+    except OSError as e:
+        print(f"ERROR: Cannot read {path}: {e}", file=sys.stderr)
+        return False
 
-    if not args.command:
-        parser.print_help()
-        return
+    engine = CCOMMemory()
+    try:
+        outcomes = engine.import_features(read_rows(stream, None if path == "-" else path, fmt), dry_run)
+    except Exception as e:
+        print(f"ERROR: Import failed, nothing was written: {e}", file=sys.stderr)
+        return False
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        engine.store.close()
+
+    counts = {"added": 0, "duplicate": 0, "invalid": 0}
+    for outcome in outcomes:
+        counts[outcome.status] += 1
+        if outcome.status == "added":
+            emit(f"✅ line {outcome.line}: {outcome.name}")
+        elif outcome.status == "duplicate":
+            emit(f'⚠️  line {outcome.line}: {outcome.name} - duplicate of "{outcome.detail}"')
+        else:
+            emit(f"❌ line {outcome.line}: {outcome.detail}")
+    verb = "Would import" if dry_run else "Imported"
+    emit(f"\n📥 {verb} {counts['added']} features in one write, skipped {counts['duplicate']} "
+         f"duplicates and {counts['invalid']} invalid rows")
+    return counts["invalid"] == 0
+
+def manage_daemon(action):
+    """Start, stop, show or run the background daemon of this project"""
+    if not os.path.isdir(".claude"):
+        print("ERROR: CCOM not initialized. Run 'ccom init' first.", file=sys.stderr)
+        return False
+    from cco.daemon import daemon_command
+    try:
+        return daemon_command(action)
+    except Exception as e:
+        print(f"ERROR: Daemon {action} failed: {e}", file=sys.stderr)
+        return False
 
-    if args.command == "init":
-        success = init_project()
-        sys.exit(0 if success else 1)
-    elif args.command == "status":
-        success = show_status()
-        sys.exit(0 if success else 1)
-    elif args.command == "memory":
-        success = run_ccom_command(["memory"])
-        sys.exit(0 if success else 1)
-    elif args.command == "remember":
-        if args.description:
-            success = run_ccom_command(["remember", args.name, args.description])
+def _memory(*words):
+    """Handler running a memory command built from fixed words and argument values"""
+    def handler(args):
+        command = list(words[:1])
+        for word in words[1:]:
+            value = getattr(args, word)
+            if isinstance(value, list):
+                command.extend(value)
+            elif value is not None:
+                command.append(str(value))
+        return run_ccom_command(command)
+    return handler
+
+# Subcommand -> (handler, help, arguments); an argument is (name, argparse
+# keywords). Both fast_parse and build_parser read this table.
+COMMANDS = {
+    "init": (lambda args: init_project(), "Initialize CCOM in current directory", ()),
+    "status": (lambda args: show_status(), "Show CCOM status", ()),
+    "memory": (_memory("memory"), "Show memory contents", ()),
+    "remember": (_memory("remember", "name", "description"), "Remember a feature", (
+        ("name", {"help": "Feature name to remember"}),
+        ("description", {"nargs": "?", "help": "Optional feature description"}),
+    )),
+    "clear": (_memory("clear"), "Clear memory", ()),
+    "stats": (_memory("stats"), "Show memory usage statistics", ()),
+    "list": (_memory("list", "sort"), "List features with age", (
+        ("sort", {"nargs": "?", "default": "created", "help": "Sort by: created or name"}),
+    )),
+    "archive": (_memory("archive", "days"), "Archive old features", (
+        ("days", {"nargs": "?", "type": int, "default": 30,
+                  "help": "Archive features older than N days (default: 30)"}),
+    )),
+    "remove": (_memory("remove", "name"), "Remove specific feature", (
+        ("name", {"help": "Feature name to remove"}),
+    )),
+    "compact": (_memory("compact"), "Compact memory by truncating long descriptions", ()),
+    "similar": (_memory("similar", "name"), "Find near-duplicate features", (
+        ("name", {"nargs": "+", "help": "Feature name to compare"}),
+    )),
+    "search": (_memory("search", "text"), "Search feature names and descriptions, archives included", (
+        ("text", {"nargs": "+", "help": "Words to search for"}),
+    )),
+    "restore": (_memory("restore", "name"), "Move an archived feature back into memory", (
+        ("name", {"nargs": "+", "help": "Archived feature name"}),
+    )),
+    "pack": (_memory("pack", "budget", "query"),
+             "Show the features most relevant to a topic within a token budget", (
+        ("query", {"nargs": "*", "help": "Topic, branch or file paths (default: git branch and changed files)"}),
+        ("--budget", {"type": int, "default": PACK_BUDGET_TOKENS,
+                      "help": f"Token budget (default: {PACK_BUDGET_TOKENS})"}),
+    )),
+    "backend": (lambda args: set_backend(args.name), "Show or switch the memory backend", (
+        ("name", {"nargs": "?", "help": "Backend to migrate to: json or sqlite"}),
+    )),
+    "export": (lambda args: export_project_memory(args.path), "Export memory in memory.json format", (
+        ("path", {"help": "File to write"}),
+    )),
+    "import": (lambda args: import_features(args.path, args.format, args.dry_run),
+               "Remember features from a JSONL or CSV file or stdin in one write", (
+        ("path", {"nargs": "?", "default": "-", "help": "JSONL or CSV file, - for stdin (default)"}),
+        ("--format", {"choices": ("jsonl", "csv"),
+                      "help": "Input format (default: from the file extension or first line)"}),
+        ("--dry-run", {"action": "store_true", "help": "Report what would be imported without writing"}),
+    )),
+    "daemon": (lambda args: manage_daemon(args.action),
+               "Keep memory loaded in a background process that serves ccom commands", (
+        ("action", {"nargs": "?", "default": "status", "choices": ("start", "stop", "status", "run"),
+                    "help": "start, stop, status (default) or run in the foreground"}),
+    )),
+}
+
+def fast_parse(argv):
+    """Namespace for a plain "<command> [values...]" line, or None to defer to argparse
+
+    Anything starting with "-" (options, --help) and any value count,
+    type or choice the command does not accept is left to argparse,
+    which parses it or reports the error.
+    """
+    if not argv or argv[0] not in COMMANDS or any(word.startswith("-") for word in argv):
+        return None
+    values = argv[1:]
+    args = SimpleNamespace(command=argv[0], node=False)
+    for name, options in COMMANDS[argv[0]][2]:
+        nargs = options.get("nargs")
+        if name.startswith("-"):
+            taken = options.get("default")
+        elif nargs is None:
+            if not values:
+                return None
+            taken, values = values[0], values[1:]
+        elif nargs == "?":
+            taken, values = (values[0], values[1:]) if values else (options.get("default"), values)
         else:
-            success = run_ccom_command(["remember", args.name])
-        sys.exit(0 if success else 1)
-    elif args.command == "clear":
-        success = run_ccom_command(["clear"])
-        sys.exit(0 if success else 1)
-    elif args.command == "stats":
-        success = run_ccom_command(["stats"])
-        sys.exit(0 if success else 1)
-    elif args.command == "list":
-        success = run_ccom_command(["list", args.sort])
-        sys.exit(0 if success else 1)
-    elif args.command == "archive":
-        success = run_ccom_command(["archive", str(args.days)])
-        sys.exit(0 if success else 1)
-    elif args.command == "remove":
-        success = run_ccom_command(["remove", args.name])
-        sys.exit(0 if success else 1)
-    elif args.command == "compact":
-        success = run_ccom_command(["compact"])
-        sys.exit(0 if success else 1)
+            if nargs == "+" and not values:
+                return None
+            taken, values = list(values), []
+        convert = options.get("type")
+        if convert is not None and isinstance(taken, str):
+            try:
+                taken = convert(taken)
+            except ValueError:
+                return None
+        if taken is not None and "choices" in options and taken not in options["choices"]:
+            return None
+        setattr(args, name.lstrip("-").replace("-", "_"), taken)
+    return None if values else args
+
+def build_parser():
+    """Full argparse parser for options, help and error messages"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="CCOM - Claude Code Orchestrator and Memory",
+        epilog="For more info: https://github.com/debashishroy00/ccom"
+    )
+    parser.add_argument("--node", action="store_true",
+                        help="Use the Node.js ccom.js backend instead of the native engine")
+
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+    for command, (_, help_text, arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=help_text)
+        for name, options in arguments:
+            subparser.add_argument(name, **options)
+    return parser
+
+def main(argv=None):
+    """Main CLI entry point"""
+    argv = sys.argv[1:] if argv is None else argv
+    args = fast_parse(argv)
+    if args is None:
+        parser = build_parser()
+        args = parser.parse_args(argv)
+        if not args.command:
+            parser.print_help()
+            return
+
+    if args.node:
+        os.environ["CCOM_ENGINE"] = "node"
+
+    success = COMMANDS[args.command][0](args)
+    sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,71 @@
+"""Project settings for CCOM
+
+Settings live in .claude/config.json. Any key left out keeps its
+default, so a project only lists what it changes:
+
+    {"scan": {"max_file_mb": 100, "skip_minified": false}}
+"""
+
+import copy
+import json
+import os
+
+CONFIG_FILE = "config.json"
+
+# Sections are filled in by the modules that read them; an empty section
+# means "use that module's defaults"
+DEFAULT_CONFIG = {
+    # Security scan limits, see cco.scanner.scan_limits: max_file_mb,
+    # skip_extensions, skip_minified; use_git lists files with git ls-files
+    # (cco.walker) instead of walking the tree
+    "scan": {},
+    # Deployment gates: concurrency, used for workflows.concurrency when that is unset
+    "gates": {},
+    # Workflows in .claude/workflows, see cco.workflow: concurrency (steps at
+    # once for workflows that do not set their own)
+    "workflows": {},
+    # Claude Code integration probe cache, see cco.probe: ttl_hours
+    "probe": {},
+    # File-trigger handshake, see cco.trigger: timeout_seconds
+    "trigger": {},
+    # Lint/build/test result cache, see cco.gate_cache: enabled
+    "gate_cache": {},
+    # Gate subprocesses, see cco.runner: tail_lines, echo, failure_patterns
+    # ({gate: [regex, ...]}) and timeouts ({gate: seconds})
+    "runner": {},
+    # Dependency audit: offline ("auto", true or false) selects the local
+    # advisory index (ccom --import-advisories) over npm audit
+    "audit": {},
+    # Session-start context, see cco.memory: budget (tokens) packs only the
+    # features most relevant to the branch and changed files
+    "context": {},
+    # Background daemon, see cco.daemon: flush_ms (write-behind delay) and
+    # idle_minutes (exit after that long without requests, 0 never)
+    "daemon": {},
+}
+
+
+def _merge(defaults, overrides):
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(claude_dir):
+    """Settings from claude_dir/config.json merged over DEFAULT_CONFIG"""
+    path = os.path.join(claude_dir, CONFIG_FILE)
+    try:
+        with open(path, encoding='utf-8') as f:
+            overrides = json.load(f)
+    except FileNotFoundError:
+        return copy.deepcopy(DEFAULT_CONFIG)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable {path}: {e}")
+        return copy.deepcopy(DEFAULT_CONFIG)
+    if not isinstance(overrides, dict):
+        return copy.deepcopy(DEFAULT_CONFIG)
+    return _merge(DEFAULT_CONFIG, overrides)
@@ -0,0 +1,433 @@
+"""Persistent ccom daemon serving memory and orchestration over a Unix socket
+
+Every ccom invocation starts an interpreter, loads memory and, for the
+orchestrator, its agents and config, only to exit again. "ccom daemon
+start" keeps one process per project with all of that loaded, listening
+on .claude/ccom.sock (mode 0600). Both CLIs try the socket first (see
+cco.daemon_client) and run the command locally when no daemon answers,
+so the daemon is purely opt-in and stopping it changes nothing but
+speed.
+
+Requests are served one at a time on the daemon's only thread: the
+sqlite connection belongs to it, and commands mutate shared memory. A
+command's prints are redirected into "output" notifications to the
+client that asked.
+
+Writes are batched. The store runs with write_behind set: records are
+applied to memory at once, so every later request sees them, while disk
+writes wait until flush_ms (default 200) has passed since the first
+unwritten record, and then go out as one journal line (json, after
+cco.journal.coalesce) or one commit (sqlite). A crash of the daemon can
+lose at most that window of writes. daemon.flush writes them at once;
+the CLI asks for it before commands that read the files directly
+(backend, export, the Node.js engine), and shutdown, SIGTERM and the
+idle exit (idle_minutes, default 60) flush before leaving.
+
+Other processes may still write memory (ccom.js, a CLI that started
+before the daemon). Before each request the daemon compares the size and
+mtime of the store's files with what it last wrote and reloads memory
+when they differ, and it reopens the store when the backend was
+switched.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from cco.config import load_config
+from cco.daemon_client import (CONNECT_TIMEOUT, INTERNAL_ERROR, INVALID_PARAMS, INVALID_REQUEST,
+                               METHOD_NOT_FOUND, PARSE_ERROR, DaemonError, DaemonUnavailable, call,
+                               socket_path)
+from cco.memory import CCOMMemory, run_command
+from cco.store import current_backend
+
+DEFAULT_FLUSH_MS = 200
+DEFAULT_IDLE_MINUTES = 60
+START_TIMEOUT = 10.0
+LOG_FILE = "daemon.log"
+
+DaemonSettings = namedtuple("DaemonSettings", "flush_seconds idle_seconds")
+
+
+def daemon_settings(section=None):
+    """DaemonSettings from the "daemon" section of the project config"""
+    section = section or {}
+    idle_minutes = float(section.get("idle_minutes", DEFAULT_IDLE_MINUTES))
+    return DaemonSettings(
+        flush_seconds=max(0.0, float(section.get("flush_ms", DEFAULT_FLUSH_MS)) / 1000),
+        idle_seconds=idle_minutes * 60 if idle_minutes > 0 else None,
+    )
+
+
+class MethodUnavailable(Exception):
+    """A method this daemon cannot serve; clients run the command themselves"""
+
+
+def _send(wfile, message):
+    wfile.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+    wfile.flush()
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _text(params, name):
+    value = params.get(name)
+    if not isinstance(value, str) or not value:
+        raise DaemonError(INVALID_PARAMS, f"{name} must be a non-empty string")
+    return value
+
+
+class _OutputStream(io.TextIOBase):
+    """Text stream sending every write to the client as an output notification
+
+    Gate runners print from reader threads, hence the lock. A client
+    that went away stops receiving output; the command still finishes.
+    """
+
+    def __init__(self, wfile, name):
+        super().__init__()
+        self.wfile = wfile
+        self.name = name
+        self.broken = False
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if text and not self.broken:
+            with self._lock:
+                try:
+                    _send(self.wfile, {"jsonrpc": "2.0", "method": "output",
+                                       "params": {"stream": self.name, "text": text}})
+                except OSError:
+                    self.broken = True
+        return len(text)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.dispatch(line, self.wfile)
+            if response is not None:
+                try:
+                    _send(self.wfile, response)
+                except OSError:
+                    return
+            if self.server.stopping:
+                return
+
+
+class Daemon(socketserver.UnixStreamServer):
+    """One project's memory engine and orchestrator, kept loaded between requests"""
+
+    def __init__(self, claude_dir=".claude"):
+        self.claude_dir = os.fspath(claude_dir)
+        self.settings = daemon_settings(load_config(self.claude_dir).get("daemon"))
+        self.engine = None
+        self.orchestrator = None
+        self.started = time.time()
+        self.requests = 0
+        self.stopping = False
+        self._signature = None
+        self._dirty_since = None
+        self._last_request = time.monotonic()
+        self.methods = {
+            "daemon.ping": self.rpc_ping,
+            "daemon.flush": lambda params, wfile: {"written": self.flush()},
+            "daemon.shutdown": self.rpc_shutdown,
+            "memory.run": self.rpc_memory_run,
+            "orchestrator.status": self.orchestrator_call(lambda orch, params: orch.show_status()),
+            "orchestrator.memory": self.orchestrator_call(lambda orch, params: orch.show_memory()),
+            "orchestrator.remember": self.orchestrator_call(
+                lambda orch, params: orch.handle_memory_command(f"remember {_text(params, 'name')}")),
+            "orchestrator.run": self.orchestrator_call(
+                lambda orch, params: orch.handle_natural_language(_text(params, 'text'))),
+        }
+        self._open_engine()
+
+        path = socket_path(self.claude_dir)
+        if os.path.exists(path):
+            try:
+                call("daemon.ping", claude_dir=self.claude_dir, timeout=CONNECT_TIMEOUT)
+            except DaemonUnavailable:
+                os.unlink(path)  # left behind by a daemon that died
+            else:
+                raise RuntimeError(f"A daemon is already serving {path}")
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+
+    # Memory
+
+    def _open_engine(self):
+        if self.engine is not None:
+            self.engine.store.close()
+        self.engine = CCOMMemory(self.claude_dir)
+        self.engine.store.write_behind = True
+        if self.orchestrator is not None:
+            self.orchestrator.memory_store = self.engine.store
+        self._signature = self._disk_signature()
+
+    def _disk_signature(self):
+        signature = []
+        for path in self.engine.store.data_files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((os.fspath(path), stat.st_mtime_ns, stat.st_size))
+        return signature
+
+    def _sync_with_disk(self):
+        """Pick up memory another process wrote since the daemon last did"""
+        if current_backend(self.claude_dir) != self.engine.store.backend:
+            self._open_engine()
+        elif self._disk_signature() != self._signature:
+            self.engine.store.refresh()
+            self.engine.load_memory()
+            self._signature = self._disk_signature()
+
+    def flush(self):
+        """Write queued records to disk, returns how many there were"""
+        written = self.engine.store.flush()
+        self._dirty_since = None
+        self._signature = self._disk_signature()
+        return written
+
+    # Requests
+
+    def dispatch(self, line, wfile):
+        """Response to one request line, or None for a notification"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error(None, PARSE_ERROR, "Parse error")
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+                or not isinstance(request.get("method"), str):
+            request_id = request.get("id") if isinstance(request, dict) else None
+            return _error(request_id, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        method = self.methods.get(request["method"])
+        if method is None:
+            return _error(request_id, METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+        params = request.get("params", {})
+        if not isinstance(params, dict):
+            return _error(request_id, INVALID_PARAMS, "params must be an object")
+
+        self.requests += 1
+        try:
+            result = method(params, wfile)
+        except MethodUnavailable as e:
+            return _error(request_id, METHOD_NOT_FOUND, str(e))
+        except DaemonError as e:
+            return _error(request_id, e.code, str(e))
+        except Exception as e:
+            return _error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        finally:
+            self._last_request = time.monotonic()
+        if "id" not in request:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _run(self, command, wfile):
+        """{"ok": ...} of running command() with its output sent to the client"""
+        self._sync_with_disk()
+        stdout, stderr = _OutputStream(wfile, "stdout"), _OutputStream(wfile, "stderr")
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                ok = command() is not False
+            except SystemExit as e:
+                ok = not e.code
+            except Exception as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                ok = False
+        store = self.engine.store
+        if store.pending and self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        if store.pending and not self.settings.flush_seconds:
+            self.flush()
+        else:
+            # Snapshots and compaction write synchronously
+            self._signature = self._disk_signature()
+        return {"ok": ok}
+
+    def rpc_ping(self, params, wfile):
+        store = self.engine.store
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "backend": store.backend,
+            "pending": store.pending,
+            "orchestrator": self.orchestrator is not None,
+        }
+
+    def rpc_shutdown(self, params, wfile):
+        self.stopping = True
+        return {"written": self.flush()}
+
+    def rpc_memory_run(self, params, wfile):
+        args = params.get("args")
+        if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+            raise DaemonError(INVALID_PARAMS, "args must be a list of strings")
+        return self._run(lambda: run_command(args, engine=self.engine), wfile)
+
+    def orchestrator_call(self, action):
+        """Method running action(orchestrator, params) on the shared memory store"""
+        def method(params, wfile):
+            orchestrator = self._orchestrator()
+            return self._run(lambda: action(orchestrator, params), wfile)
+        return method
+
+    def _orchestrator(self):
+        if self.orchestrator is None:
+            try:
+                from orchestrator import CCOMOrchestrator
+            except ImportError:
+                # Source checkout: the orchestrator lives in ccom/ next to the package
+                ccom_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ccom")
+                if not os.path.exists(os.path.join(ccom_dir, "orchestrator.py")):
+                    raise MethodUnavailable("The orchestrator is not installed next to this daemon")
+                sys.path.insert(0, ccom_dir)
+                from orchestrator import CCOMOrchestrator
+            self.orchestrator = CCOMOrchestrator()
+            self.orchestrator.memory_store.close()
+            self.orchestrator.memory_store = self.engine.store
+        # Read memory from the shared store on first use in each request
+        self.orchestrator.memory = None
+        return self.orchestrator
+
+    # Serving
+
+    def _timeout(self):
+        now = time.monotonic()
+        deadlines = []
+        if self._dirty_since is not None:
+            deadlines.append(self._dirty_since + self.settings.flush_seconds)
+        if self.settings.idle_seconds:
+            deadlines.append(self._last_request + self.settings.idle_seconds)
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+    def serve(self):
+        """Serve requests until daemon.shutdown, SIGTERM or the idle timeout"""
+        try:
+            while not self.stopping:
+                self.timeout = self._timeout()
+                self.handle_request()
+                now = time.monotonic()
+                if self._dirty_since is not None and now - self._dirty_since >= self.settings.flush_seconds:
+                    self.flush()
+                if self.settings.idle_seconds and now - self._last_request >= self.settings.idle_seconds:
+                    print("Idle timeout, exiting")
+                    self.stopping = True
+        finally:
+            try:
+                self.flush()
+                self.engine.store.close()
+            finally:
+                self.server_close()
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(socket_path(self.claude_dir))
+
+
+def serve_forever(claude_dir=".claude"):
+    """Run the daemon in this process until it is stopped"""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    daemon = Daemon(claude_dir)
+    print(f"ccom daemon {os.getpid()} serving {socket_path(claude_dir)}", flush=True)
+    daemon.serve()
+
+
+def start_daemon(claude_dir=".claude"):
+    """Start a background daemon for the project in the current directory, returns its ping"""
+    import subprocess
+
+    claude_dir = os.fspath(claude_dir)
+    log_dir = os.path.join(claude_dir, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+    with open(os.path.join(log_dir, LOG_FILE), 'a', encoding='utf-8') as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "cco.daemon", "--claude-dir", claude_dir],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, env=env,
+            start_new_session=True)
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Daemon exited with status {process.returncode}, "
+                               f"see {os.path.join(log_dir, LOG_FILE)}")
+        try:
+            return call("daemon.ping", claude_dir=claude_dir, timeout=CONNECT_TIMEOUT)
+        except DaemonUnavailable:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"Daemon did not answer within {START_TIMEOUT:g}s")
+
+
+def daemon_command(action, claude_dir=".claude"):
+    """Start, stop, show or run (in the foreground) the project's daemon, returns success"""
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("ERROR: The daemon needs Unix domain sockets, which this platform lacks", file=sys.stderr)
+        return False
+    try:
+        info = call("daemon.ping", claude_dir=claude_dir, timeout=CONNECT_TIMEOUT)
+    except DaemonUnavailable:
+        info = None
+
+    if action == "status":
+        if info is None:
+            print("Daemon not running (ccom daemon start)")
+        else:
+            print(f"Daemon {info['pid']} up {info['uptime']:.0f}s, {info['requests']} requests, "
+                  f"{info['backend']} backend, {info['pending']} unwritten records")
+        return True
+    if action == "stop":
+        if info is None:
+            print("Daemon not running")
+            return True
+        result = call("daemon.shutdown", claude_dir=claude_dir, timeout=START_TIMEOUT)
+        print(f"🛑 Daemon {info['pid']} stopped ({result['written']} records written)")
+        return True
+    if info is not None:
+        print(f"Daemon {info['pid']} already running")
+        return action == "start"
+    if action == "run":
+        serve_forever(claude_dir)
+        return True
+    info = start_daemon(claude_dir)
+    print(f"🚀 Daemon {info['pid']} serving {socket_path(claude_dir)}")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a project's CCOM memory over .claude/ccom.sock")
+    parser.add_argument("--claude-dir", default=".claude", help="Project .claude directory")
+    args = parser.parse_args(argv)
+    serve_forever(args.claude_dir)
+
+
+if __name__ == "__main__":
+    main()
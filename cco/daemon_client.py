@@ -0,0 +1,112 @@
+"""Client side of the ccom daemon (see cco.daemon)
+
+The CLIs call run_in_daemon before doing any work themselves. When no
+socket exists it returns None after a single stat, without importing
+socket or json, so commands in projects without a daemon pay nothing
+for it.
+
+The protocol is JSON-RPC 2.0 over .claude/ccom.sock, one JSON document
+per line. While a request runs the daemon sends what the command prints
+as "output" notifications ({"stream": "stdout"|"stderr", "text": ...}),
+which are written to this process's own streams, then the response.
+"""
+
+import os
+import sys
+
+SOCKET_NAME = "ccom.sock"
+CONNECT_TIMEOUT = 2.0
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class DaemonUnavailable(Exception):
+    """No daemon accepted the connection"""
+
+
+class DaemonError(Exception):
+    """The daemon answered with a JSON-RPC error, or dropped the connection mid-request"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def socket_path(claude_dir=".claude"):
+    """Path of the daemon socket of a project"""
+    return os.path.join(os.fspath(claude_dir), SOCKET_NAME)
+
+
+def _write(stream, text):
+    try:
+        stream.write(text)
+    except UnicodeEncodeError:
+        stream.write(text.encode('ascii', 'replace').decode('ascii'))
+    stream.flush()
+
+
+def call(method, params=None, claude_dir=".claude", timeout=None):
+    """Result of one request to the project's daemon
+
+    Raises DaemonUnavailable when nothing accepts the connection (no
+    daemon, or a stale socket left by one that died) and DaemonError for
+    an error response. timeout bounds the whole request; None waits as
+    long as the command runs.
+    """
+    import json
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("Unix domain sockets are not available on this platform")
+    path = socket_path(claude_dir)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except OSError as e:
+            raise DaemonUnavailable(f"No daemon listening on {path}: {e}")
+        sock.settimeout(timeout)
+        request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}
+        sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b"\n")
+        with sock.makefile('r', encoding='utf-8') as reader:
+            for line in reader:
+                message = json.loads(line)
+                if "id" not in message:
+                    if message.get("method") == "output":
+                        output = message.get("params") or {}
+                        stream = sys.stderr if output.get("stream") == "stderr" else sys.stdout
+                        _write(stream, output.get("text", ""))
+                    continue
+                if "error" in message:
+                    error = message["error"]
+                    raise DaemonError(error.get("code"), error.get("message", "daemon error"))
+                return message.get("result")
+    finally:
+        sock.close()
+    raise DaemonError(INTERNAL_ERROR, "Daemon closed the connection before answering")
+
+
+def run_in_daemon(method, params=None, claude_dir=".claude"):
+    """Result of a request when a daemon serves this project, else None to run it locally
+
+    A daemon without the method (one started outside the source tree
+    has no orchestrator) also yields None. Other errors are raised: the
+    request reached the daemon and may have had effects, so running it
+    again locally is not safe.
+    """
+    if not os.path.exists(socket_path(claude_dir)):
+        return None
+    try:
+        return call(method, params, claude_dir)
+    except DaemonUnavailable:
+        return None
+    except DaemonError as e:
+        if e.code == METHOD_NOT_FOUND:
+            return None
+        raise
@@ -0,0 +1,167 @@
+"""Indexed duplicate detection for remembered features
+
+DuplicateIndex answers the exact check from ccom.js checkDuplicate
+(case-insensitive match on a feature name or its user term) with a hash
+lookup, and finds near-duplicates such as "auth system" vs
+"authentication system" through an inverted index of token prefixes.
+
+Similarity is token based: equal tokens score 1, and a token of at least
+PREFIX_LENGTH characters that is a prefix of the other abbreviates it and
+scores between 0.5 and 1 by the share of the longer token it covers
+("auth" / "authentication" 0.64, "user" / "users" 0.9). The score is the
+sum over matched tokens / max(token counts), so an abbreviation alone
+never makes a perfect match. Candidates come from the index using prefix filtering: a candidate
+scoring at least the threshold must share one of the query's rarest
+keys, so only those posting lists are read.
+"""
+
+import math
+import re
+
+from cco.util import normalize_name
+
+PREFIX_LENGTH = 3
+DEFAULT_THRESHOLD = 0.6
+
+_CAMEL_BOUNDARY = re.compile(r'([a-z0-9])([A-Z])')
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Split a feature name into lowercase word tokens (handles snake_case and camelCase)"""
+    return _TOKEN.findall(_CAMEL_BOUNDARY.sub(r'\1 \2', text or "").lower())
+
+
+def index_keys(tokens):
+    """Inverted index keys for a token list"""
+    return {token[:PREFIX_LENGTH] for token in tokens}
+
+
+def token_score(a, b):
+    """1.0 for equal tokens, 0.5 - 1.0 when one abbreviates the other, else 0.0"""
+    if a == b:
+        return 1.0
+    short, long_ = (a, b) if len(a) <= len(b) else (b, a)
+    if len(short) < PREFIX_LENGTH or not long_.startswith(short):
+        return 0.0
+    return (1 + len(short) / len(long_)) / 2
+
+
+def similarity(query_tokens, tokens):
+    """Share of tokens matched between two token lists, 0.0 - 1.0
+
+    Each query token takes its best-scoring remaining token, so a prefix
+    match never uses up a token that another query token equals.
+    """
+    if not query_tokens or not tokens:
+        return 0.0
+    remaining = list(tokens)
+    matched = 0.0
+    for token in query_tokens:
+        best, best_index = 0.0, None
+        for i, other in enumerate(remaining):
+            score = token_score(token, other)
+            if score > best:
+                best, best_index = score, i
+                if score == 1.0:
+                    break
+        if best_index is not None:
+            matched += best
+            del remaining[best_index]
+    return matched / max(len(query_tokens), len(tokens))
+
+
+def feature_terms(name, data):
+    """Distinct names a feature is known by: its name and user term"""
+    terms = [name]
+    term = (data or {}).get("userTerm")
+    if term and normalize_name(term) != normalize_name(name):
+        terms.append(term)
+    return terms
+
+
+class DuplicateIndex:
+    """Exact hash index plus token-prefix index over feature names and user terms"""
+
+    def __init__(self, features=None):
+        self._exact = {}     # normalized term -> feature names in insertion order
+        self._postings = {}  # token prefix -> feature names
+        self._terms = {}     # feature name -> token lists of its terms
+        for name, data in (features or {}).items():
+            self.add(name, data)
+
+    def __len__(self):
+        return len(self._terms)
+
+    def add(self, name, data):
+        """Index a feature"""
+        if name in self._terms:
+            self.remove(name)
+        token_lists = []
+        for term in feature_terms(name, data):
+            self._exact.setdefault(normalize_name(term), []).append(name)
+            tokens = tokenize(term)
+            token_lists.append(tokens)
+            for key in index_keys(tokens):
+                self._postings.setdefault(key, set()).add(name)
+        self._terms[name] = (data, token_lists)
+
+    def remove(self, name):
+        """Drop a feature from the index"""
+        entry = self._terms.pop(name, None)
+        if entry is None:
+            return
+        data, token_lists = entry
+        for term in feature_terms(name, data):
+            names = self._exact.get(normalize_name(term))
+            if names and name in names:
+                names.remove(name)
+                if not names:
+                    del self._exact[normalize_name(term)]
+        for tokens in token_lists:
+            for key in index_keys(tokens):
+                names = self._postings.get(key)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del self._postings[key]
+
+    def find_duplicate(self, name):
+        """Feature whose name or user term equals name case-insensitively, else None"""
+        names = self._exact.get(normalize_name(name))
+        return names[0] if names else None
+
+    def find_similar(self, name, threshold=DEFAULT_THRESHOLD, limit=5):
+        """Near-duplicate features ranked by similarity, as (score, name) pairs"""
+        query = tokenize(name)
+        if not query:
+            return []
+
+        candidates = set()
+        for key in rarest_keys(query, threshold, lambda key: len(self._postings.get(key, ()))):
+            candidates.update(self._postings.get(key, ()))
+
+        return rank_candidates(query, ((c, self._terms[c][1]) for c in candidates), threshold, limit)
+
+
+def rarest_keys(query_tokens, threshold, frequency):
+    """Keys that every candidate scoring >= threshold must share at least one of"""
+    keys = sorted(index_keys(query_tokens), key=frequency)
+    # A qualifying candidate matches ceil(threshold * tokens) query tokens, as
+    # each scores at most 1, and matching tokens share their key; tokens sharing
+    # a key can collapse that to fewer distinct keys. Skipping the need-1 most
+    # frequent keys is safe.
+    duplicates = len(query_tokens) - len(keys)
+    need = max(1, math.ceil(threshold * len(query_tokens) - 1e-9) - duplicates)
+    return keys[:len(keys) - need + 1]
+
+
+def rank_candidates(query_tokens, candidates, threshold, limit):
+    """Score (name, token_lists) candidates and return the best (score, name) pairs"""
+    scored = []
+    for name, token_lists in candidates:
+        score = max(similarity(query_tokens, tokens) for tokens in token_lists)
+        if score >= threshold:
+            scored.append((round(score, 3), name))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return scored[:limit]
@@ -0,0 +1,197 @@
+"""Content-addressed cache of lint, build and test results
+
+A gate's result is stored in .claude/cache/gates.json under a key that
+hashes the gate name, its command and every input it can depend on:
+project source files, package.json, the lockfile and tool configuration.
+When none of those changed since the last run, the gate is skipped and
+its recorded exit status and output are reported instead.
+
+A gate can instead declare its own inputs as fnmatch patterns on paths
+relative to the project root ("src/*.ts", "package.json"); its key then
+hashes only the files they match, so unrelated edits keep its result.
+
+Build output is not an input, but a build's result is only worth reusing
+while its output is still there: a gate can name its output directories
+(BUILD_OUTPUT_DIRS for builds), and its key then also covers which of
+them exist and the path, size and mtime of every file in them. Deleting
+or replacing the output reruns the build.
+
+Hashing the inputs reads each file only when its size or mtime changed;
+per-file digests are kept alongside the results.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from cco.journal import write_atomic
+from cco.walker import DEFAULT_EXCLUDED_DIRS, walk_files
+
+CACHE_VERSION = 1
+
+INPUT_EXTENSIONS = (
+    ".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs", ".json", ".css", ".scss", ".sass",
+    ".less", ".html", ".vue", ".svelte", ".yaml", ".yml", ".py", ".env",
+)
+# Extensionless or dotfile inputs: lockfiles and tool configuration
+INPUT_FILES = (
+    "yarn.lock", ".eslintrc", ".eslintignore", ".prettierrc", ".prettierignore", ".babelrc",
+    ".browserslistrc", ".npmrc", ".nvmrc", ".gitignore",
+)
+# Build output and caches; rebuilding them must not invalidate the gates
+OUTPUT_DIRS = frozenset({".claude", "dist", "build", "out", "coverage", ".next", ".nuxt",
+                         ".cache", ".parcel-cache", ".turbo"})
+# Where npm run build usually writes; the build gate's result is keyed on them
+BUILD_OUTPUT_DIRS = ("dist", "build", "out", ".next")
+
+# Output kept per stream for a cached result
+MAX_OUTPUT_CHARS = 64 * 1024
+
+
+class GateCache:
+    """Gate results keyed by a hash of their inputs"""
+
+    def __init__(self, project_root, cache_path=None, exclude_dirs=None):
+        self.project_root = Path(project_root)
+        self.cache_path = Path(cache_path) if cache_path else \
+            self.project_root / ".claude" / "cache" / "gates.json"
+        self.exclude_dirs = DEFAULT_EXCLUDED_DIRS | OUTPUT_DIRS | frozenset(exclude_dirs or ())
+        self.files = {}    # relative path -> [size, mtime_ns, sha1]
+        self.results = {}  # gate name -> entry
+        self._inputs = None
+        self._declared = {}  # tuple of patterns -> digest
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.files = data.get("files", {})
+            self.results = data.get("results", {})
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.cache_path, json.dumps(
+            {"version": CACHE_VERSION, "files": self.files, "results": self.results},
+            separators=(',', ':')))
+
+    def _input_paths(self):
+        paths = set(walk_files(self.project_root, INPUT_EXTENSIONS, self.exclude_dirs))
+        for name in INPUT_FILES:
+            path = self.project_root / name
+            if path.is_file():
+                paths.add(str(path))
+        return sorted(paths)
+
+    def _file_digest(self, path, rel_path):
+        stat = os.stat(path)
+        known = self.files.get(rel_path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha1.update(block)
+        digest = sha1.hexdigest()
+        self.files[rel_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def _declared_paths(self, patterns):
+        for path in walk_files(self.project_root, None, self.exclude_dirs):
+            rel_path = os.path.relpath(path, self.project_root).replace(os.sep, "/")
+            if any(fnmatch.fnmatchcase(rel_path, pattern) for pattern in patterns):
+                yield path
+
+    def _digest(self, paths):
+        combined = hashlib.sha256()
+        seen = set()
+        for path in paths:
+            rel_path = os.path.relpath(path, self.project_root).replace(os.sep, "/")
+            try:
+                digest = self._file_digest(path, rel_path)
+            except OSError:
+                continue
+            seen.add(rel_path)
+            combined.update(f"{rel_path}\0{digest}\n".encode('utf-8'))
+        return combined.hexdigest(), seen
+
+    def inputs_digest(self, patterns=None):
+        """Hash over the path and content of every gate input, computed once
+
+        patterns narrows the inputs to the files a gate declares.
+        """
+        if patterns:
+            key = tuple(patterns)
+            if key not in self._declared:
+                self._declared[key] = self._digest(sorted(self._declared_paths(key)))[0]
+            return self._declared[key]
+        if self._inputs is None:
+            self._inputs, seen = self._digest(self._input_paths())
+            # Keep digests of files only some gate declares
+            for rel_path in [key for key in self.files if key not in seen]:
+                if not os.path.isfile(os.path.join(self.project_root, rel_path)):
+                    del self.files[rel_path]
+        return self._inputs
+
+    def outputs_signature(self, dirs):
+        """Hash over which output directories exist and the path, size and mtime of their files
+
+        Computed on every call, as the gate being cached rewrites them.
+        """
+        combined = hashlib.sha256()
+        for name in dirs:
+            directory = os.path.join(self.project_root, name)
+            if not os.path.isdir(directory):
+                combined.update(f"{name}\0-\n".encode('utf-8'))
+                continue
+            combined.update(f"{name}\0+\n".encode('utf-8'))
+            for path in sorted(walk_files(directory, None, frozenset(), use_gitignore=False)):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                rel_path = os.path.relpath(path, self.project_root).replace(os.sep, "/")
+                combined.update(f"{rel_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+        return combined.hexdigest()
+
+    def invalidate(self):
+        """Rehash inputs on next use, after something (like a fix) rewrote files"""
+        self._inputs = None
+        self._declared = {}
+
+    def key(self, name, command, inputs=None, outputs=None):
+        parts = [CACHE_VERSION, name, command, self.inputs_digest(inputs)]
+        if outputs:
+            parts.append(self.outputs_signature(outputs))
+        payload = json.dumps(parts)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, name, command, inputs=None, outputs=None):
+        """Cached {"returncode", "stdout", "stderr", "duration", "recorded"} for unchanged inputs
+
+        inputs are the gate's declared input patterns, None for every gate
+        input; outputs are its output directories, which must be as it left them.
+        """
+        entry = self.results.get(name)
+        if entry and entry.get("key") == self.key(name, command, inputs, outputs):
+            return entry
+        return None
+
+    def store(self, name, command, returncode, stdout, stderr, duration, inputs=None,
+              outputs=None):
+        """Record a gate run against the current inputs and the outputs it left"""
+        self.results[name] = {
+            "key": self.key(name, command, inputs, outputs),
+            "returncode": returncode,
+            "stdout": (stdout or "")[-MAX_OUTPUT_CHARS:],
+            "stderr": (stderr or "")[-MAX_OUTPUT_CHARS:],
+            "duration": round(duration, 3),
+            "recorded": time.time(),
+        }
+        self.save()
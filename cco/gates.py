@@ -0,0 +1,154 @@
+"""Deployment gate checks: one lint, audit, scan, build or test run
+
+run_gate runs a gate's check, a shell command run as a subprocess
+through cco.runner (output streamed and logged, stopped early when it
+matches a failure pattern) or a callable, and reports it as a
+GateResult: passed, failed, timed out, cancelled (its process group is
+killed) or errored. Cacheable shell gates reuse the result a
+cco.gate_cache.GateCache recorded while their inputs are unchanged.
+run_fix runs a failed gate's fix command (lint --fix, audit fix). With
+cco.tracing on, every gate is a span on its own track.
+
+Scheduling lives in cco.workflow: gates are the steps of a workflow
+graph, run concurrently as their needs are met on the thread pool given
+to use_executor.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import namedtuple
+
+from cco.runner import StreamingProcess
+from cco.tracing import span
+
+DEFAULT_TIMEOUT = 60
+# Gates mostly wait on npm and child processes, so run several even on one core
+DEFAULT_CONCURRENCY = max(4, os.cpu_count() or 1)
+# Lines of output shown for a failed gate
+OUTPUT_TAIL_LINES = 20
+
+Gate = namedtuple("Gate", "name label command timeout blocking fix evaluate cacheable echo "
+                          "inputs cache_failures outputs",
+                  defaults=(DEFAULT_TIMEOUT, True, None, None, False, True, None, True, None))
+Gate.__doc__ = """A deployment check
+
+command is a shell command or a callable returning True when the gate
+passes. evaluate(returncode, stdout) overrides the default
+returncode == 0 check for shell commands. fix is a shell command run when
+the check fails; the gate passes if the fix succeeds. cacheable shell
+gates reuse a result recorded by a cco.gate_cache.GateCache when their
+inputs (every gate input, or the fnmatch patterns in inputs) are
+unchanged and the directories in outputs are as the gate left them;
+cache_failures=False records and reuses passing results only,
+for checks worth running again. echo=False keeps a gate's output off the
+console (it is still logged).
+"""
+
+GateResult = namedtuple("GateResult", "gate status duration output cached", defaults=(False,))
+
+# Thread pool of the run in progress; gate subprocesses are awaited on it
+_executor = contextvars.ContextVar("gate_executor")
+
+PASSED, FIXED, FAILED, TIMEOUT, CANCELLED, ERROR = (
+    "passed", "fixed", "failed", "timed out", "cancelled", "error")
+
+
+async def _run_shell(command, timeout, cwd, name, settings=None, keep_stdout=False, echo=None):
+    """Run a shell command through the streaming runner, returning (returncode, stdout, stderr)
+
+    Raises asyncio.TimeoutError on timeout; the process group is stopped
+    on timeout or cancellation.
+    """
+    process = StreamingProcess(command, name, cwd, settings, keep_stdout, echo).start()
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(_executor.get(), process.wait, timeout)
+    except BaseException:
+        process.terminate()
+        raise
+    if result.timed_out:
+        raise asyncio.TimeoutError()
+    return result.returncode, result.stdout, result.stderr
+
+
+def _passed(gate, returncode, stdout):
+    if gate.evaluate is not None:
+        return bool(gate.evaluate(returncode, stdout))
+    return returncode == 0
+
+
+async def _run_check(gate, cwd, cache=None, settings=None):
+    """Run a gate's check, returning (passed, output, cached)"""
+    if callable(gate.command):
+        loop = asyncio.get_running_loop()
+        # Run in a copy of this context so spans opened by the callable nest under the gate
+        passed = await asyncio.wait_for(
+            loop.run_in_executor(_executor.get(), contextvars.copy_context().run, gate.command),
+            gate.timeout)
+        return bool(passed), "", False
+    cacheable = cache is not None and gate.cacheable
+    entry = cache.lookup(gate.name, gate.command, gate.inputs, gate.outputs) if cacheable else None
+    if entry is not None:
+        stdout, stderr = entry["stdout"], entry["stderr"]
+        passed = _passed(gate, entry["returncode"], stdout)
+        if passed or gate.cache_failures:
+            return passed, stdout + stderr, True
+    start = time.perf_counter()
+    returncode, stdout, stderr = await _run_shell(
+        gate.command, gate.timeout, cwd, gate.name, settings,
+        keep_stdout=gate.evaluate is not None, echo=None if gate.echo else False)
+    passed = _passed(gate, returncode, stdout)
+    if cacheable and (passed or gate.cache_failures):
+        cache.store(gate.name, gate.command, returncode, stdout, stderr,
+                    time.perf_counter() - start, gate.inputs, gate.outputs)
+    return passed, stdout + stderr, False
+
+
+def use_executor(executor):
+    """Run the gate subprocesses and callables of this context on executor"""
+    _executor.set(executor)
+
+
+async def run_gate(gate, cwd, cache=None, settings=None):
+    """Run one gate's check and return its GateResult; needs use_executor first"""
+    with span(gate.name, "gate", track=f"gate {gate.name}", label=gate.label) as gate_span:
+        start = time.perf_counter()
+        cached = False
+        try:
+            passed, output, cached = await _run_check(gate, cwd, cache, settings)
+            status = PASSED if passed else FAILED
+        except asyncio.TimeoutError:
+            status, output = TIMEOUT, ""
+        except asyncio.CancelledError:
+            gate_span.set(status=CANCELLED)
+            return GateResult(gate, CANCELLED, time.perf_counter() - start, "")
+        except Exception as e:
+            status, output = ERROR, str(e)
+        gate_span.set(status=status, cached=cached)
+        return GateResult(gate, status, time.perf_counter() - start, output, cached)
+
+
+async def run_fix(result, cwd, settings=None):
+    """Run a failed gate's fix command, returning its FIXED or failed GateResult"""
+    name = f"{result.gate.name}-fix"
+    with span(name, "gate", track=f"gate {result.gate.name}") as fix_span:
+        start = time.perf_counter()
+        try:
+            returncode, stdout, stderr = await _run_shell(
+                result.gate.fix, result.gate.timeout, cwd, name, settings)
+            output = stdout + stderr
+            status = FIXED if returncode == 0 else FAILED
+        except asyncio.TimeoutError:
+            status, output = TIMEOUT, ""
+        except Exception as e:
+            status, output = ERROR, str(e)
+        fix_span.set(status=status)
+    return GateResult(result.gate, status, result.duration + time.perf_counter() - start,
+                      output or result.output)
+
+
+def output_tail(output, lines=OUTPUT_TAIL_LINES):
+    """Last lines of a gate's output"""
+    return "\n".join(output.strip().splitlines()[-lines:])
@@ -0,0 +1,124 @@
+"""Row readers for ccom import
+
+read_rows turns a JSONL or CSV stream into Row tuples, one per record,
+without reading the whole input first. A row carries either the feature
+name and its data or the reason it cannot be imported, so a bad line is
+reported in place instead of failing the import.
+
+JSONL records are objects; CSV needs a header row. The name comes from
+the first of NAME_FIELDS present, the description from
+DESCRIPTION_FIELDS, files from a list (JSONL) or a string separated by
+FILE_SEPARATOR, and an optional created date is kept, normalized to UTC,
+so features imported from a changelog age like the ones remembered at
+the time. Other fields are ignored, which lets issue tracker exports be
+piped in as they are.
+"""
+
+import csv
+import itertools
+import json
+from collections import namedtuple
+
+from cco.util import iso_timestamp, parse_date
+
+FORMATS = ("jsonl", "csv")
+NAME_FIELDS = ("name", "userTerm", "title", "feature")
+DESCRIPTION_FIELDS = ("description", "summary", "body")
+FILE_SEPARATOR = ";"
+
+Row = namedtuple("Row", "line name data error")
+Outcome = namedtuple("Outcome", "line name status detail")
+
+
+def detect_format(path, first_line=""):
+    """Input format from the file extension, else from the first line"""
+    lowered = (path or "").lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "jsonl" if first_line.lstrip().startswith("{") else "csv"
+
+
+def _first(fields, names):
+    for name in names:
+        value = fields.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def parse_fields(fields):
+    """(name, data) of one record's fields, raises ValueError when it cannot be imported"""
+    name = _first(fields, NAME_FIELDS)
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError(f"no {' / '.join(NAME_FIELDS)} field")
+    name = name.strip()
+
+    description = _first(fields, DESCRIPTION_FIELDS)
+    files = fields.get("files") or []
+    if isinstance(files, str):
+        files = [path.strip() for path in files.split(FILE_SEPARATOR) if path.strip()]
+    elif not isinstance(files, list) or not all(isinstance(path, str) for path in files):
+        raise ValueError("files must be a list of paths")
+    data = {
+        "description": "" if description is None else str(description).strip(),
+        "files": files,
+        "userTerm": name,
+    }
+
+    created = fields.get("created")
+    if created not in (None, ""):
+        if isinstance(created, str) and len(created.strip()) == 10:
+            # A bare date is a UTC day, as in JavaScript's Date
+            created = created.strip() + "T00:00:00Z"
+        parsed = parse_date(created)
+        if parsed is None:
+            raise ValueError(f"invalid created date {created!r}")
+        data["created"] = iso_timestamp(parsed)
+    return name, data
+
+
+def _row(line, fields):
+    try:
+        name, data = parse_fields(fields)
+    except ValueError as e:
+        return Row(line, _first(fields, NAME_FIELDS), None, str(e))
+    return Row(line, name, data, None)
+
+
+def _jsonl_rows(lines):
+    for line, text in enumerate(lines, 1):
+        if not text.strip():
+            continue
+        try:
+            fields = json.loads(text)
+        except ValueError as e:
+            yield Row(line, None, None, f"invalid JSON: {e}")
+            continue
+        if not isinstance(fields, dict):
+            yield Row(line, None, None, "not a JSON object")
+            continue
+        yield _row(line, fields)
+
+
+def _csv_rows(lines):
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return
+    line = reader.line_num + 1
+    for fields in reader:
+        if None in fields:
+            yield Row(line, None, None, "more values than header columns")
+        elif any(value not in (None, "") for value in fields.values()):
+            yield _row(line, fields)
+        line = reader.line_num + 1
+
+
+def read_rows(stream, path=None, fmt=None):
+    """Rows of a JSONL or CSV text stream; fmt None detects it (see detect_format)"""
+    first_line = stream.readline()
+    lines = itertools.chain([first_line], stream)
+    if (fmt or detect_format(path, first_line)) == "csv":
+        return _csv_rows(lines)
+    return _jsonl_rows(lines)
@@ -0,0 +1,678 @@
+"""Write-ahead journal for CCOM memory
+
+memory.json stays the snapshot. Each mutation appends one JSON line to
+memory.journal instead of rewriting the snapshot; loading replays the
+journal on top of the snapshot, and once the journal grows past a
+threshold it is folded back into the snapshot on a background thread.
+Every record is idempotent, so replaying a journal over a snapshot that
+already contains it is harmless.
+
+With write_behind set (the daemon, see cco.daemon) append only applies
+records to the loaded memory and queues them, and flush writes the queue
+as one line, a batch of the records left after coalesce, with a single
+fsync.
+
+Several processes may write at once (parallel sessions, hooks, the
+daemon). Writers hold the project's lock (cco.locking) and first catch
+up with what others wrote, replaying the journal from where they last
+read, or reloading when the snapshot was replaced. metadata.revision
+counts writes: every journal line sets the next one, and the journal
+opens with a "base" record naming the snapshot revision it extends, so a
+reader that meets a journal left over from an older snapshot ignores it.
+Readers take no lock; the snapshot is only ever replaced by rename and
+journal lines are appended whole, and a read that raced a snapshot
+replacement is retried. A whole memory saved from a copy read before
+another process wrote (snapshot(memory) at an older revision) is merged
+feature by feature with what is on disk (merge_memory) rather than
+overwriting it.
+"""
+
+import json
+import os
+import threading
+
+from cco.dedupe import DuplicateIndex
+from cco.locking import LOCK_FILE, shared_lock
+from cco.relevance import RelevanceIndex
+from cco.util import normalize_name, parse_date
+
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+REVISION_PATH = ("metadata", "revision")
+# Reads of a snapshot replaced mid-read before settling for the last one
+READ_ATTEMPTS = 5
+
+
+def apply_record(memory, record):
+    """Apply one journal record to a memory dict, returning the new memory
+
+    Dicts below the top-level sections (a feature's data) are copied
+    before a nested change rather than modified, so a copy of a section
+    (MergeBase) keeps the values it was taken with.
+    """
+    op = record.get("op")
+    if op == "set":
+        *parents, key = record["path"]
+        target = _parent(memory, parents, create=True)
+        target[key] = record["value"]
+    elif op == "delete":
+        *parents, key = record["path"]
+        target = _parent(memory, parents, create=False)
+        if target is not None:
+            target.pop(key, None)
+    elif op == "batch":
+        for sub in record["ops"]:
+            memory = apply_record(memory, sub)
+    elif op == "replace":
+        memory = record["value"]
+    return memory
+
+
+def _parent(memory, parents, create):
+    target = memory
+    for depth, part in enumerate(parents):
+        child = target.get(part)
+        if not isinstance(child, dict):
+            if not create:
+                return None
+            child = {}
+        elif depth:
+            child = dict(child)
+        target[part] = child
+        target = child
+    return target
+
+
+def set_op(path, value):
+    """Journal record setting the value at path, e.g. ("features", name)"""
+    return {"op": "set", "path": list(path), "value": value}
+
+
+def delete_op(path):
+    """Journal record deleting the value at path"""
+    return {"op": "delete", "path": list(path)}
+
+
+def batch_op(ops):
+    """Journal record applying several records as one atomic line"""
+    return {"op": "batch", "ops": list(ops)}
+
+
+def base_op(revision):
+    """Journal header naming the snapshot revision the journal extends"""
+    return {"op": "base", "revision": revision}
+
+
+def _flatten(records):
+    for record in records:
+        if record.get("op") == "batch":
+            yield from _flatten(record["ops"])
+        else:
+            yield record
+
+
+def coalesce(records):
+    """records as a flat list, less those a later set of the same path overwrites
+
+    Only set and delete records are dropped, and only for a later set: a
+    later delete does not qualify, since set creates missing parents the
+    delete would leave behind. The batches are flattened, so the result
+    must be written as one record to keep them atomic.
+    """
+    records = list(_flatten(records))
+    last_set = {}
+    for position, record in enumerate(records):
+        if record.get("op") == "set":
+            last_set[tuple(record["path"])] = position
+    return [record for position, record in enumerate(records)
+            if record.get("op") not in ("set", "delete")
+            or last_set.get(tuple(record["path"]), position) <= position]
+
+
+def revision_of(memory):
+    """Write counter of a memory dict, 0 before its first counted write"""
+    return ((memory or {}).get("metadata") or {}).get("revision", 0)
+
+
+def has_revision(memory):
+    """Whether memory was read from disk, rather than built from scratch"""
+    return "revision" in ((memory or {}).get("metadata") or {})
+
+
+def merge_memory(base, ours, theirs):
+    """Three-way merge of feature maps, returns (memory, conflicting names)
+
+    base is the features ours and theirs both started from, or None when
+    that is no longer known. A feature only one side changed takes that
+    side's value; one both changed differently keeps ours (or theirs, if
+    ours deleted it) and is reported. Without a base, features missing from either side are kept
+    rather than treated as deleted. Other sections come from ours, the
+    token totals are recounted.
+    """
+    from cco.tokens import feature_tokens, token_state
+
+    merged_features = dict(theirs.get("features") or {})
+    ours_features = ours.get("features") or {}
+    conflicts = []
+    if base is None:
+        for name, data in ours_features.items():
+            if name in merged_features and merged_features[name] != data:
+                conflicts.append(name)
+            merged_features[name] = data
+    else:
+        for name in set(base) | set(ours_features):
+            old = base.get(name, _MISSING)
+            mine = ours_features.get(name, _MISSING)
+            if mine is old or mine == old:
+                continue
+            other = merged_features.get(name, _MISSING)
+            if other != old and other != mine:
+                conflicts.append(name)
+            if mine is _MISSING:
+                if other == old:
+                    merged_features.pop(name, None)
+            else:
+                merged_features[name] = mine
+
+    merged = dict(ours, features=merged_features)
+    metadata = dict(merged.get("metadata") or {})
+    metadata["revision"] = max(revision_of(ours), revision_of(theirs))
+    total = sum(data.get("tokens") or feature_tokens(name, data)
+                for name, data in merged_features.items())
+    metadata["tokens"] = token_state(total, len(merged_features))
+    merged["metadata"] = metadata
+    return merged, sorted(conflicts)
+
+
+_MISSING = object()
+
+
+class MergeBase:
+    """Features as of the last revision a store read or wrote, and the one it last reloaded over
+
+    They are the bases merge_memory needs for a memory saved from an
+    earlier read. Feature data is shared, not copied; records replace it
+    rather than change it (apply_record).
+    """
+
+    def __init__(self):
+        self._bases = []
+
+    def remember(self, memory):
+        """Record memory as what disk holds"""
+        revision = revision_of(memory)
+        kept = [base for base in self._bases[-1:] if base[0] != revision]
+        self._bases = kept + [(revision, dict(memory.get("features") or {}))]
+
+    def advance(self, memory, touched):
+        """Move the latest base to memory after records changing touched features"""
+        if not self._bases or touched is None:
+            self.remember(memory)
+            return
+        # In place: the earlier base is the one kept by the last remember
+        _, features = self._bases[-1]
+        current = memory.get("features") or {}
+        for name in touched:
+            if name in current:
+                features[name] = current[name]
+            else:
+                features.pop(name, None)
+        self._bases[-1] = (revision_of(memory), features)
+
+    def at(self, revision):
+        """Features as of revision, or None when not remembered"""
+        for known, features in self._bases:
+            if known == revision:
+                return features
+        return None
+
+
+def write_atomic(path, text):
+    """Write text to path via a temp file and rename so readers never see a partial file"""
+    # Per-process temp name, concurrent writers must not share it
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _file_key(path):
+    """Identity of the file at path, changed whenever it is replaced"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class MemoryJournal:
+    """memory.json snapshot plus an append-only memory.journal (the "json" backend)"""
+
+    backend = "json"
+
+    def __init__(self, claude_dir, compact_threshold=COMPACT_THRESHOLD_BYTES):
+        self.claude_dir = os.fspath(claude_dir)
+        self.snapshot_path = os.path.join(self.claude_dir, "memory.json")
+        self.journal_path = os.path.join(self.claude_dir, "memory.journal")
+        self.compact_threshold = compact_threshold
+        self.write_behind = False
+        self.memory = None
+        self._pending = []
+        self._lock = threading.RLock()
+        self._file_lock = shared_lock(os.path.join(self.claude_dir, LOCK_FILE))
+        self._bases = MergeBase()
+        # Snapshot identity and journal bytes the loaded memory reflects
+        self._snapshot_key = None
+        self._journal_offset = 0
+        self._compactor = None
+        self._index = None
+        self._relevance = None
+        self._range = None
+
+    def open(self):
+        """Load memory if needed, returns False when there is no valid memory yet"""
+        if self.memory is None:
+            self.load()
+        return self.memory is not None
+
+    def close(self):
+        """Write queued records and wait for pending background work"""
+        self.flush()
+        self.wait()
+
+    def load(self):
+        """Load the snapshot and replay the journal, or return None if there is no valid snapshot"""
+        with self._lock:
+            self.flush()
+            return self._read(locked=False)
+
+    def _read(self, locked):
+        for _ in range(READ_ATTEMPTS):
+            key = _file_key(self.snapshot_path)
+            try:
+                with open(self.snapshot_path, encoding='utf-8') as f:
+                    memory = json.load(f)
+            except Exception:
+                return None
+            memory, offset = self._replay(memory, 0, apply_record, locked)
+            if _file_key(self.snapshot_path) == key:
+                break
+        self.memory = memory
+        self._snapshot_key = key
+        self._journal_offset = offset
+        self._index = None
+        self._relevance = None
+        self._range = None
+        self._bases.remember(memory)
+        return memory
+
+    def _replay(self, memory, offset, apply, locked):
+        """Apply the journal from byte offset on, returns (memory, offset read up to)
+
+        Only a writer (locked) repairs the journal: it truncates a torn
+        tail and removes a journal left over from an older snapshot.
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return memory, 0
+
+        valid_size = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # Torn write from a crash mid-append
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if record.get("op") == "base" and offset + valid_size == 0 \
+                    and record.get("revision") != revision_of(memory):
+                # Written for an older snapshot: its records are in this one
+                if locked:
+                    os.unlink(self.journal_path)
+                return memory, 0
+            memory = apply(memory, record)
+            valid_size += len(line)
+
+        if locked and valid_size < len(data):
+            # Drop the torn tail so later appends start on a clean line
+            os.truncate(self.journal_path, offset + valid_size)
+        return memory, offset + valid_size
+
+    def transaction(self):
+        """Context manager holding the project's write lock, with memory caught up to disk
+
+        Engine methods check and build their records inside it, so what
+        they read cannot change before their write lands.
+        """
+        return _Transaction(self)
+
+    def _catch_up(self):
+        pending = self._pending
+        if self.memory is None or _file_key(self.snapshot_path) != self._snapshot_key:
+            if self._read(locked=True) is None:
+                return
+        else:
+            def apply(memory, record):
+                touched = self._apply(record)
+                if not pending:
+                    self._bases.advance(self.memory, touched)
+                return self.memory
+            _, self._journal_offset = self._replay(
+                self.memory, self._journal_offset, apply, locked=True)
+        for record in pending:
+            self._apply(record)
+
+    def _apply(self, record):
+        """Apply a record to the loaded memory and indexes, returns _touched_features"""
+        touched = _touched_features(record)
+        indexes = [index for index in (self._index, self._relevance) if index is not None]
+        if touched is not None:
+            for index in indexes:
+                for name in touched:
+                    index.remove(name)
+        self.memory = apply_record(self.memory, record)
+        if touched is None or touched:
+            self._range = None
+        if touched is None:
+            self._index = None
+            self._relevance = None
+        else:
+            for index in indexes:
+                for name in touched:
+                    if name in self.memory["features"]:
+                        index.add(name, self.memory["features"][name])
+        return touched
+
+    def append(self, record):
+        """Apply a record to the loaded memory and append it to the journal"""
+        with self.transaction():
+            self._apply(record)
+            if self.write_behind:
+                self._pending.append(record)
+                return True
+            if not os.path.exists(self.snapshot_path):
+                # A journal is only meaningful on top of a snapshot
+                return self.snapshot()
+            self._commit([record])
+        self._compact_if_large()
+        return True
+
+    def flush(self):
+        """Write the records queued by write_behind as one journal line, returns how many were queued"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            with self.transaction():
+                pending = self._pending
+                if not os.path.exists(self.snapshot_path):
+                    self.snapshot()
+                    return len(pending)
+                self._pending = []
+                self._commit(coalesce(pending))
+        self._compact_if_large()
+        return len(pending)
+
+    def _commit(self, records):
+        """Journal already applied records as one line taking the next revision"""
+        revision = revision_of(self.memory) + 1
+        self.memory = apply_record(self.memory, set_op(REVISION_PATH, revision))
+        record = batch_op(list(_flatten(records)) + [set_op(REVISION_PATH, revision)])
+        self._journal_offset = self._write(record)
+        self._bases.advance(self.memory, _touched_features(record))
+
+    @property
+    def pending(self):
+        """Number of records queued by write_behind"""
+        return len(self._pending)
+
+    def data_files(self):
+        """Files holding this store's memory"""
+        return [self.snapshot_path, self.journal_path]
+
+    def refresh(self):
+        """Reload memory that another process changed on disk"""
+        self.load()
+
+    def _write(self, record):
+        """Append record as a line, returns the journal size after it"""
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n"
+        os.makedirs(self.claude_dir, exist_ok=True)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            if f.tell() == 0:
+                base = base_op(revision_of(self.memory) - 1)
+                f.write(json.dumps(base, separators=(',', ':')) + "\n")
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def _compact_if_large(self):
+        if self.compact_threshold and self.journal_size() > self.compact_threshold:
+            self.compact(background=True)
+
+    def set(self, path, value):
+        """Set the value at path and journal the change"""
+        return self.append(set_op(path, value))
+
+    def delete(self, path):
+        """Delete the value at path and journal the change"""
+        return self.append(delete_op(path))
+
+    def journal_size(self):
+        """Current size of the journal file in bytes"""
+        try:
+            return os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return 0
+
+    def snapshot(self, memory=None):
+        """Write a full snapshot and start a fresh journal
+
+        A memory read before another process wrote (an older revision) is
+        merged with disk (merge_memory); one without a revision, like a
+        fresh empty memory, replaces it.
+        """
+        with self.transaction():
+            current = revision_of(self.memory)
+            if memory is not None and memory is not self.memory:
+                if self.memory is not None and has_revision(memory) \
+                        and revision_of(memory) != current:
+                    memory, _ = merge_memory(self._bases.at(revision_of(memory)),
+                                             memory, self.memory)
+                self.memory = memory
+                self._index = None
+                self._relevance = None
+                self._range = None
+            # The snapshot holds every queued record
+            self._pending = []
+            self.memory.setdefault("metadata", {})["revision"] = \
+                max(current, revision_of(self.memory)) + 1
+            os.makedirs(self.claude_dir, exist_ok=True)
+            write_atomic(self.snapshot_path, json.dumps(self.memory, indent=2, ensure_ascii=False))
+            # A reader between the rename and the unlink sees a journal
+            # whose base no longer matches and ignores it
+            if os.path.exists(self.journal_path):
+                os.unlink(self.journal_path)
+            self._snapshot_key = _file_key(self.snapshot_path)
+            self._journal_offset = 0
+            self._bases.remember(self.memory)
+        return True
+
+    def compact(self, background=False):
+        """Fold the journal into the snapshot, optionally on a background thread"""
+        if not background:
+            self.snapshot()
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            # Non-daemon so an exiting CLI process still finishes the fold
+            self._compactor = threading.Thread(target=self.snapshot, name="ccom-journal-compact")
+            self._compactor.start()
+
+    def wait(self):
+        """Block until a running background compaction has finished"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    # Queries shared with the SQLite backend, over the loaded dict
+    @property
+    def index(self):
+        """Duplicate index over features, built on first use and kept current on append"""
+        if self._index is None:
+            self._index = DuplicateIndex(self.memory["features"])
+        return self._index
+
+    @property
+    def relevance(self):
+        """BM25 relevance index over features, built on first use and kept current on append"""
+        if self._relevance is None:
+            self._relevance = RelevanceIndex(self.memory["features"])
+        return self._relevance
+
+    def feature_count(self):
+        """Number of live features"""
+        return len(self.memory["features"])
+
+    def find_duplicate(self, name):
+        """First feature whose name or user term matches name, else None"""
+        return self.index.find_duplicate(name)
+
+    def rank(self, query, limit=None):
+        """Features ranked by BM25 relevance to query, as (score, name) pairs"""
+        return self.relevance.rank(query, limit)
+
+    def get_feature(self, name):
+        """Data of the feature named exactly name, else None"""
+        return self.memory["features"].get(name)
+
+    def section(self, key):
+        """A top-level memory section such as "metadata", or {}"""
+        return self.memory.get(key) or {}
+
+    def created_range(self):
+        """(oldest, newest) creation datetimes, or (None, None) without dated features"""
+        if self._range is None:
+            dates = [d for d in (parse_date(f.get("created"))
+                                 for f in self.memory["features"].values()) if d]
+            self._range = (min(dates), max(dates)) if dates else (None, None)
+        return self._range
+
+    def disk_size(self):
+        """Bytes of memory.json plus the journal"""
+        try:
+            size = os.path.getsize(self.snapshot_path)
+        except FileNotFoundError:
+            size = 0
+        return size + self.journal_size()
+
+    def similar_features(self, name, threshold=None, limit=5):
+        """Near-duplicate features as (score, name) pairs, best first"""
+        if threshold is None:
+            return self.index.find_similar(name, limit=limit)
+        return self.index.find_similar(name, threshold, limit)
+
+    def find_feature(self, name):
+        """First feature whose name matches name case-insensitively, else None"""
+        normalized = normalize_name(name)
+        for existing in self.memory["features"]:
+            if normalize_name(existing) == normalized:
+                return existing
+        return None
+
+    def features_created_before(self, cutoff):
+        """(name, data) pairs for features created before a POSIX timestamp"""
+        found = []
+        for name, data in self.memory["features"].items():
+            date = parse_date(data.get("created"))
+            if date is not None and date.timestamp() < cutoff:
+                found.append((name, data))
+        return found
+
+    def sorted_features(self, sort_by="created"):
+        """(name, data) pairs sorted by creation date or case-insensitive name"""
+        features = list(self.memory["features"].items())
+        if sort_by == "name":
+            features.sort(key=lambda item: (item[0].casefold(), item[0]))
+        else:
+            features.sort(key=lambda item: _created_key(item[1]))
+        return features
+
+    def long_descriptions(self, max_length):
+        """(name, description) pairs whose description exceeds max_length"""
+        return [(name, data["description"]) for name, data in self.memory["features"].items()
+                if data.get("description") and len(data["description"]) > max_length]
+
+    def search(self, text, limit=20):
+        """Features whose name or description contains every word of text"""
+        words = normalize_name(text).split()
+        found = []
+        for name, data in self.memory["features"].items():
+            haystack = normalize_name(f"{name} {data.get('description') or ''}")
+            if all(word in haystack for word in words):
+                found.append((name, data))
+                if len(found) >= limit:
+                    break
+        return found
+
+
+class _Transaction:
+    """MemoryJournal.transaction, a class so contextlib stays off the startup path"""
+
+    def __init__(self, journal):
+        self.journal = journal
+
+    def __enter__(self):
+        journal = self.journal
+        journal._lock.acquire()
+        try:
+            journal._file_lock.acquire()
+            try:
+                if journal._file_lock.depth == 1:
+                    journal._catch_up()
+            except BaseException:
+                journal._file_lock.release()
+                raise
+        except BaseException:
+            journal._lock.release()
+            raise
+        return journal
+
+    def __exit__(self, *exc_info):
+        self.journal._file_lock.release()
+        self.journal._lock.release()
+
+
+def _touched_features(record):
+    """Feature names a record changes, or None if it may change any of them"""
+    op = record.get("op")
+    if op == "batch":
+        names = set()
+        for sub in record["ops"]:
+            sub_names = _touched_features(sub)
+            if sub_names is None:
+                return None
+            names |= sub_names
+        return names
+    if op in ("set", "delete"):
+        path = record["path"]
+        if path[0] != "features":
+            return set()
+        return {path[1]} if len(path) > 1 else None
+    return None
+
+
+def _created_key(data):
+    date = parse_date(data.get("created"))
+    return date.timestamp() if date is not None else float("-inf")
+
@@ -0,0 +1,166 @@
+"""Incremental package-lock.json reader
+
+iter_lock_packages yields (name, version) for every installed package
+without loading the lockfile whole. It reads the file in chunks,
+decodes one package entry at a time with json's raw_decode, and skips
+unneeded sections (such as the legacy "dependencies" tree that v2
+lockfiles carry next to "packages") by scanning brackets without
+building objects. Memory stays around one read chunk plus one entry, no
+matter how large the lockfile is.
+
+Lockfile versions 1 (nested "dependencies"), 2 and 3 ("packages") are
+supported.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_STRING_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+class _JsonStream:
+    """Forward-only JSON reader over a text file"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, minimum=CHUNK_SIZE):
+        if self.eof:
+            raise ValueError("Unexpected end of lockfile")
+        chunk = self.f.read(max(minimum, CHUNK_SIZE))
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in lockfile at offset {self.pos}")
+        self.pos += 1
+
+    def read_value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill(len(self.buf))
+                continue
+            if end == len(self.buf) and not self.eof:
+                # A number or literal may continue in the next chunk
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def _skip_string(self):
+        """Skip a string whose opening quote is at self.pos"""
+        start = self.pos + 1
+        while True:
+            match = _STRING_REST.match(self.buf, start)
+            if match:
+                self.pos = match.end()
+                return
+            offset = start - self.pos
+            self._fill()
+            start = self.pos + offset
+
+    def skip_value(self):
+        """Skip the next value without decoding it"""
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in "{[":
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                self._fill()
+                continue
+            self.pos = match.start()
+            token = match.group()
+            if token == '"':
+                self._skip_string()
+                continue
+            self.pos += 1
+            depth += 1 if token in "{[" else -1
+            if depth == 0:
+                return
+
+    def members(self):
+        """Iterate the keys of an object; the caller consumes each value"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' in lockfile at offset {self.pos - 1}")
+
+
+def _nested_dependencies(name, entry):
+    """(name, version) for a v1 dependency entry and everything nested in it"""
+    stack = [(name, entry)]
+    while stack:
+        name, entry = stack.pop()
+        if isinstance(entry, dict):
+            if "version" in entry:
+                yield name, entry["version"]
+            stack.extend((entry.get("dependencies") or {}).items())
+
+
+def iter_lock_packages(path):
+    """(name, version) for every installed package in a package-lock.json"""
+    with open(path, encoding='utf-8') as f:
+        stream = _JsonStream(f)
+        lockfile_version = 1
+        for key in stream.members():
+            if key == "packages":
+                for package_path in stream.members():
+                    entry = stream.read_value()
+                    if not package_path or not isinstance(entry, dict):
+                        continue
+                    if entry.get("link") or "version" not in entry:
+                        continue
+                    yield (entry.get("name") or package_path.rsplit("node_modules/", 1)[-1],
+                           entry["version"])
+                # "packages" is complete; anything after it is redundant
+                return
+            if key == "dependencies" and lockfile_version < 2:
+                for name in stream.members():
+                    yield from _nested_dependencies(name, stream.read_value())
+            elif key == "lockfileVersion":
+                lockfile_version = stream.read_value()
+            else:
+                stream.skip_value()
@@ -0,0 +1,183 @@
+"""Advisory write lock shared by every process writing a project's memory
+
+Parallel Claude Code sessions, git hooks and the daemon all write the
+same .claude directory. Writers hold FileLock on .claude/memory.lock for
+the whole read-modify-write: fcntl.flock on POSIX, msvcrt.locking on
+Windows. Readers never take it; the stores keep every file they read
+consistent without it (see cco.journal).
+
+Node has no flock, so ccom.js locks by creating .claude/memory.lock.pid
+exclusively (open with O_EXCL, holding the writer's pid) and removing
+it when done. FileLock takes that owner file too once it holds the
+flock, so Python and Node writers exclude each other. An owner file
+left by a writer that died is broken: its pid is gone, or, where that
+cannot be checked, it is older than OWNER_STALE_SECONDS.
+
+The lock is reentrant within a process, so a store method that locks can
+run inside an engine method that already holds the lock. flock locks
+belong to an open file, not a process, so without that a nested acquire
+would deadlock against itself; shared_lock hands every store of a
+process the same FileLock for that reason.
+"""
+
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+LOCK_FILE = "memory.lock"
+# Created exclusively by the writer holding the lock; ccom.js uses the same name
+OWNER_SUFFIX = ".pid"
+OWNER_STALE_SECONDS = 30
+OWNER_RETRY_INTERVAL = 0.01
+
+_shared = {}
+_shared_guard = threading.Lock()
+
+
+def _lock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        while True:
+            try:
+                # LK_LOCK itself gives up after ten one-second attempts
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _alive(pid):
+    if os.name == "nt":
+        # os.kill would terminate the process; leave it to the age check
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _stale(path):
+    """Inode of an owner file whose writer is gone, else None"""
+    try:
+        stat = os.stat(path)
+        with open(path, encoding='ascii', errors='replace') as f:
+            content = f.read().strip()
+    except FileNotFoundError:
+        return None
+    alive = _alive(int(content)) if content.isdigit() else None
+    if alive is None:
+        alive = time.time() - stat.st_mtime < OWNER_STALE_SECONDS
+    return None if alive else stat.st_ino
+
+
+def claim_owner(path):
+    """Create the owner file exclusively, waiting for its holder and breaking stale ones"""
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            inode = _stale(path)
+            if inode is not None:
+                # Only remove the file found stale, not one a writer just created
+                try:
+                    if os.stat(path).st_ino == inode:
+                        os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            time.sleep(OWNER_RETRY_INTERVAL)
+            continue
+        try:
+            os.write(fd, f"{os.getpid()}\n".encode('ascii'))
+        finally:
+            os.close(fd)
+        return
+
+
+def release_owner(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, reentrant within a process"""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.owner_path = self.path + OWNER_SUFFIX
+        self.depth = 0
+        self._fd = None
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    _lock(fd)
+                    try:
+                        claim_owner(self.owner_path)
+                    except BaseException:
+                        _unlock(fd)
+                        raise
+                except BaseException:
+                    os.close(fd)
+                    raise
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                release_owner(self.owner_path)
+                _unlock(fd)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def shared_lock(path):
+    """The process-wide FileLock for path"""
+    key = os.path.realpath(path)
+    with _shared_guard:
+        lock = _shared.get(key)
+        if lock is None:
+            lock = _shared[key] = FileLock(key)
+        return lock
@@ -0,0 +1,108 @@
+"""Project manifest (package.json) read once per run
+
+CCOMOrchestrator asks about package.json from many places: which gates
+to run, whether there is a build, test or deploy script, which security
+packages are installed. ProjectManifest parses the file on first use and
+keeps the result until the file's size or mtime changes (npm audit fix,
+for one, rewrites it mid-run), so each question costs a stat instead of
+a parse.
+
+lock_packages iterates package-lock.json incrementally through
+cco.lockfile; the lockfile is never held in memory whole.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from cco.lockfile import iter_lock_packages
+
+MANIFEST_FILE = "package.json"
+LOCKFILES = ("package-lock.json", "npm-shrinkwrap.json")
+
+
+class ProjectManifest:
+    """package.json of a project, reparsed only when it changes"""
+
+    def __init__(self, project_root):
+        self.project_root = Path(project_root)
+        self.path = self.project_root / MANIFEST_FILE
+        self._signature = None
+        self._data = None
+        self._error = None
+        self.loads = 0
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    @property
+    def exists(self):
+        return self._stat() is not None
+
+    @property
+    def data(self):
+        """Parsed package.json ({} when absent); raises ValueError when it is invalid"""
+        signature = self._stat()
+        if signature != self._signature:
+            self._signature = signature
+            self._data, self._error = {}, None
+            if signature is not None:
+                self.loads += 1
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        data = json.load(f)
+                    if not isinstance(data, dict):
+                        raise ValueError(f"{self.path} is not a JSON object")
+                    self._data = data
+                except (OSError, ValueError) as e:
+                    self._error = e
+        if self._error is not None:
+            raise ValueError(f"Could not read {self.path}: {self._error}")
+        return self._data
+
+    def _section(self, key):
+        section = self.data.get(key)
+        return section if isinstance(section, dict) else {}
+
+    @property
+    def scripts(self):
+        return self._section("scripts")
+
+    @property
+    def dependencies(self):
+        return self._section("dependencies")
+
+    @property
+    def dev_dependencies(self):
+        return self._section("devDependencies")
+
+    @property
+    def all_dependencies(self):
+        return {**self.dependencies, **self.dev_dependencies}
+
+    def has_script(self, name):
+        """Whether package.json defines an npm script; False when it cannot be read"""
+        try:
+            return name in self.scripts
+        except ValueError:
+            return False
+
+    @property
+    def lockfile(self):
+        """Path of package-lock.json (or npm-shrinkwrap.json), or None"""
+        for name in LOCKFILES:
+            path = self.project_root / name
+            if path.is_file():
+                return path
+        return None
+
+    def lock_packages(self):
+        """(name, version) for every package in the lockfile, read incrementally"""
+        lockfile = self.lockfile
+        if lockfile is None:
+            return iter(())
+        return iter_lock_packages(lockfile)
@@ -0,0 +1,640 @@
+"""CCOM memory engine - pure Python port of the CCOM class in templates/ccom.js"""
+
+import functools
+import os
+import sys
+from datetime import datetime, timezone
+
+from cco.journal import batch_op, delete_op, set_op
+from cco.relevance import pack_features, session_query
+from cco.store import open_store
+from cco.tokens import (CONTEXT_WINDOW_TOKENS, ESTIMATOR_VERSION, PACK_BUDGET_TOKENS, estimate_tokens,
+                        feature_tokens, summary_line, summary_overhead, token_state)
+from cco.util import emit, iso_day, normalize_name, now_iso, parse_date
+
+MEMORY_VERSION = "0.2"
+MAX_DESCRIPTION_LENGTH = 100
+
+
+def _transaction(method):
+    """Run an engine method holding the store's write lock (see MemoryJournal.transaction)
+
+    Its duplicate checks and running totals then read what its write
+    builds on, even with other sessions writing the same memory.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.store.transaction():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class CCOMMemory:
+    """In-process memory engine, behaviorally equal to the CCOM class in ccom.js"""
+
+    def __init__(self, claude_dir=None):
+        self.claude_dir = os.path.abspath(claude_dir or ".claude")
+        self.memory_path = os.path.join(self.claude_dir, "memory.json")
+        self.archive_path = os.path.join(self.claude_dir, "archive")
+        self.store = open_store(self.claude_dir)
+        self._ensure_memory()
+        self.ensure_token_counts()
+
+    @property
+    def memory(self):
+        """Full memory dict; the sqlite backend only builds it when a command needs it"""
+        return self.store.memory
+
+    # Core memory functions
+    def load_memory(self):
+        """Load memory from the active backend, creating an empty memory on first run or corruption"""
+        self._ensure_memory()
+        self.ensure_token_counts()
+        return self.memory
+
+    def _ensure_memory(self):
+        if not self.store.open():
+            with self.store.transaction():
+                # Another session may have created it while this one waited
+                if not self.store.open():
+                    self.save_memory(self.create_empty_memory())
+
+    def save_memory(self, memory=None):
+        """Write a full memory snapshot to the active backend"""
+        if memory is None:
+            memory = self.memory
+        try:
+            self.store.snapshot(memory)
+            return True
+        except Exception as e:
+            emit(f"Failed to save memory: {e}", file=sys.stderr)
+            return False
+
+    def record(self, op):
+        """Apply a single mutation through the active backend"""
+        try:
+            self.store.append(op)
+            return True
+        except Exception as e:
+            emit(f"Failed to save memory: {e}", file=sys.stderr)
+            return False
+
+    def create_empty_memory(self):
+        """Create empty v0.2 memory structure"""
+        now = now_iso()
+        return {
+            "project": {
+                "name": os.path.basename(os.path.dirname(self.claude_dir)),
+                "created": now.split("T")[0]
+            },
+            "features": {},
+            "metadata": {
+                "version": MEMORY_VERSION,
+                "created": now,
+                "lastCleanup": now,
+                "tokens": token_state()
+            }
+        }
+
+    # Context cost accounting (see cco.tokens)
+    def token_state(self):
+        """metadata.tokens: running total of the features' context cost"""
+        return self.store.section("metadata").get("tokens") or {}
+
+    def ensure_token_counts(self):
+        """Recount every feature when the running total is missing or out of date
+
+        Memories from before token accounting, from another estimator
+        version, or whose feature count no longer matches the total (edited
+        by an older ccom.js) are recounted once and saved.
+        """
+        if self._token_counts_current():
+            return False
+        with self.store.transaction():
+            if self._token_counts_current():
+                return False
+            memory = self.memory
+            features = memory["features"]
+            total = 0
+            for name, data in list(features.items()):
+                # Replaced, not changed in place: the store's merge bases share feature data
+                features[name] = data = dict(data, tokens=feature_tokens(name, data))
+                total += data["tokens"]
+            memory.setdefault("metadata", {})["tokens"] = token_state(total, len(features))
+            self.save_memory(memory)
+        return True
+
+    def _token_counts_current(self):
+        state = self.token_state()
+        return state.get("estimator") == ESTIMATOR_VERSION and \
+            state.get("features") == self.store.feature_count()
+
+    def _tokens_op(self, delta, feature_delta=0):
+        """Record updating the running total by delta tokens and feature_delta features"""
+        state = self.token_state()
+        return set_op(("metadata", "tokens"), token_state(
+            state.get("total", 0) + delta, state.get("features", 0) + feature_delta))
+
+    # Feature management
+    @_transaction
+    def remember_feature(self, name, data=None):
+        """Remember a feature unless a duplicate already exists"""
+        data = data or {}
+        if self.check_duplicate(name):
+            emit(f'⚠️  Duplicate detected: "{name}" already exists!')
+            return False
+
+        similar = self.store.similar_features(name)
+        if similar:
+            listed = ", ".join(f'"{existing}" ({score:.0%})' for score, existing in similar)
+            emit(f"💡 Similar features exist: {listed}. Consider enhancing them instead.")
+
+        feature = {
+            "created": now_iso(),
+            "description": data.get("description") or "",
+            "files": data.get("files") or [],
+            "userTerm": data.get("userTerm") or name
+        }
+        feature["tokens"] = feature_tokens(name, feature)
+        self.record(batch_op([set_op(("features", name), feature),
+                              self._tokens_op(feature["tokens"], 1)]))
+        emit(f"✅ Remembered: {name}")
+        return True
+
+    @_transaction
+    def import_features(self, rows, dry_run=False):
+        """Remember cco.ingest rows with one store write, returns an Outcome per row
+
+        Duplicates are checked against memory and the rows imported
+        before them. The added features and the token total go to the
+        store as a single batch record, so the import applies entirely or
+        not at all.
+        """
+        from cco.ingest import Outcome
+
+        ops, outcomes, imported = [], [], {}
+        added_tokens = 0
+        now = now_iso()
+        for row in rows:
+            if row.error:
+                outcomes.append(Outcome(row.line, row.name, "invalid", row.error))
+                continue
+            existing = self.check_duplicate(row.name) or imported.get(normalize_name(row.name))
+            if existing:
+                outcomes.append(Outcome(row.line, row.name, "duplicate", existing))
+                continue
+            feature = {
+                "created": row.data.get("created") or now,
+                "description": row.data["description"],
+                "files": row.data["files"],
+                "userTerm": row.data["userTerm"]
+            }
+            feature["tokens"] = feature_tokens(row.name, feature)
+            added_tokens += feature["tokens"]
+            ops.append(set_op(("features", row.name), feature))
+            imported[normalize_name(row.name)] = row.name
+            outcomes.append(Outcome(row.line, row.name, "added", None))
+
+        if ops and not dry_run:
+            self.store.append(batch_op(ops + [self._tokens_op(added_tokens, len(ops))]))
+        return outcomes
+
+    def check_duplicate(self, name):
+        """Return the existing feature name matching name or a user term, else False"""
+        return self.store.find_duplicate(name) or False
+
+    # Memory Management Features (v0.2)
+    def get_memory_stats(self):
+        """Compute feature count, size, token estimate and date range"""
+        feature_count = self.store.feature_count()
+        metadata = self.store.section("metadata")
+        version = metadata.get("version") or "0.1"
+        project_name = self.store.section("project").get("name", "")
+        tokens = ((metadata.get("tokens") or {}).get("total", 0)
+                  + summary_overhead(project_name, version, feature_count))
+        percentage = tokens / CONTEXT_WINDOW_TOKENS * 100
+        oldest, newest = self.store.created_range()
+
+        return {
+            "featureCount": feature_count,
+            "bytes": self.store.disk_size(),
+            "tokens": tokens,
+            "percentage": percentage,
+            "oldest": iso_day(oldest) if oldest else None,
+            "newest": iso_day(newest) if newest else None,
+            "version": version
+        }
+
+    def get_oldest_feature(self):
+        """Return the oldest feature as a dict including its name"""
+        return self._extreme_feature(lambda date, best: date < best)
+
+    def get_newest_feature(self):
+        """Return the newest feature as a dict including its name"""
+        return self._extreme_feature(lambda date, best: date > best)
+
+    def _extreme_feature(self, better):
+        found = None
+        found_date = None
+        for name, data in self.memory["features"].items():
+            date = parse_date(data.get("created"))
+            if date is None:
+                continue
+            if found_date is None or better(date, found_date):
+                found_date = date
+                found = dict(data, name=name)
+        return found
+
+    def _archive(self):
+        # Imported here: gzip and the segment index are only needed by archive commands
+        from cco.archive import Archive
+        return Archive(self.archive_path)
+
+    @_transaction
+    def archive_old_features(self, days=30):
+        """Move features older than N days into an archive file"""
+        cutoff = datetime.now(timezone.utc).timestamp() - days * 86400
+        to_archive = self.store.features_created_before(cutoff)
+
+        if not to_archive:
+            emit(f"📁 No features older than {days} days found")
+            return 0
+
+        archive_data = {
+            "archivedDate": now_iso(),
+            "cutoffDays": days,
+            "features": {}
+        }
+
+        freed = 0
+        for name, feature in to_archive:
+            freed += feature.get("tokens") or feature_tokens(name, feature)
+            archive_data["features"][name] = {
+                "created": feature.get("created"),
+                "description": feature.get("description"),
+                "files": feature.get("files"),
+                "userTerm": feature.get("userTerm")
+            }
+
+        try:
+            segment = self._archive().add_segment(archive_data)
+
+            ops = [delete_op(("features", name)) for name, _ in to_archive]
+            ops.append(set_op(("metadata", "lastCleanup"), now_iso()))
+            ops.append(self._tokens_op(-freed, -len(to_archive)))
+            self.record(batch_op(ops))
+            emit(f"📁 Archived {len(to_archive)} features older than {days} days to {segment}"
+                 f" (~{freed} context tokens freed)")
+            return len(to_archive)
+        except Exception as e:
+            emit(f"Failed to create archive: {e}", file=sys.stderr)
+            return 0
+
+    @_transaction
+    def remove_feature(self, name):
+        """Remove a feature by case-insensitive name"""
+        existing = self.store.find_feature(name)
+        if existing is not None:
+            data = self.store.get_feature(existing) or {}
+            cost = data.get("tokens") or feature_tokens(existing, data)
+            self.record(batch_op([delete_op(("features", existing)), self._tokens_op(-cost, -1)]))
+            emit(f"🗑️ Removed feature: {existing}")
+            return True
+
+        emit(f"❌ Feature not found: {name}")
+        return False
+
+    @_transaction
+    def compact_memory(self):
+        """Truncate descriptions longer than MAX_DESCRIPTION_LENGTH"""
+        ops = []
+        saved = 0
+
+        for name, description in self.store.long_descriptions(MAX_DESCRIPTION_LENGTH):
+            truncated = description[:MAX_DESCRIPTION_LENGTH - 3] + "..."
+            data = self.store.get_feature(name) or {}
+            cost = data.get("tokens") or feature_tokens(name, data)
+            new_cost = feature_tokens(name, dict(data, description=truncated))
+            saved += cost - new_cost
+            ops.append(set_op(("features", name, "description"), truncated))
+            ops.append(set_op(("features", name, "tokens"), new_cost))
+            emit(f'✂️ Truncated description for "{name}"')
+            emit(f"   From: {description}")
+            emit(f"   To: {truncated}")
+
+        compacted = len(ops) // 2
+        if compacted > 0:
+            ops.append(self._tokens_op(-saved))
+            self.record(batch_op(ops))
+            emit(f"🗜️ Compacted {compacted} feature descriptions (~{saved} context tokens saved)")
+        else:
+            emit("✅ No descriptions need compacting")
+
+        return compacted
+
+    def list_features(self, sort_by="created"):
+        """Print features with their age, sorted by creation date or name"""
+        features = self.store.sorted_features(sort_by)
+
+        if not features:
+            emit("📭 No features remembered yet")
+            return
+
+        now = datetime.now(timezone.utc)
+        emit("\n📋 Feature List")
+        emit("━" * 60)
+
+        for name, data in features:
+            created = parse_date(data.get("created"))
+            emit(f"\n  📦 {name}")
+            if data.get("userTerm") and data["userTerm"] != name:
+                emit(f'      Alias: "{data["userTerm"]}"')
+            if data.get("description"):
+                emit(f"      Description: {data['description']}")
+            if data.get("files"):
+                emit(f"      Files: {', '.join(data['files'])}")
+            if created is not None:
+                age = int((now - created).total_seconds() // 86400)
+                age_str = "today" if age == 0 else "1 day ago" if age == 1 else f"{age} days ago"
+                emit(f"      Created: {iso_day(created)} ({age_str})")
+        emit("━" * 60)
+
+    def display_memory_stats(self):
+        """Print memory statistics with context usage warnings"""
+        stats = self.get_memory_stats()
+
+        emit("\n📊 Memory Statistics")
+        emit("━" * 40)
+        emit(f"Version: {stats['version']}")
+        emit(f"Features: {stats['featureCount']}")
+        emit(f"Memory size: {stats['bytes']} bytes ({stats['tokens']} tokens)")
+        emit(f"Context usage: {stats['percentage']:.2f}%")
+
+        if stats["oldest"]:
+            emit(f"Oldest feature: {stats['oldest']}")
+        if stats["newest"]:
+            emit(f"Newest feature: {stats['newest']}")
+
+        # Warning thresholds
+        if stats["tokens"] > 20000:
+            emit("🚨 CRITICAL: Memory usage > 10% of context! Archive immediately!")
+        elif stats["tokens"] > 10000:
+            emit("⚠️ WARNING: Memory usage > 5% of context. Consider archiving.")
+        elif stats["tokens"] > 5000:
+            emit("💡 INFO: Memory usage > 2.5% of context. Monitor growth.")
+
+        emit("━" * 40)
+        return stats
+
+    # Context injection for Claude
+    def get_context_summary(self):
+        """Build the memory summary injected into Claude's context"""
+        feature_count = len(self.memory["features"])
+        stats = self.get_memory_stats()
+
+        if feature_count == 0:
+            return f"Starting fresh project: {self.memory['project']['name']}"
+
+        lines = [summary_line(name, data) for name, data in self.memory["features"].items()]
+
+        warning = ""
+        if stats["tokens"] > 10000:
+            warning = "\n🚨 Memory usage high - consider archiving old features!"
+        elif stats["tokens"] > 5000:
+            warning = "\n💡 Memory usage moderate - monitor growth"
+
+        return (
+            f"🧠 Memory Loaded: {self.memory['project']['name']} (v{stats['version']})\n"
+            f"Memory: {stats['tokens']} tokens ({stats['percentage']:.1f}% of context)\n"
+            f"Features built ({feature_count}):\n"
+            + "\n".join(lines)
+            + f"\n\n⚠️ Check for duplicates before creating new features!{warning}"
+        )
+
+    def pack_context(self, query=None, budget=PACK_BUDGET_TOKENS):
+        """Context summary of the features most relevant to query, within budget tokens
+
+        query defaults to the session query from git (branch and changed
+        files). Without a query or any match, the newest features are packed.
+        """
+        feature_count = self.store.feature_count()
+        project_name = self.store.section("project").get("name", "")
+        if feature_count == 0:
+            return f"Starting fresh project: {project_name}"
+        if query is None:
+            query = session_query(os.path.dirname(self.claude_dir))
+
+        ranked = self.store.rank(query) if query else []
+        basis = f'most relevant to "{query}"'
+        if not ranked:
+            ranked = [(0, name) for name, _ in reversed(self.store.sorted_features("created"))]
+            basis = "newest first"
+
+        version = self.store.section("metadata").get("version") or "0.1"
+
+        def frame(shown, hidden, tokens):
+            header = (f"🧠 Memory Loaded: {project_name} (v{version})\n"
+                      f"Memory: {tokens} of {budget} tokens packed "
+                      f"({tokens / CONTEXT_WINDOW_TOKENS * 100:.1f}% of context)\n"
+                      f"Features built ({shown} of {feature_count}, {basis}):")
+            footer = ""
+            if hidden:
+                footer += (f"\n💡 {hidden} more features in memory - "
+                           f"use 'ccom search <words>' before building something new")
+            return header, footer + "\n⚠️ Check for duplicates before creating new features!"
+
+        # Upper bound: the counts printed never have more digits than these
+        overhead = estimate_tokens("\n".join(frame(feature_count, feature_count, budget)))
+        packed = pack_features(ranked, max(0, budget - overhead), self._feature_cost)
+
+        lines = [summary_line(name, self.store.get_feature(name) or {}) for name in packed.features]
+        header, footer = frame(len(lines), feature_count - len(lines), packed.tokens + overhead)
+        return "\n".join([header] + lines + [footer])
+
+    def _feature_cost(self, name):
+        data = self.store.get_feature(name) or {}
+        return data.get("tokens") or feature_tokens(name, data)
+
+    # Display functions
+    def show_memory(self):
+        """Print detailed memory contents"""
+        emit("\n📝 Memory Contents")
+        emit("━" * 40)
+        emit(f"Project: {self.memory['project']['name']}")
+        emit(f"Created: {self.memory['project']['created']}")
+        emit(f"\nFeatures ({len(self.memory['features'])}):")
+
+        for name, data in self.memory["features"].items():
+            emit(f"\n  {name}")
+            if data.get("userTerm") and data["userTerm"] != name:
+                emit(f'    Alias: "{data["userTerm"]}"')
+            if data.get("description"):
+                emit(f"    Description: {data['description']}")
+            if data.get("files"):
+                emit(f"    Files: {', '.join(data['files'])}")
+            emit(f"    Created: {data.get('created')}")
+        emit("━" * 40)
+
+    def clear_memory(self):
+        """Reset memory to an empty structure"""
+        self.save_memory(self.create_empty_memory())
+        emit("✅ Memory cleared")
+
+    def find_similar(self, name, threshold=None):
+        """Print near-duplicate features for name, ranked by similarity"""
+        similar = self.store.similar_features(name, threshold)
+        if not similar:
+            emit(f'✅ No features similar to "{name}"')
+            return similar
+
+        emit(f'\n🔎 Features similar to "{name}"')
+        emit("━" * 40)
+        for score, existing in similar:
+            emit(f"  {score:.0%}  {existing}")
+        emit("━" * 40)
+        return similar
+
+    def search_features(self, text):
+        """Print live and archived features whose name or description matches text"""
+        results = self.store.search(text)
+        archived = self._archive().search(text)
+        if not results and not archived:
+            emit(f'🔍 No features matching "{text}"')
+            return results
+
+        if results:
+            emit(f'\n🔍 Features matching "{text}" ({len(results)})')
+            emit("━" * 40)
+            for name, data in results:
+                emit(f"  📦 {name}")
+                if data.get("description"):
+                    emit(f"      Description: {data['description']}")
+            emit("━" * 40)
+        if archived:
+            emit(f'\n🗄️ Archived features matching "{text}" ({len(archived)})')
+            emit("━" * 40)
+            for segment, name, data in archived:
+                emit(f"  📦 {name}  ({segment})")
+                if data.get("description"):
+                    emit(f"      Description: {data['description']}")
+            emit("━" * 40)
+            emit("Use 'ccom restore <name>' to bring one back into memory")
+        return results
+
+    @_transaction
+    def restore_feature(self, name):
+        """Move an archived feature back into live memory"""
+        archive = self._archive()
+        found = archive.find(name)
+        if found is None:
+            emit(f"❌ No archived feature named: {name}")
+            return False
+        segment, archived_name = found
+        existing = self.check_duplicate(archived_name)
+        if existing:
+            emit(f'⚠️  "{existing}" is already in memory; not restoring the archived copy')
+            return False
+
+        data = archive.get(segment, archived_name)
+        feature = {
+            "created": data.get("created") or now_iso(),
+            "description": data.get("description") or "",
+            "files": data.get("files") or [],
+            "userTerm": data.get("userTerm") or archived_name
+        }
+        feature["tokens"] = feature_tokens(archived_name, feature)
+        if not self.record(batch_op([set_op(("features", archived_name), feature),
+                                     self._tokens_op(feature["tokens"], 1)])):
+            return False
+        # Only drop the archived copy once memory holds the feature
+        archive.discard(segment, archived_name)
+        emit(f"♻️ Restored {archived_name} from {segment}")
+        return True
+
+    # Hook equivalents for Claude Code integration
+    def on_session_start(self):
+        """Return the context summary shown at session start
+
+        With context.budget set in .claude/config.json, only the features
+        most relevant to the current branch and changes are packed.
+        """
+        from cco.config import load_config
+
+        budget = load_config(self.claude_dir)["context"].get("budget")
+        if budget:
+            return self.pack_context(budget=int(budget))
+        return self.get_context_summary()
+
+
+def run_command(args, claude_dir=None, engine=None):
+    """Execute a ccom.js-style command in-process, returns success
+
+    engine reuses an already loaded CCOMMemory (the daemon's), whose
+    store is left open.
+    """
+    command = args[0] if args else None
+    owned = engine is None
+    if owned:
+        engine = CCOMMemory(claude_dir)
+
+    if command == "start":
+        emit(engine.on_session_start())
+    elif command == "memory":
+        engine.show_memory()
+    elif command == "clear":
+        engine.clear_memory()
+    elif command == "remember":
+        if len(args) > 1 and args[1]:
+            engine.remember_feature(args[1], {"description": " ".join(args[2:])})
+        else:
+            emit("Usage: ccom remember <name> [description]")
+    elif command == "stats":
+        engine.display_memory_stats()
+    elif command == "list":
+        engine.list_features(args[1] if len(args) > 1 else "created")
+    elif command == "archive":
+        try:
+            days = int(args[1]) if len(args) > 1 else 30
+        except ValueError:
+            days = 30
+        engine.archive_old_features(days or 30)
+    elif command == "remove":
+        feature_name = " ".join(args[1:])
+        if feature_name:
+            engine.remove_feature(feature_name)
+        else:
+            emit("Usage: ccom remove <feature-name>")
+    elif command == "compact":
+        engine.compact_memory()
+    elif command == "similar":
+        name = " ".join(args[1:])
+        if name:
+            engine.find_similar(name)
+        else:
+            emit("Usage: ccom similar <name>")
+    elif command == "pack":
+        budget = PACK_BUDGET_TOKENS
+        words = args[1:]
+        if words and words[0].isdigit():
+            budget, words = int(words[0]), words[1:]
+        emit(engine.pack_context(" ".join(words) or None, budget))
+    elif command == "restore":
+        name = " ".join(args[1:])
+        if name:
+            engine.restore_feature(name)
+        else:
+            emit("Usage: ccom restore <feature-name>")
+    elif command == "search":
+        text = " ".join(args[1:])
+        if text:
+            engine.search_features(text)
+        else:
+            emit("Usage: ccom search <text>")
+    else:
+        emit(f"Unknown memory command: {command}", file=sys.stderr)
+        if owned:
+            engine.store.close()
+        return False
+    if owned:
+        engine.store.close()
+    return True
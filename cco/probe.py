@@ -0,0 +1,107 @@
+"""Cached results of probing Claude Code integration methods
+
+invoke_subagent tries several ways of reaching Claude Code (Task tool,
+CLI variants with 10 second timeouts, a file trigger that waits 2
+seconds) before falling back to CCOM's own implementation. ProbeCache
+remembers which methods worked in .claude/cache/integration-probe.json
+so later calls skip the ones that did not.
+
+Entries expire after a TTL and are discarded when PATH or any of the
+probed binaries changes, so installing Claude Code is picked up at once.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from cco.journal import write_atomic
+
+PROBE_VERSION = 1
+DEFAULT_TTL_HOURS = 24
+PROBED_BINARIES = ("claude-code", "claude")
+
+
+def environment_fingerprint(binaries=PROBED_BINARIES):
+    """Hash of PATH and the location and mtime of each probed binary"""
+    parts = [os.environ.get("PATH", "")]
+    for name in binaries:
+        location = shutil.which(name)
+        try:
+            mtime = os.stat(location).st_mtime_ns if location else None
+        except OSError:
+            mtime = None
+        parts.append(f"{name}={location}@{mtime}")
+    return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+
+class ProbeCache:
+    """Which integration methods are available, persisted with a TTL"""
+
+    def __init__(self, claude_dir, ttl_hours=DEFAULT_TTL_HOURS, cache_path=None):
+        self.cache_path = Path(cache_path) if cache_path else \
+            Path(claude_dir) / "cache" / "integration-probe.json"
+        self.ttl = (ttl_hours if ttl_hours is not None else DEFAULT_TTL_HOURS) * 3600
+        self._fingerprint = None
+        self._methods = None
+        self._probed = None
+        self._loaded = False
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = environment_fingerprint()
+        return self._fingerprint
+
+    def methods(self):
+        """Mapping of method key -> worked, or None when there is no valid cache"""
+        if not self._loaded:
+            self._loaded = True
+            self._methods = self._load()
+        return self._methods
+
+    def _load(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != PROBE_VERSION or data.get("fingerprint") != self.fingerprint:
+            return None
+        if time.time() - data.get("probed", 0) > self.ttl:
+            return None
+        methods = data.get("methods")
+        if not isinstance(methods, dict):
+            return None
+        self._probed = data["probed"]
+        return methods
+
+    def record(self, outcomes):
+        """Merge method outcomes into the cache and save it
+
+        A full probe (no valid cache) restarts the TTL; updates to an
+        existing cache keep its original probe time.
+        """
+        previous = self.methods()
+        if previous is None:
+            self._probed = time.time()
+        self._methods = dict(previous or {}, **outcomes)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.cache_path, json.dumps({
+            "version": PROBE_VERSION,
+            "fingerprint": self.fingerprint,
+            "probed": self._probed,
+            "methods": self._methods,
+        }, indent=2))
+
+    def clear(self):
+        """Forget all probe results so the next call probes again"""
+        try:
+            self.cache_path.unlink()
+        except FileNotFoundError:
+            pass
+        self._methods = None
+        self._probed = None
+        self._loaded = True
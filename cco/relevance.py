@@ -0,0 +1,196 @@
+"""Relevance ranking and budget-bounded context packing
+
+The session-start summary lists every feature, which stops scaling once
+memory is large. pack_features instead ranks features against a query
+(a topic, the current branch name, changed file paths) and keeps the
+best ones whose summary lines fit a token budget.
+
+Ranking is BM25F over three fields of each feature: its name and user
+term, its description, and its file paths. Per-field term frequencies
+are length-normalized, weighted (FIELD_WEIGHTS) and summed before the
+usual BM25 saturation, so a term in the name counts for more than the
+same term in a long description. RelevanceIndex holds the inverted index
+(term -> {feature: {field: tf}}) and the per-field lengths. It is updated
+one feature at a time, so the stores keep it current on every journal
+record instead of rebuilding it, and a query only reads the posting
+lists of its own terms.
+
+Without an explicit topic, session_query builds the query from git: the
+current branch name plus the paths of changed and untracked files.
+
+Packing is greedy by score: features are taken best first, and one that
+does not fit the remaining budget is skipped rather than ending the
+pack, so one long summary line cannot crowd out shorter relevant ones.
+"""
+
+import math
+import re
+from collections import namedtuple
+
+K1 = 1.2
+FIELDS = ("name", "description", "files")
+FIELD_WEIGHTS = {"name": 3.0, "description": 1.0, "files": 1.5}
+FIELD_B = {"name": 0.5, "description": 0.75, "files": 0.5}
+
+_CAMEL_BOUNDARY = re.compile(r'([a-z0-9])([A-Z])')
+_TERM = re.compile(r'[a-z0-9]+')
+
+# Too common in names, branch names and paths to say what a session is about
+STOPWORDS = frozenset("""
+a an and the of for to in on with by from at or is be as it this that into via
+src lib app index js ts jsx tsx py mjs cjs json md test tests spec main master
+feature features feat fix bugfix hotfix chore refactor wip dev develop release
+""".split())
+
+Packed = namedtuple("Packed", "features matched tokens budget")
+
+
+def terms(text):
+    """Search terms of text; splits snake_case, camelCase, paths and branch names"""
+    words = _TERM.findall(_CAMEL_BOUNDARY.sub(r'\1 \2', text or "").lower())
+    return [word for word in words if len(word) > 1 and word not in STOPWORDS]
+
+
+def feature_fields(name, data):
+    """Field -> terms for one feature"""
+    term = data.get("userTerm")
+    label = name if not term or term == name else f"{name} {term}"
+    return {
+        "name": terms(label),
+        "description": terms(data.get("description")),
+        "files": terms(" ".join(data.get("files") or [])),
+    }
+
+
+def field_counts(name, data):
+    """({term: {field: tf}}, {field: length}) for one feature"""
+    counts = {}
+    lengths = {}
+    for field, words in feature_fields(name, data or {}).items():
+        lengths[field] = len(words)
+        for word in words:
+            fields = counts.setdefault(word, {})
+            fields[field] = fields.get(field, 0) + 1
+    return counts, lengths
+
+
+def bm25_scores(query_terms, count, totals, postings, lengths, limit=None):
+    """Rank features by BM25F, best first, as (score, name) pairs
+
+    count is the number of indexed features, totals the summed length of
+    each field over them, postings {term: {name: {field: tf}}} for the
+    query terms and lengths {name: {field: length}} for every feature in
+    those postings.
+    """
+    if not count:
+        return []
+    average = {field: (totals.get(field, 0) / count) or 1.0 for field in FIELDS}
+    scores = {}
+    for word in set(query_terms):
+        matches = postings.get(word)
+        if not matches:
+            continue
+        idf = math.log(1 + (count - len(matches) + 0.5) / (len(matches) + 0.5))
+        for name, fields in matches.items():
+            feature_lengths = lengths[name]
+            tf = 0.0
+            for field, freq in fields.items():
+                b = FIELD_B[field]
+                norm = 1 - b + b * feature_lengths.get(field, 0) / average[field]
+                tf += FIELD_WEIGHTS[field] * freq / norm
+            scores[name] = scores.get(name, 0.0) + idf * tf * (K1 + 1) / (tf + K1)
+    ranked = sorted(((round(score, 4), name) for name, score in scores.items()),
+                    key=lambda item: (-item[0], item[1]))
+    return ranked[:limit] if limit else ranked
+
+
+class RelevanceIndex:
+    """Incrementally maintained BM25F index over features"""
+
+    def __init__(self, features=None):
+        self._postings = {}  # term -> {feature: {field: tf}}
+        self._lengths = {}   # feature -> {field: term count}
+        self._terms = {}     # feature -> its distinct terms
+        self._totals = dict.fromkeys(FIELDS, 0)
+        for name, data in (features or {}).items():
+            self.add(name, data)
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, name, data):
+        """Index a feature, replacing any earlier version of it"""
+        if name in self._lengths:
+            self.remove(name)
+        counts, lengths = field_counts(name, data)
+        for word, fields in counts.items():
+            self._postings.setdefault(word, {})[name] = fields
+        for field, length in lengths.items():
+            self._totals[field] += length
+        self._lengths[name] = lengths
+        self._terms[name] = tuple(counts)
+
+    def remove(self, name):
+        """Drop a feature from the index"""
+        lengths = self._lengths.pop(name, None)
+        if lengths is None:
+            return
+        for field in FIELDS:
+            self._totals[field] -= lengths[field]
+        for word in self._terms.pop(name):
+            postings = self._postings.get(word)
+            if postings is not None:
+                postings.pop(name, None)
+                if not postings:
+                    del self._postings[word]
+
+    def rank(self, query, limit=None):
+        """(score, name) pairs for features matching the query, best first"""
+        query_terms = terms(query)
+        postings = {word: self._postings[word] for word in query_terms if word in self._postings}
+        return bm25_scores(query_terms, len(self._lengths), self._totals, postings,
+                           self._lengths, limit)
+
+
+def pack_features(ranked, budget, cost):
+    """Greedily pick ranked (score, name) pairs whose cost(name) fits budget
+
+    Returns Packed(features, matched, tokens, budget) with the chosen
+    names in rank order.
+    """
+    chosen = []
+    used = 0
+    for _, name in ranked:
+        if used >= budget:
+            break
+        tokens = cost(name)
+        if used + tokens > budget:
+            continue
+        chosen.append(name)
+        used += tokens
+    return Packed(chosen, len(ranked), used, budget)
+
+
+def _git(root, *args):
+    import subprocess
+
+    try:
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    if result.returncode != 0:
+        return ""
+    return result.stdout.decode('utf-8', errors='replace')
+
+
+def session_query(root, max_files=50):
+    """Query describing the work in progress: branch name and changed files, or ""
+
+    Outside a git checkout, or on a clean default branch, there is
+    little to go on and the query is empty or matches nothing.
+    """
+    branch = _git(root, "symbolic-ref", "--short", "-q", "HEAD").strip()
+    changed = _git(root, "status", "--porcelain", "--untracked-files=all").splitlines()
+    paths = [line[3:].split(" -> ")[-1].strip('"') for line in changed if len(line) > 3]
+    paths = [path for path in paths if not path.startswith(".claude/")][:max_files]
+    return " ".join(filter(None, [branch, *paths]))
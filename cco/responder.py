@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Local stand-in for a Claude Code agent answering CCOM file triggers
+
+Watches .claude for trigger_<agent>.txt files and answers each with
+response_<agent>.txt, so the file-trigger handshake can be exercised
+without Claude Code:
+
+    python -m cco.responder --delay 0.5 --once
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from cco.journal import write_atomic
+from cco.trigger import DirectoryWatcher, response_name
+
+
+def _agent_for(name):
+    if name.startswith("trigger_") and name.endswith(".txt"):
+        return name[len("trigger_"):-len(".txt")]
+    return None
+
+
+def respond(claude_dir, agents=None, delay=0.0, once=False, timeout=None, use_inotify=None):
+    """Answer triggers until timeout passes (or after the first answer with once)
+
+    Returns the number of triggers answered.
+    """
+    claude_dir = Path(claude_dir)
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    answered = 0
+    seen = {}  # trigger name -> mtime already answered
+    with DirectoryWatcher(claude_dir, use_inotify) as watcher:
+        pending = [path.name for path in claude_dir.glob("trigger_*.txt")]
+        while True:
+            for name in pending:
+                agent = _agent_for(name)
+                if agent is None or (agents and agent not in agents):
+                    continue
+                try:
+                    mtime = (claude_dir / name).stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if seen.get(name) == mtime:
+                    continue
+                seen[name] = mtime
+                if delay:
+                    time.sleep(delay)
+                write_atomic(claude_dir / response_name(agent),
+                             f"{agent} handled by ccom responder at {datetime.now()}")
+                print(f"✅ Answered trigger for {agent}")
+                answered += 1
+                if once:
+                    return answered
+            remaining = deadline - time.monotonic() if deadline is not None else 3600.0
+            if remaining <= 0:
+                return answered
+            pending = watcher.changes(remaining)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer CCOM agent triggers locally")
+    parser.add_argument("--claude-dir", default=".claude", help="Directory holding trigger files")
+    parser.add_argument("--agent", action="append", dest="agents",
+                        help="Only answer this agent (repeatable)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--once", action="store_true", help="Exit after the first answer")
+    parser.add_argument("--timeout", type=float, help="Exit after this many seconds")
+    parser.add_argument("--poll", action="store_true", help="Poll instead of using inotify")
+    args = parser.parse_args()
+
+    if not Path(args.claude_dir).is_dir():
+        print(f"❌ No such directory: {args.claude_dir}")
+        sys.exit(1)
+    try:
+        respond(args.claude_dir, args.agents, args.delay, args.once, args.timeout,
+                use_inotify=False if args.poll else None)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Streaming subprocess runner for CCOM gates
+
+run_streaming starts a shell command and reads its stdout and stderr
+line by line as they are produced. Each line is echoed to the console,
+prefixed with the gate name, and appended to a rotating log in
+.claude/logs/<name>.log. Only the last tail_lines lines are kept in
+memory, unless keep_stdout asks for the whole stdout (for JSON output
+such as npm audit --json).
+
+A gate can list failure patterns (regexes). The first output line
+matching one stops the process group at once, so a build that has
+already failed does not keep running until its timeout.
+
+While cco.tracing is on, each command is recorded as a span with its
+exit status and, on POSIX, the CPU time of the command and the
+processes it waited for (collected with wait4).
+"""
+
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from cco import tracing
+
+DEFAULT_TAIL_LINES = 200
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+# Seconds a terminated process gets to exit before it is killed
+TERMINATE_GRACE = 2.0
+# Seconds to wait for the output readers after stopping a process; a
+# grandchild that left its own session can hold the pipes open
+READER_JOIN_TIMEOUT = 2.0
+# Longest sleep between exit checks while collecting resource usage
+USAGE_POLL_INTERVAL = 0.01
+
+DEFAULT_FAILURE_PATTERNS = {
+    "build": [r"Failed to compile", r"Build failed", r"^ERROR in ", r"error TS\d+:"],
+}
+
+RunResult = namedtuple("RunResult",
+                       "args returncode stdout stderr output timed_out aborted duration cpu_time",
+                       defaults=(None,))
+RunResult.__doc__ = """Outcome of run_streaming
+
+stdout and stderr hold the last lines of each stream (all of stdout with
+keep_stdout), output the last lines of both interleaved. aborted is the
+output line that matched a failure pattern, or None; returncode is then
+nonzero even if the command exited 0. cpu_time (user + system seconds)
+is only measured while tracing.
+"""
+
+RunnerSettings = namedtuple("RunnerSettings", "log_dir tail_lines failure_patterns echo",
+                            defaults=(None, DEFAULT_TAIL_LINES, None, True))
+
+_print_lock = threading.Lock()
+
+
+def runner_settings(section=None, log_dir=None):
+    """RunnerSettings from the "runner" section of the project config"""
+    section = section or {}
+    patterns = dict(DEFAULT_FAILURE_PATTERNS)
+    patterns.update(section.get("failure_patterns", {}))
+    return RunnerSettings(
+        log_dir=log_dir,
+        tail_lines=int(section.get("tail_lines", DEFAULT_TAIL_LINES)),
+        failure_patterns=patterns,
+        echo=bool(section.get("echo", True)),
+    )
+
+
+class _RotatingLog:
+    """Append-only log file rotated to .1 .. .LOG_BACKUPS once it passes max_bytes"""
+
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8', errors='replace')
+        self._size = self._file.tell()
+
+    def write(self, text):
+        size = len(text.encode('utf-8', errors='replace'))
+        if self._size + size > self.max_bytes and self._size:
+            self._rotate()
+        self._file.write(text)
+        self._size += size
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        self._file = open(self.path, 'a', encoding='utf-8', errors='replace')
+        self._size = 0
+
+    def close(self):
+        self._file.close()
+
+
+class StreamingProcess:
+    """A running gate command whose output is streamed as it arrives"""
+
+    def __init__(self, command, name, cwd=None, settings=None, keep_stdout=False, echo=None):
+        self.command = command
+        self.name = name
+        self.cwd = cwd
+        self.settings = settings or RunnerSettings()
+        self.keep_stdout = keep_stdout
+        self.echo = self.settings.echo if echo is None else echo
+        patterns = (self.settings.failure_patterns or {}).get(name) or []
+        self._failure = re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+        self.aborted = None
+        self._lock = threading.Lock()
+        self._tails = {"stdout": deque(maxlen=self.settings.tail_lines),
+                       "stderr": deque(maxlen=self.settings.tail_lines)}
+        self._output = deque(maxlen=self.settings.tail_lines)
+        self._stdout = [] if keep_stdout else None
+        self._log = None
+        self._process = None
+        self._readers = []
+        self._started = None
+        self._track = None
+        self._exited = threading.Event()
+        self.cpu_time = None
+
+    def start(self):
+        if self.settings.log_dir:
+            self._log = _RotatingLog(Path(self.settings.log_dir) / f"{self.name}.log")
+            self._log.write(f"=== {datetime.now().isoformat()} $ {self.command}\n")
+        if sys.platform == "win32":
+            options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            options = {"start_new_session": True}
+        if tracing.enabled():
+            # Captured here: wait() may run on an executor thread outside the caller's span
+            self._track = tracing.current_track()
+        self._started = time.perf_counter()
+        self._process = subprocess.Popen(
+            self.command, shell=True, cwd=self.cwd, stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', errors='replace', bufsize=1, **options)
+        for stream in ("stdout", "stderr"):
+            reader = threading.Thread(target=self._read, args=(stream,), daemon=True)
+            reader.start()
+            self._readers.append(reader)
+        return self
+
+    def _read(self, stream):
+        pipe = getattr(self._process, stream)
+        for line in pipe:
+            line = line.rstrip("\r\n")
+            with self._lock:
+                self._tails[stream].append(line)
+                self._output.append(line)
+                if self._stdout is not None and stream == "stdout":
+                    self._stdout.append(line)
+                if self._log:
+                    self._log.write(f"{'' if stream == 'stdout' else '[stderr] '}{line}\n")
+            if self.echo:
+                with _print_lock:
+                    print(f"   [{self.name}] {line}")
+            if self._failure is not None and self.aborted is None and self._failure.search(line):
+                self.aborted = line
+                self.terminate()
+        pipe.close()
+
+    def _signal(self, sig):
+        """Send sig to the process group (taskkill on Windows) unless it was reaped"""
+        process = self._process
+        if process is None or self._exited.is_set():
+            return
+        try:
+            if sys.platform == "win32":
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                               capture_output=True)
+            else:
+                os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError, OSError):
+            pass
+
+    def terminate(self):
+        """Stop the whole process group: terminate, then kill after TERMINATE_GRACE
+
+        Only signals; the process is reaped by wait(), whose exit status and
+        resource usage would be lost if another thread reaped it first.
+        """
+        if self._process is None or self._exited.is_set():
+            return
+        self._signal(signal.SIGTERM)
+        if not self._exited.wait(TERMINATE_GRACE):
+            self._signal(signal.SIGKILL)
+
+    def _reap(self, timeout):
+        """Wait for exit and collect the exit status; the only place the process is reaped"""
+        if self._track is not None and hasattr(os, "wait4"):
+            self._wait_with_usage(timeout)
+        else:
+            self._process.wait(timeout)
+        self._exited.set()
+
+    def _wait_with_usage(self, timeout):
+        """Popen.wait that also reads the exit rusage with wait4 (POSIX)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.0005
+        while True:
+            pid, status, usage = os.wait4(self._process.pid, os.WNOHANG)
+            if pid:
+                self._process.returncode = (-os.WTERMSIG(status) if os.WIFSIGNALED(status)
+                                            else os.WEXITSTATUS(status))
+                self.cpu_time = usage.ru_utime + usage.ru_stime
+                return
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(self.command, timeout)
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            delay = min(delay * 2, USAGE_POLL_INTERVAL)
+
+    def wait(self, timeout=None):
+        """Wait for exit (terminating on timeout) and return a RunResult"""
+        timed_out = False
+        try:
+            self._reap(timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            self._signal(signal.SIGTERM)
+            try:
+                self._reap(TERMINATE_GRACE)
+            except subprocess.TimeoutExpired:
+                self._signal(signal.SIGKILL)
+                self._reap(None)
+        # After a stop, output still held open by an escaped grandchild is
+        # abandoned rather than waited for
+        stopped = timed_out or self.aborted is not None
+        for reader in self._readers:
+            reader.join(READER_JOIN_TIMEOUT if stopped else None)
+        returncode = self._process.returncode
+        if self.aborted is not None and not returncode:
+            # Stopped on a failure pattern: a failure whatever the exit status
+            returncode = 1
+        duration = time.perf_counter() - self._started
+        with self._lock:
+            if self._log:
+                status = "timed out" if timed_out else f"exit {returncode}"
+                if self.aborted is not None:
+                    status += f", aborted on: {self.aborted}"
+                self._log.write(f"=== {status} after {duration:.1f}s\n")
+                self._log.close()
+                # A reader still running must not write to the closed log
+                self._log = None
+        if self._track is not None:
+            tracing.record(f"$ {self.command}", "subprocess", self._started,
+                           self._started + duration, self._track, gate=self.name,
+                           returncode=returncode, timed_out=timed_out,
+                           cpu_ms=None if self.cpu_time is None else round(self.cpu_time * 1000, 1))
+        with self._lock:
+            stdout = "\n".join(self._stdout if self._stdout is not None else self._tails["stdout"])
+            stderr = "\n".join(self._tails["stderr"])
+            output = "\n".join(self._output)
+        return RunResult(
+            args=self.command,
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
+            output=output,
+            timed_out=timed_out,
+            aborted=self.aborted,
+            duration=duration,
+            cpu_time=self.cpu_time,
+        )
+
+
+def run_streaming(command, name, timeout=None, cwd=None, settings=None, keep_stdout=False,
+                  echo=None):
+    """Run a shell command, streaming its output; raises TimeoutExpired like subprocess.run"""
+    process = StreamingProcess(command, name, cwd, settings, keep_stdout, echo).start()
+    result = process.wait(timeout)
+    if result.timed_out:
+        raise subprocess.TimeoutExpired(command, timeout, output=result.stdout,
+                                        stderr=result.stderr)
+    if result.aborted is not None:
+        with _print_lock:
+            print(f"⛔ {name} stopped early - output matched a failure pattern")
+    return result
@@ -0,0 +1,106 @@
+"""Persistent cache of security scan findings
+
+Entries live in .claude/cache/security-scan.json, keyed by path relative
+to the project root, with the file's size, mtime and content hash. A
+file whose size and mtime are unchanged reuses its findings without
+being read; one whose stat changed but whose content hash is unchanged
+reuses them without being rescanned. The whole cache is tied to a hash
+of the active rule set, so editing a rule invalidates every entry.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from cco.journal import write_atomic
+
+CACHE_VERSION = 1
+
+
+def rules_fingerprint(rules):
+    """Hash of a rule set, used to invalidate cached findings"""
+    payload = json.dumps([CACHE_VERSION, [list(rule) for rule in rules]])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ScanCache:
+    """File-fingerprint cache of scanner findings"""
+
+    def __init__(self, project_root, rules, cache_path=None):
+        self.project_root = Path(project_root)
+        self.cache_path = Path(cache_path) if cache_path else \
+            self.project_root / ".claude" / "cache" / "security-scan.json"
+        self.rules_hash = rules_fingerprint(rules)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("rules") == self.rules_hash:
+            self.entries = data.get("files", {})
+        else:
+            self._dirty = True
+
+    def _key(self, path):
+        try:
+            return os.path.relpath(path, self.project_root)
+        except ValueError:
+            return str(path)
+
+    def lookup(self, path, stat):
+        """Cached matches if size and mtime are unchanged, else None"""
+        entry = self.entries.get(self._key(path))
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            self.hits += 1
+            return [tuple(match) for match in entry["matches"]]
+        return None
+
+    def digest(self, path):
+        """Content hash recorded for path, if any"""
+        entry = self.entries.get(self._key(path))
+        return entry["sha1"] if entry else None
+
+    def digest_matches(self, path):
+        """Cached matches for a file whose content hash was confirmed unchanged"""
+        self.hits += 1
+        return [tuple(match) for match in self.entries[self._key(path)]["matches"]]
+
+    def store(self, path, digest, matches):
+        """Record findings for a freshly read file"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        key = self._key(path)
+        if key not in self.entries or self.entries[key]["sha1"] != digest:
+            self.misses += 1
+        self.entries[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha1": digest,
+            "matches": [list(match) for match in matches],
+        }
+        self._dirty = True
+
+    def save(self, seen_paths=None):
+        """Write the cache, dropping entries for files not in seen_paths"""
+        if seen_paths is not None:
+            seen = {self._key(path) for path in seen_paths}
+            stale = [key for key in self.entries if key not in seen]
+            for key in stale:
+                del self.entries[key]
+            self._dirty = self._dirty or bool(stale)
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.cache_path, json.dumps(
+            {"rules": self.rules_hash, "files": self.entries}, separators=(',', ':')))
+        self._dirty = False
@@ -0,0 +1,310 @@
+"""Parallel source scanner for CCOM security checks
+
+All rules are merged into one precompiled alternation with a named group
+per rule, so each file is searched once instead of once per rule. Files
+are spread across a ProcessPoolExecutor in size-balanced batches and the
+findings are merged in (path, line, column) order, so output does not
+depend on scheduling. Small scans stay in-process, where pool startup
+would cost more than it saves. An optional ScanCache (cco.scan_cache)
+lets unchanged files reuse their previous findings.
+
+Files are scanned as bytes and never decoded as a whole. Large files are
+memory-mapped and searched in WINDOW_BYTES windows that overlap by
+WINDOW_OVERLAP, so a match starting near a window edge is still found
+while peak memory stays bounded by the window size. Files over the size
+cap, binaries and minified bundles are skipped (see ScanLimits).
+"""
+
+import codecs
+import hashlib
+import heapq
+import mmap
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from cco.tracing import span
+
+SECURITY_RULES = [
+    ("hardcoded_password", r'password\s*=\s*["\'].*["\']', "Hardcoded password detected"),
+    ("hardcoded_api_key", r'api[_-]?key\s*=\s*["\'].*["\']', "Hardcoded API key detected"),
+    ("hardcoded_secret", r'secret\s*=\s*["\'].*["\']', "Hardcoded secret detected"),
+    ("eval", r'eval\s*\(', "Dangerous eval() usage detected"),
+    ("inner_html", r'innerHTML\s*=', "Potential XSS vulnerability"),
+    ("document_write", r'document\.write\s*\(', "Dangerous document.write usage"),
+]
+
+# Below this much source, a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+BATCHES_PER_WORKER = 4
+
+# Files at least this large are memory-mapped instead of read
+MMAP_MIN_BYTES = 1024 * 1024
+WINDOW_BYTES = 4 * 1024 * 1024
+# Longest match guaranteed to be found across a window edge
+WINDOW_OVERLAP = 64 * 1024
+
+# Leading bytes inspected to detect binary and minified content
+SNIFF_BYTES = 8192
+MINIFIED_AVERAGE_LINE = 500
+
+Finding = namedtuple("Finding", "path line column rule message")
+ScanLimits = namedtuple("ScanLimits", "max_file_bytes skip_extensions skip_minified")
+
+DEFAULT_LIMITS = ScanLimits(
+    max_file_bytes=50 * 1024 * 1024,
+    skip_extensions=(".png", ".jpg", ".jpeg", ".gif", ".ico", ".webp", ".bmp", ".pdf",
+                     ".woff", ".woff2", ".ttf", ".eot", ".otf", ".zip", ".gz", ".tgz",
+                     ".wasm", ".map", ".min.js", ".min.mjs", ".min.css"),
+    skip_minified=True,
+)
+
+
+class SkippedFile(Exception):
+    """Raised by scan_file for files that are not scanned; the message is the reason"""
+
+
+def scan_limits(settings):
+    """ScanLimits from the "scan" section of the project config"""
+    settings = settings or {}
+    max_mb = settings.get("max_file_mb")
+    return ScanLimits(
+        max_file_bytes=int(max_mb * 1024 * 1024) if max_mb else DEFAULT_LIMITS.max_file_bytes,
+        skip_extensions=tuple(ext.lower() for ext in
+                              settings.get("skip_extensions", DEFAULT_LIMITS.skip_extensions)),
+        skip_minified=bool(settings.get("skip_minified", DEFAULT_LIMITS.skip_minified)),
+    )
+
+
+def skip_reason(path, size, limits=DEFAULT_LIMITS):
+    """Why a file is skipped from its name and size alone, or None"""
+    if size > limits.max_file_bytes:
+        return f"larger than {limits.max_file_bytes / (1024 * 1024):g} MB"
+    if limits.skip_extensions and os.path.basename(path).lower().endswith(limits.skip_extensions):
+        return "skipped file type"
+    return None
+
+
+def sniff_reason(sample, limits=DEFAULT_LIMITS):
+    """Why a file is skipped from its leading bytes, or None"""
+    if b"\0" in sample:
+        return "binary"
+    if limits.skip_minified and len(sample) >= SNIFF_BYTES and \
+            len(sample) / (sample.count(b"\n") + 1) > MINIFIED_AVERAGE_LINE:
+        return "minified"
+    return None
+
+_compiled = {}
+
+
+def compile_rules(rules=None, binary=False):
+    """Merge (name, pattern, message) rules into one case-insensitive alternation
+
+    With binary=True the pattern matches bytes instead of str.
+    """
+    rules = tuple(rules or SECURITY_RULES)
+    pattern = _compiled.get((rules, binary))
+    if pattern is None:
+        alternation = "|".join(f"(?P<{name}>{regex})" for name, regex, _ in rules)
+        first = {regex[0].lower() for _, regex, _ in rules}
+        if all(char.isalnum() for char in first):
+            # A first-character lookahead lets the engine skip most positions
+            # without trying every branch of the alternation
+            alternation = f"(?=[{''.join(sorted(first))}])(?:{alternation})"
+        if binary:
+            alternation = alternation.encode('ascii')
+        pattern = re.compile(alternation, re.IGNORECASE)
+        _compiled[(rules, binary)] = pattern
+    return pattern
+
+
+def scan_text(text, rules=None):
+    """Return (line, column, rule) for every rule match in text, 1-based"""
+    pattern = compile_rules(rules)
+    matches = []
+    line, counted, pos = 1, 0, 0
+    while True:
+        match = pattern.search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        line += text.count("\n", counted, start)
+        counted = start
+        line_start = text.rfind("\n", 0, start) + 1
+        matches.append((line, start - line_start + 1, match.lastgroup))
+        # Resume just past the match start so rules overlapping on one line are all reported
+        pos = start + 1
+    return matches
+
+
+def scan_buffer(buffer, rules=None, window=WINDOW_BYTES, overlap=WINDOW_OVERLAP):
+    """Return (line, column, rule) for every rule match in a bytes-like buffer
+
+    The buffer is searched in windows of window bytes, each extended by
+    overlap bytes so matches starting near the edge are found whole; only
+    matches starting inside a window's own range are reported by it.
+    Columns count decoded characters, as scan_text does. For a line that
+    began in an earlier window, the characters already seen are carried
+    over with an incremental decoder, so a multibyte character split by
+    a window edge is counted once.
+    """
+    pattern = compile_rules(rules, binary=True)
+    size = len(buffer)
+    matches = []
+    line, line_start = 1, 0
+    # Characters of the current line before this window, and the decoder
+    # holding any partial character at the window edge
+    carried = 0
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    for base in range(0, size, window):
+        limit = min(window, size - base)
+        chunk = buffer[base:min(size, base + window + overlap)]
+        counted, pos = 0, 0
+        while True:
+            match = pattern.search(chunk, pos)
+            if match is None or match.start() >= limit:
+                break
+            start = match.start()
+            newlines = chunk.count(b"\n", counted, start)
+            if newlines:
+                line += newlines
+                line_start = base + chunk.rfind(b"\n", counted, start) + 1
+            counted = start
+            if line_start >= base:
+                column = len(chunk[line_start - base:start].decode('utf-8', errors='ignore')) + 1
+            else:
+                state = decoder.getstate()
+                column = carried + len(decoder.decode(chunk[:start])) + 1
+                decoder.setstate(state)
+            matches.append((line, column, match.lastgroup))
+            pos = start + 1
+        newlines = chunk.count(b"\n", counted, limit)
+        if newlines:
+            line += newlines
+            line_start = base + chunk.rfind(b"\n", counted, limit) + 1
+        if line_start >= base:
+            decoder.reset()
+            carried = len(decoder.decode(chunk[line_start - base:limit]))
+        else:
+            carried += len(decoder.decode(chunk[:limit]))
+    return matches
+
+
+def scan_file(path, rules=None, known_digest=None, limits=DEFAULT_LIMITS):
+    """Scan one file, returning (content digest, matches)
+
+    matches is None when the content digest equals known_digest, meaning
+    previously cached findings are still valid. Raises SkippedFile for
+    oversized, binary and minified files.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        reason = skip_reason(path, size, limits) or sniff_reason(f.read(SNIFF_BYTES), limits)
+        if reason:
+            raise SkippedFile(reason)
+        if size < MMAP_MIN_BYTES:
+            f.seek(0)
+            data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            if digest == known_digest:
+                return digest, None
+            return digest, scan_buffer(data, rules)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            digest = hashlib.sha1(mapped).hexdigest()
+            if digest == known_digest:
+                return digest, None
+            return digest, scan_buffer(mapped, rules)
+
+
+def _scan_batch(items, rules, limits=DEFAULT_LIMITS):
+    results = []
+    for path, known_digest in items:
+        skipped = None
+        try:
+            digest, matches = scan_file(path, rules, known_digest, limits)
+        except SkippedFile as e:
+            digest, matches, skipped = None, [], str(e)
+        except OSError:
+            digest, matches = None, []
+        results.append((path, digest, matches, skipped))
+    return results
+
+
+def balanced_batches(sized_items, count):
+    """Split (size, item) pairs into count batches of roughly equal total size"""
+    sized = sorted(sized_items, key=lambda pair: (-pair[0], str(pair[1])))
+    heap = [(0, i) for i in range(count)]
+    batches = [[] for _ in range(count)]
+    for size, item in sized:
+        total, i = heapq.heappop(heap)
+        batches[i].append(item)
+        heapq.heappush(heap, (total + size, i))
+    return [batch for batch in batches if batch]
+
+
+def scan_files(paths, rules=None, workers=None, cache=None, limits=DEFAULT_LIMITS, skipped=None):
+    """Scan files in parallel and return Findings sorted by path, line and column
+
+    skipped, if given, is a list that receives (path, reason) for every
+    file left unscanned by limits.
+    """
+    rules = list(rules or SECURITY_RULES)
+    limits = limits or DEFAULT_LIMITS
+    messages = {name: message for name, _, message in rules}
+    workers = workers or os.cpu_count() or 1
+
+    scanned = []
+    pending = []
+    for path in paths:
+        path = str(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        reason = skip_reason(path, stat.st_size, limits)
+        if reason:
+            if skipped is not None:
+                skipped.append((path, reason))
+            continue
+        cached = cache.lookup(path, stat) if cache is not None else None
+        if cached is not None:
+            scanned.append((path, None, cached))
+        else:
+            known = cache.digest(path) if cache is not None else None
+            pending.append((stat.st_size, (path, known)))
+
+    total_bytes = sum(size for size, _ in pending)
+    batches = balanced_batches(pending, max(1, workers * BATCHES_PER_WORKER))
+    with span("scan files", "scanner", files=len(pending), bytes=total_bytes,
+              cached=len(scanned)) as scan_span:
+        if workers == 1 or len(batches) <= 1 or total_bytes < PARALLEL_MIN_BYTES:
+            scan_span.set(workers=1)
+            results = _scan_batch([item for _, item in pending], rules, limits)
+        else:
+            scan_span.set(workers=workers)
+            results = []
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for batch_result in pool.map(_scan_batch, batches, [rules] * len(batches),
+                                               [limits] * len(batches)):
+                    results.extend(batch_result)
+
+    for path, digest, matches, reason in results:
+        if reason:
+            if skipped is not None:
+                skipped.append((path, reason))
+            continue
+        if cache is not None and digest is not None:
+            if matches is None:
+                matches = cache.digest_matches(path)
+            cache.store(path, digest, matches)
+        scanned.append((path, digest, matches or []))
+
+    if cache is not None:
+        cache.save(path for path, _, _ in scanned)
+
+    findings = [Finding(path, line, column, rule, messages[rule])
+                for path, _, matches in scanned
+                for line, column, rule in matches]
+    findings.sort(key=lambda f: (f.path, f.line, f.column, f.rule))
+    return findings
@@ -0,0 +1,555 @@
+"""SQLite memory backend for CCOM
+
+Stores features one row each in .claude/memory.db with indexes on the
+creation time and normalized name / user term, plus an FTS5 table over
+names and descriptions and the BM25 postings used by rank (feature_terms,
+feature_lengths; see cco.relevance). It answers the same queries and accepts the same
+journal records as MemoryJournal, so the memory engine and orchestrator
+work unchanged on either backend. import_memory/export_memory convert
+to and from the memory.json format.
+
+Writes run in transaction(), a BEGIN IMMEDIATE transaction taken under
+the project's write lock (cco.locking), which queues waiting writers
+instead of leaving them to SQLite's sleep-and-retry busy handler; nested
+ones are savepoints. The database is in WAL
+mode, so readers in other processes never wait for a writer, and every
+write bumps metadata.revision the way MemoryJournal does, so a memory
+saved from an earlier read is merged rather than overwriting (see
+cco.journal.merge_memory).
+
+With write_behind set (the daemon) records are applied inside one open
+transaction, each in its own savepoint, and flush commits them together;
+the write lock is held until then.
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cco.dedupe import DEFAULT_THRESHOLD, feature_terms, index_keys, rank_candidates, rarest_keys, tokenize
+from cco.journal import REVISION_PATH, MergeBase, has_revision, merge_memory, revision_of, set_op
+from cco.locking import LOCK_FILE, shared_lock
+from cco.relevance import FIELDS, bm25_scores, field_counts, terms
+from cco.util import normalize_name, parse_date
+
+# Seconds a writer waits for another process's transaction
+BUSY_TIMEOUT = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS features (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    normalized_name TEXT NOT NULL,
+    normalized_term TEXT,
+    created_ts REAL,
+    description TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS features_created ON features(created_ts);
+CREATE INDEX IF NOT EXISTS features_normalized_name ON features(normalized_name);
+CREATE INDEX IF NOT EXISTS features_normalized_term ON features(normalized_term);
+CREATE TABLE IF NOT EXISTS feature_keys (
+    key TEXT NOT NULL,
+    feature_id INTEGER NOT NULL,
+    PRIMARY KEY (key, feature_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS feature_keys_feature ON feature_keys(feature_id);
+CREATE TRIGGER IF NOT EXISTS feature_keys_ad AFTER DELETE ON features BEGIN
+    DELETE FROM feature_keys WHERE feature_id = old.id;
+END;
+CREATE TABLE IF NOT EXISTS feature_terms (
+    term TEXT NOT NULL,
+    feature_id INTEGER NOT NULL,
+    name_tf INTEGER NOT NULL,
+    description_tf INTEGER NOT NULL,
+    files_tf INTEGER NOT NULL,
+    PRIMARY KEY (term, feature_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS feature_terms_feature ON feature_terms(feature_id);
+CREATE TABLE IF NOT EXISTS feature_lengths (
+    feature_id INTEGER PRIMARY KEY,
+    name_len INTEGER NOT NULL,
+    description_len INTEGER NOT NULL,
+    files_len INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS feature_terms_ad AFTER DELETE ON features BEGIN
+    DELETE FROM feature_terms WHERE feature_id = old.id;
+    DELETE FROM feature_lengths WHERE feature_id = old.id;
+END;
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS features_fts USING fts5(
+    name, description, content='features', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS features_ai AFTER INSERT ON features BEGIN
+    INSERT INTO features_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS features_ad AFTER DELETE ON features BEGIN
+    INSERT INTO features_fts(features_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS features_au AFTER UPDATE ON features BEGIN
+    INSERT INTO features_fts(features_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+    INSERT INTO features_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+END;
+"""
+
+
+def _feature_row(name, data):
+    date = parse_date(data.get("created"))
+    term = data.get("userTerm")
+    return (
+        name,
+        normalize_name(name),
+        normalize_name(term) if term else None,
+        date.timestamp() if date is not None else None,
+        data.get("description") or "",
+        json.dumps(data, ensure_ascii=False),
+    )
+
+
+def _similarity_keys(name, data):
+    keys = set()
+    for term in feature_terms(name, data):
+        keys |= index_keys(tokenize(term))
+    return keys
+
+
+def _fts_query(text):
+    words = [word.replace('"', '""') for word in text.split()]
+    return " ".join(f'"{word}"' for word in words)
+
+
+class SqliteMemoryStore:
+    """Memory stored in .claude/memory.db (the "sqlite" backend)"""
+
+    backend = "sqlite"
+
+    def __init__(self, claude_dir):
+        self.claude_dir = Path(claude_dir)
+        self.db_path = self.claude_dir / "memory.db"
+        self._conn = None
+        self._memory = None
+        self.has_fts = False
+        self.write_behind = False
+        self._pending = 0
+        self._bases = MergeBase()
+        self._file_lock = shared_lock(self.claude_dir / LOCK_FILE)
+        self._holding_lock = False
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self.claude_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5; search falls back to LIKE
+                self.has_fts = False
+            self._backfill_keys()
+        return self._conn
+
+    def _backfill_keys(self):
+        # Databases created before the similarity and relevance indexes existed
+        conn = self._conn
+        for table, index in (("feature_keys", self._index_keys), ("feature_lengths", self._index_terms)):
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() \
+                    or not conn.execute("SELECT 1 FROM features LIMIT 1").fetchone():
+                continue
+            with self.transaction():
+                # Another process may have filled it while this one waited
+                if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                    continue
+                rows = conn.execute("SELECT id, name, data FROM features").fetchall()
+                for feature_id, name, data in rows:
+                    index(feature_id, name, json.loads(data))
+
+    def _index_keys(self, feature_id, name, data):
+        self._conn.execute("DELETE FROM feature_keys WHERE feature_id = ?", (feature_id,))
+        self._conn.executemany(
+            "INSERT INTO feature_keys (key, feature_id) VALUES (?, ?)",
+            ((key, feature_id) for key in _similarity_keys(name, data)))
+
+    def _index_terms(self, feature_id, name, data):
+        counts, lengths = field_counts(name, data)
+        self._conn.execute("DELETE FROM feature_terms WHERE feature_id = ?", (feature_id,))
+        self._conn.executemany(
+            "INSERT INTO feature_terms (term, feature_id, name_tf, description_tf, files_tf) "
+            "VALUES (?, ?, ?, ?, ?)",
+            ((term, feature_id) + tuple(fields.get(field, 0) for field in FIELDS)
+             for term, fields in counts.items()))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO feature_lengths (feature_id, name_len, description_len, files_len) "
+            "VALUES (?, ?, ?, ?)", (feature_id,) + tuple(lengths[field] for field in FIELDS))
+
+    def open(self):
+        """Returns False when the database has no memory yet"""
+        if not self.db_path.exists():
+            return False
+        row = self.conn.execute("SELECT 1 FROM sections WHERE key = 'project'").fetchone()
+        return row is not None
+
+    def close(self):
+        """Commit queued records and close the database connection"""
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def memory(self):
+        """Full memory dict in memory.json format, materialized on first access"""
+        if self._memory is None:
+            self._memory = self.export_memory()
+            self._bases.remember(self._memory)
+        return self._memory
+
+    @contextmanager
+    def transaction(self):
+        """Hold the database write lock, see MemoryJournal.transaction"""
+        conn = self.conn
+        with self._file_lock:
+            started = not conn.in_transaction
+            if started:
+                conn.execute("BEGIN IMMEDIATE")
+                # Other processes may have written since it was built
+                self._memory = None
+            conn.execute("SAVEPOINT nested")
+            try:
+                yield self
+            except BaseException:
+                conn.execute("ROLLBACK TO nested")
+                conn.execute("RELEASE nested")
+                if started:
+                    conn.rollback()
+                self._memory = None
+                raise
+            conn.execute("RELEASE nested")
+            if started and self.write_behind and self._pending:
+                # Other writers wait on the lock, not SQLite's busy handler, until flush
+                self._file_lock.acquire()
+                self._holding_lock = True
+            elif started:
+                conn.commit()
+
+    def _revision(self):
+        return self.section("metadata").get("revision", 0)
+
+    def _bump_revision(self):
+        self._apply(set_op(REVISION_PATH, self._revision() + 1))
+
+    # Import / export
+    def export_memory(self):
+        """Build the memory.json dict from the database"""
+        conn = self.conn
+        started = not conn.in_transaction
+        if started:
+            # Sections and features from the same commit
+            conn.execute("BEGIN")
+        try:
+            memory = {}
+            sections = conn.execute("SELECT key, value FROM sections ORDER BY position").fetchall()
+            for key, value in sections:
+                memory[key] = json.loads(value)
+                if key == "project":
+                    memory["features"] = {}
+            features = memory.setdefault("features", {})
+            for name, data in conn.execute("SELECT name, data FROM features ORDER BY id"):
+                features[name] = json.loads(data)
+        finally:
+            if started:
+                conn.commit()
+        return memory
+
+    def import_memory(self, memory):
+        """Replace the database contents with a memory.json dict"""
+        with self.transaction():
+            self._replace(memory)
+            self._bump_revision()
+        self._memory = None
+        return True
+
+    def _replace(self, memory):
+        conn = self.conn
+        conn.execute("DELETE FROM sections")
+        conn.execute("DELETE FROM features")
+        position = 0
+        for key, value in memory.items():
+            if key == "features":
+                continue
+            conn.execute("INSERT INTO sections (key, position, value) VALUES (?, ?, ?)",
+                         (key, position, json.dumps(value, ensure_ascii=False)))
+            position += 1
+        conn.execute("DELETE FROM feature_keys")
+        conn.execute("DELETE FROM feature_terms")
+        conn.execute("DELETE FROM feature_lengths")
+        for name, data in memory.get("features", {}).items():
+            cursor = conn.execute(
+                "INSERT INTO features (name, normalized_name, normalized_term, created_ts, description, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                _feature_row(name, data))
+            self._index_keys(cursor.lastrowid, name, data)
+            self._index_terms(cursor.lastrowid, name, data)
+
+    # Mutations, accepting the same records as MemoryJournal
+    def snapshot(self, memory=None):
+        """Replace all stored memory, merging a memory read at an older revision"""
+        with self.transaction():
+            current = self._revision()
+            if memory is None:
+                memory = self.memory
+            elif has_revision(memory) and revision_of(memory) != current and self.open():
+                memory, _ = merge_memory(self._bases.at(revision_of(memory)),
+                                         memory, self.export_memory())
+            memory.setdefault("metadata", {})["revision"] = max(current, revision_of(memory)) + 1
+            self._replace(memory)
+        self._memory = None
+        self._bases.remember(memory)
+        return True
+
+    def append(self, record):
+        """Apply a journal record in a single transaction"""
+        with self.transaction():
+            self._apply(record)
+            self._bump_revision()
+            if self.write_behind:
+                self._pending += 1
+        self._memory = None
+        return True
+
+    def flush(self):
+        """Commit the records applied under write_behind, returns how many there were"""
+        pending, self._pending = self._pending, 0
+        if self._conn is not None and self._conn.in_transaction:
+            self._conn.commit()
+        if self._holding_lock:
+            self._holding_lock = False
+            self._file_lock.release()
+        return pending
+
+    @property
+    def pending(self):
+        """Number of records applied under write_behind and not yet committed"""
+        return self._pending
+
+    def data_files(self):
+        """Files holding this store's memory"""
+        return [self.db_path, self.db_path.with_name(self.db_path.name + "-wal")]
+
+    def refresh(self):
+        """Drop the cached memory after another process changed the database"""
+        self.flush()
+        self._memory = None
+
+    def set(self, path, value):
+        """Set the value at path, e.g. ("features", name)"""
+        return self.append({"op": "set", "path": list(path), "value": value})
+
+    def delete(self, path):
+        """Delete the value at path"""
+        return self.append({"op": "delete", "path": list(path)})
+
+    def _apply(self, record):
+        op = record.get("op")
+        if op == "batch":
+            for sub in record["ops"]:
+                self._apply(sub)
+        elif op == "replace":
+            self._replace(record["value"])
+        elif op in ("set", "delete"):
+            path = record["path"]
+            if path[0] == "features" and len(path) > 1:
+                self._apply_feature(op, path[1], path[2:], record.get("value"))
+            else:
+                self._apply_section(op, path[0], path[1:], record.get("value"))
+
+    def _apply_feature(self, op, name, subpath, value):
+        if op == "delete" and not subpath:
+            self.conn.execute("DELETE FROM features WHERE name = ?", (name,))
+            return
+        if subpath:
+            row = self.conn.execute("SELECT data FROM features WHERE name = ?", (name,)).fetchone()
+            data = json.loads(row[0]) if row else {}
+            _set_nested(data, subpath, value, delete=(op == "delete"))
+            value = data
+        self.conn.execute(
+            "INSERT INTO features (name, normalized_name, normalized_term, created_ts, description, data) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET normalized_name = excluded.normalized_name, "
+            "normalized_term = excluded.normalized_term, created_ts = excluded.created_ts, "
+            "description = excluded.description, data = excluded.data",
+            _feature_row(name, value))
+        feature_id = self.conn.execute("SELECT id FROM features WHERE name = ?", (name,)).fetchone()[0]
+        self._index_keys(feature_id, name, value)
+        self._index_terms(feature_id, name, value)
+
+    def _apply_section(self, op, key, subpath, value):
+        row = self.conn.execute("SELECT value FROM sections WHERE key = ?", (key,)).fetchone()
+        if op == "delete" and not subpath:
+            self.conn.execute("DELETE FROM sections WHERE key = ?", (key,))
+            return
+        if subpath:
+            section = json.loads(row[0]) if row else {}
+            _set_nested(section, subpath, value, delete=(op == "delete"))
+            value = section
+        encoded = json.dumps(value, ensure_ascii=False)
+        if row:
+            self.conn.execute("UPDATE sections SET value = ? WHERE key = ?", (encoded, key))
+        else:
+            self.conn.execute(
+                "INSERT INTO sections (key, position, value) "
+                "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM sections), ?)",
+                (key, encoded))
+
+    # Indexed queries
+    def feature_count(self):
+        """Number of live features"""
+        return self.conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+    def find_duplicate(self, name):
+        """First feature whose name or user term matches name, else None"""
+        normalized = normalize_name(name)
+        row = self.conn.execute(
+            "SELECT name FROM features WHERE id = (SELECT MIN(id) FROM ("
+            "SELECT id FROM features WHERE normalized_name = ? "
+            "UNION ALL SELECT id FROM features WHERE normalized_term = ?))",
+            (normalized, normalized)).fetchone()
+        return row[0] if row else None
+
+    def similar_features(self, name, threshold=None, limit=5):
+        """Near-duplicate features as (score, name) pairs, best first"""
+        threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+        query = tokenize(name)
+        if not query:
+            return []
+
+        keys = list(index_keys(query))
+        marks = ",".join("?" * len(keys))
+        counts = dict(self.conn.execute(
+            f"SELECT key, COUNT(*) FROM feature_keys WHERE key IN ({marks}) GROUP BY key", keys))
+        probe = rarest_keys(query, threshold, lambda key: counts.get(key, 0))
+        marks = ",".join("?" * len(probe))
+        rows = self.conn.execute(
+            f"SELECT name, data FROM features WHERE id IN "
+            f"(SELECT feature_id FROM feature_keys WHERE key IN ({marks}))", probe)
+        candidates = ((n, [tokenize(term) for term in feature_terms(n, json.loads(d))]) for n, d in rows)
+        return rank_candidates(query, candidates, threshold, limit)
+
+    def rank(self, query, limit=None):
+        """Features ranked by BM25 relevance to query, as (score, name) pairs"""
+        query_terms = sorted(set(terms(query)))
+        if not query_terms:
+            return []
+        count, *sums = self.conn.execute(
+            "SELECT COUNT(*), TOTAL(name_len), TOTAL(description_len), TOTAL(files_len) "
+            "FROM feature_lengths").fetchone()
+        marks = ",".join("?" * len(query_terms))
+        postings = {}
+        lengths = {}
+        for term, name, *row in self.conn.execute(
+                f"SELECT t.term, f.name, t.name_tf, t.description_tf, t.files_tf, "
+                f"l.name_len, l.description_len, l.files_len FROM feature_terms t "
+                f"JOIN features f ON f.id = t.feature_id "
+                f"JOIN feature_lengths l ON l.feature_id = t.feature_id "
+                f"WHERE t.term IN ({marks})", query_terms):
+            postings.setdefault(term, {})[name] = {field: tf for field, tf in zip(FIELDS, row) if tf}
+            lengths[name] = dict(zip(FIELDS, row[3:]))
+        return bm25_scores(query_terms, count, dict(zip(FIELDS, sums)), postings, lengths, limit)
+
+    def get_feature(self, name):
+        """Data of the feature named exactly name, else None"""
+        row = self.conn.execute("SELECT data FROM features WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def section(self, key):
+        """A top-level memory section such as "metadata", or {}"""
+        row = self.conn.execute("SELECT value FROM sections WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]) if row else None) or {}
+
+    def created_range(self):
+        """(oldest, newest) creation datetimes, or (None, None) without dated features"""
+        oldest, newest = self.conn.execute(
+            "SELECT MIN(created_ts), MAX(created_ts) FROM features").fetchone()
+        if oldest is None:
+            return None, None
+        return (datetime.fromtimestamp(oldest, timezone.utc),
+                datetime.fromtimestamp(newest, timezone.utc))
+
+    def disk_size(self):
+        """Bytes of memory.db and its write-ahead files"""
+        size = 0
+        for suffix in ("", "-wal", "-journal"):
+            try:
+                size += self.db_path.with_name(self.db_path.name + suffix).stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def find_feature(self, name):
+        """First feature whose name matches name case-insensitively, else None"""
+        row = self.conn.execute(
+            "SELECT name FROM features WHERE normalized_name = ? ORDER BY id LIMIT 1",
+            (normalize_name(name),)).fetchone()
+        return row[0] if row else None
+
+    def features_created_before(self, cutoff):
+        """(name, data) pairs for features created before a POSIX timestamp"""
+        rows = self.conn.execute(
+            "SELECT name, data FROM features WHERE created_ts < ? ORDER BY id", (cutoff,))
+        return [(name, json.loads(data)) for name, data in rows]
+
+    def sorted_features(self, sort_by="created"):
+        """(name, data) pairs sorted by creation date or case-insensitive name"""
+        if sort_by == "name":
+            rows = self.conn.execute("SELECT name, data FROM features").fetchall()
+            rows.sort(key=lambda row: (row[0].casefold(), row[0]))
+        else:
+            rows = self.conn.execute(
+                "SELECT name, data FROM features ORDER BY created_ts IS NOT NULL, created_ts, id")
+        return [(name, json.loads(data)) for name, data in rows]
+
+    def long_descriptions(self, max_length):
+        """(name, description) pairs whose description exceeds max_length"""
+        return self.conn.execute(
+            "SELECT name, description FROM features WHERE length(description) > ? ORDER BY id",
+            (max_length,)).fetchall()
+
+    def search(self, text, limit=20):
+        """Features matching every word of text, best matches first"""
+        if not text.split():
+            return []
+        conn = self.conn
+        if self.has_fts:
+            rows = conn.execute(
+                "SELECT f.name, f.data FROM features_fts JOIN features f ON f.id = features_fts.rowid "
+                "WHERE features_fts MATCH ? ORDER BY rank LIMIT ?",
+                (_fts_query(text), limit))
+        else:
+            clauses = " AND ".join("(name || ' ' || description) LIKE ?" for _ in text.split())
+            rows = conn.execute(
+                f"SELECT name, data FROM features WHERE {clauses} ORDER BY id LIMIT ?",
+                [f"%{word}%" for word in text.split()] + [limit])
+        return [(name, json.loads(data)) for name, data in rows]
+
+
+def _set_nested(target, path, value, delete=False):
+    *parents, key = path
+    for part in parents:
+        target = target.setdefault(part, {})
+    if delete:
+        target.pop(key, None)
+    else:
+        target[key] = value
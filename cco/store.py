@@ -0,0 +1,63 @@
+"""Memory backend selection for CCOM
+
+Two interchangeable backends implement the same store interface:
+"json" (memory.json snapshot + memory.journal, see cco.journal) and
+"sqlite" (memory.db, see cco.sqlite_store). A project uses the sqlite
+backend when .claude/memory.db exists; switch_backend migrates between
+the two.
+"""
+
+import json
+import os
+
+from cco.journal import MemoryJournal, write_atomic
+
+BACKENDS = ("json", "sqlite")
+
+
+def current_backend(claude_dir):
+    """Name of the backend a project is using"""
+    return "sqlite" if os.path.exists(os.path.join(claude_dir, "memory.db")) else "json"
+
+
+def open_store(claude_dir, backend=None):
+    """Create the memory store for a .claude directory"""
+    backend = backend or current_backend(claude_dir)
+    if backend == "sqlite":
+        from cco.sqlite_store import SqliteMemoryStore
+        return SqliteMemoryStore(claude_dir)
+    return MemoryJournal(claude_dir)
+
+
+def switch_backend(claude_dir, backend):
+    """Migrate memory to another backend, returns the number of features moved"""
+    source = open_store(claude_dir)
+    if source.backend == backend:
+        return None
+    if not source.open():
+        raise ValueError("No memory to migrate")
+
+    memory = source.memory
+    target = open_store(claude_dir, backend)
+    target.snapshot(memory)
+    source.close()
+    target.close()
+
+    if backend == "sqlite":
+        # Keep the JSON files as a backup but out of the way of the json backend
+        for path in (source.snapshot_path, source.journal_path):
+            if os.path.exists(path):
+                os.replace(path, f"{path}.bak")
+    else:
+        os.replace(source.db_path, f"{source.db_path}.bak")
+    return len(memory.get("features", {}))
+
+
+def export_memory(claude_dir, path):
+    """Write memory in memory.json format to path"""
+    store = open_store(claude_dir)
+    if not store.open():
+        raise ValueError("No memory to export")
+    write_atomic(path, json.dumps(store.memory, indent=2, ensure_ascii=False))
+    store.close()
+    return len(store.memory.get("features", {}))
@@ -1,36 +1,381 @@
 // CCOM v0.2 - Memory System with Management Features (400 lines total)
 const fs = require('fs');
 const path = require('path');
+const zlib = require('zlib');
+
+// Context-cost estimate, same rules as cco/tokens.py (bump the version with them)
+const ESTIMATOR_VERSION = 1;
+const CONTEXT_WINDOW_TOKENS = 200000;
+const PIECES = /[A-Za-z]+|[0-9]+|[ \t\n\r\f\v]+|[!-\/:-@\[-`{-~]+|[^\x00-\x7f]|[\x00-\x7f]/gu;
+const HUMPS = /[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+/g;
+
+function estimateTokens(text) {
+  let tokens = 0;
+  for (const [piece] of (text || '').matchAll(PIECES)) {
+    if (/^[A-Za-z]/.test(piece)) {
+      for (const [hump] of piece.matchAll(HUMPS)) {
+        tokens += 1 + Math.floor((hump.length - 1) / 6);
+      }
+    } else if (/^[0-9]/.test(piece)) {
+      tokens += Math.ceil(piece.length / 3);
+    } else if (/^[ \t\n\r\f\v]/.test(piece)) {
+      tokens += piece === ' ' ? 0 : 1;
+    } else if (/^[!-~]/.test(piece)) {
+      tokens += Math.ceil(piece.length / 2);
+    } else {
+      tokens += piece.codePointAt(0) > 0xFFFF ? 2 : 1;
+    }
+  }
+  return tokens;
+}
+
+function summaryLine(name, data) {
+  const userTerm = data.userTerm !== name ? ` (aka "${data.userTerm}")` : '';
+  return `• ${name}${userTerm}: ${data.description || 'No description'}`;
+}
+
+// A feature's context cost: its summary line and line break
+function featureTokens(name, data) {
+  return estimateTokens(summaryLine(name, data)) + 1;
+}
+
+// Tokens of the context summary around the feature lines
+function summaryOverhead(projectName, version, featureCount) {
+  if (!featureCount) return estimateTokens(`Starting fresh project: ${projectName}`);
+  return estimateTokens(
+    `🧠 Memory Loaded: ${projectName} (v${version})\n` +
+    'Memory: 0 tokens (0.0% of context)\n' +
+    `Features built (${featureCount}):\n` +
+    '\n⚠️ Check for duplicates before creating new features!');
+}
+
+function tokenState(total = 0, features = 0) {
+  return { total, features, estimator: ESTIMATOR_VERSION };
+}
+
+// Relevance ranking for context packing, same rules as cco/relevance.py (BM25F
+// over name, description and files)
+const PACK_BUDGET_TOKENS = 2000;
+const K1 = 1.2;
+const FIELDS = ['name', 'description', 'files'];
+const FIELD_WEIGHTS = { name: 3.0, description: 1.0, files: 1.5 };
+const FIELD_B = { name: 0.5, description: 0.75, files: 0.5 };
+const STOPWORDS = new Set(`
+a an and the of for to in on with by from at or is be as it this that into via
+src lib app index js ts jsx tsx py mjs cjs json md test tests spec main master
+feature features feat fix bugfix hotfix chore refactor wip dev develop release
+`.split(/\s+/).filter(Boolean));
+
+function terms(text) {
+  const words = (text || '').replace(/([a-z0-9])([A-Z])/g, '$1 $2').toLowerCase().match(/[a-z0-9]+/g) || [];
+  return words.filter(word => word.length > 1 && !STOPWORDS.has(word));
+}
+
+function featureFields(name, data) {
+  const label = !data.userTerm || data.userTerm === name ? name : `${name} ${data.userTerm}`;
+  return {
+    name: terms(label),
+    description: terms(data.description),
+    files: terms((data.files || []).join(' '))
+  };
+}
+
+// Features ranked by BM25F relevance to query, as [score, name] pairs
+function rankFeatures(features, query) {
+  const queryTerms = new Set(terms(query));
+  const names = Object.keys(features);
+  if (queryTerms.size === 0 || names.length === 0) return [];
+
+  const totals = { name: 0, description: 0, files: 0 };
+  const lengths = {};
+  const postings = {};
+  for (const name of names) {
+    const fields = featureFields(name, features[name]);
+    lengths[name] = {};
+    for (const field of FIELDS) {
+      lengths[name][field] = fields[field].length;
+      totals[field] += fields[field].length;
+      for (const word of fields[field]) {
+        if (!queryTerms.has(word)) continue;
+        const counts = ((postings[word] = postings[word] || {})[name] = postings[word][name] || {});
+        counts[field] = (counts[field] || 0) + 1;
+      }
+    }
+  }
+
+  const average = {};
+  for (const field of FIELDS) average[field] = (totals[field] / names.length) || 1;
+  const scores = {};
+  for (const word of queryTerms) {
+    const matches = postings[word];
+    if (!matches) continue;
+    const df = Object.keys(matches).length;
+    const idf = Math.log(1 + (names.length - df + 0.5) / (df + 0.5));
+    for (const [name, fields] of Object.entries(matches)) {
+      let tf = 0;
+      for (const [field, freq] of Object.entries(fields)) {
+        const b = FIELD_B[field];
+        tf += FIELD_WEIGHTS[field] * freq / (1 - b + b * lengths[name][field] / average[field]);
+      }
+      scores[name] = (scores[name] || 0) + idf * tf * (K1 + 1) / (tf + K1);
+    }
+  }
+  return Object.entries(scores)
+    .map(([name, score]) => [Math.round(score * 10000) / 10000, name])
+    .sort((a, b) => b[0] - a[0] || (a[1] < b[1] ? -1 : a[1] > b[1] ? 1 : 0));
+}
+
+// Writers lock memory by creating this file exclusively, holding their pid.
+// cco/locking.py takes it too, so Node and Python writers exclude each other.
+const LOCK_OWNER_FILE = 'memory.lock.pid';
+const LOCK_STALE_MS = 30000;
+const LOCK_RETRY_MS = 10;
+const LOCK_TIMEOUT_MS = 60000;
+
+function sleepMs(ms) {
+  Atomics.wait(new Int32Array(new SharedArrayBuffer(4)), 0, 0, ms);
+}
+
+// Inode of an owner file whose writer is gone (same rules as cco/locking.py), else null
+function staleLock(lockPath) {
+  let stat;
+  let content;
+  try {
+    stat = fs.statSync(lockPath);
+    content = fs.readFileSync(lockPath, 'ascii').trim();
+  } catch (e) {
+    return null;
+  }
+  let alive = null;
+  if (/^\d+$/.test(content)) {
+    try {
+      process.kill(parseInt(content), 0);
+      alive = true;
+    } catch (e) {
+      alive = e.code !== 'ESRCH';
+    }
+  }
+  if (alive === null) alive = Date.now() - stat.mtimeMs < LOCK_STALE_MS;
+  return alive ? null : stat.ino;
+}
+
+function acquireLock(lockPath) {
+  const deadline = Date.now() + LOCK_TIMEOUT_MS;
+  for (;;) {
+    try {
+      const fd = fs.openSync(lockPath, 'wx');
+      try {
+        fs.writeSync(fd, `${process.pid}\n`);
+      } finally {
+        fs.closeSync(fd);
+      }
+      return;
+    } catch (e) {
+      if (e.code !== 'EEXIST') throw e;
+    }
+    const inode = staleLock(lockPath);
+    if (inode !== null) {
+      // Only remove the file found stale, not one a writer just created
+      try {
+        if (fs.statSync(lockPath).ino === inode) fs.unlinkSync(lockPath);
+      } catch (e) {
+        // Already gone
+      }
+      continue;
+    }
+    if (Date.now() > deadline) {
+      throw new Error(`memory is locked by another writer (${lockPath})`);
+    }
+    sleepMs(LOCK_RETRY_MS);
+  }
+}
+
+function releaseLock(lockPath) {
+  try {
+    fs.unlinkSync(lockPath);
+  } catch (e) {
+    // Already gone
+  }
+}
+
+function revisionOf(memory) {
+  return (memory && memory.metadata && memory.metadata.revision) || 0;
+}
+
+// Three-way merge of feature maps, same rules as merge_memory in cco/journal.py
+function mergeMemory(base, ours, theirs) {
+  const same = (a, b) => JSON.stringify(a) === JSON.stringify(b);
+  const merged = Object.assign({}, theirs.features || {});
+  const mine = ours.features || {};
+  if (!base) {
+    Object.assign(merged, mine);
+  } else {
+    for (const name of new Set([...Object.keys(base), ...Object.keys(mine)])) {
+      if (same(mine[name], base[name])) continue;
+      if (name in mine) {
+        merged[name] = mine[name];
+      } else if (same(merged[name], base[name])) {
+        delete merged[name];
+      }
+    }
+  }
+  let total = 0;
+  for (const [name, data] of Object.entries(merged)) {
+    total += data.tokens || featureTokens(name, data);
+  }
+  return Object.assign({}, ours, {
+    features: merged,
+    metadata: Object.assign({}, ours.metadata, {
+      revision: Math.max(revisionOf(ours), revisionOf(theirs)),
+      tokens: tokenState(total, Object.keys(merged).length)
+    })
+  });
+}
+
+function git(args) {
+  try {
+    return require('child_process').execFileSync('git', args, {
+      cwd: path.dirname(__dirname), stdio: ['ignore', 'pipe', 'ignore'], timeout: 10000
+    }).toString();
+  } catch (e) {
+    return '';
+  }
+}
+
+// Query describing the work in progress: branch name and changed files
+function sessionQuery(maxFiles = 50) {
+  const branch = git(['symbolic-ref', '--short', '-q', 'HEAD']).trim();
+  const paths = git(['status', '--porcelain', '--untracked-files=all']).split('\n')
+    .filter(line => line.length > 3)
+    .map(line => line.slice(3).split(' -> ').pop().replace(/^"|"$/g, ''))
+    .filter(file => !file.startsWith('.claude/'))
+    .slice(0, maxFiles);
+  return [branch, ...paths].filter(Boolean).join(' ');
+}
 
 class CCOM {
   constructor() {
     this.memoryPath = path.join(__dirname, 'memory.json');
+    this.journalPath = path.join(__dirname, 'memory.journal');
+    this.lockPath = path.join(__dirname, LOCK_OWNER_FILE);
     this.archivePath = path.join(__dirname, 'archive');
     this.memory = this.loadMemory();
+    this.ensureTokenCounts();
     this.setupHooks();
   }
 
   // Core memory functions
   loadMemory() {
+    const memory = this.readDisk();
+    if (memory) {
+      this.rememberBase(memory);
+      return memory;
+    }
+    // First run or corrupted - create new
+    const empty = this.createEmptyMemory();
+    this.saveMemory(empty);
+    return empty;
+  }
+
+  // Snapshot plus journal as currently on disk, null if there is no valid snapshot
+  readDisk() {
     try {
-      const data = fs.readFileSync(this.memoryPath, 'utf8');
-      return JSON.parse(data);
+      return this.replayJournal(JSON.parse(fs.readFileSync(this.memoryPath, 'utf8')));
     } catch (e) {
-      // First run or corrupted - create new
-      const empty = this.createEmptyMemory();
-      this.saveMemory(empty);
-      return empty;
+      return null;
     }
   }
 
+  // Features as loaded, the base for merging a later save
+  rememberBase(memory) {
+    this.base = {
+      revision: revisionOf(memory),
+      features: JSON.parse(JSON.stringify(memory.features || {}))
+    };
+  }
+
+  // Apply mutations appended to memory.journal by the Python engine
+  replayJournal(memory) {
+    if (!fs.existsSync(this.journalPath)) return memory;
+
+    const lines = fs.readFileSync(this.journalPath, 'utf8').split('\n');
+    lines.pop(); // Last element is empty or a torn write
+    for (const [i, line] of lines.entries()) {
+      let record;
+      try {
+        record = JSON.parse(line);
+      } catch (e) {
+        break;
+      }
+      if (i === 0 && record.op === 'base' && record.revision !== revisionOf(memory)) {
+        break; // Left over from an older snapshot, which this one includes
+      }
+      memory = this.applyJournalRecord(memory, record);
+    }
+    return memory;
+  }
+
+  applyJournalRecord(memory, record) {
+    if (record.op === 'set' || record.op === 'delete') {
+      const parents = record.path.slice(0, -1);
+      const key = record.path[record.path.length - 1];
+      let target = memory;
+      for (const part of parents) {
+        if (!target[part] || typeof target[part] !== 'object') {
+          if (record.op === 'delete') return memory;
+          target[part] = {};
+        }
+        target = target[part];
+      }
+      if (record.op === 'set') {
+        target[key] = record.value;
+      } else {
+        delete target[key];
+      }
+    } else if (record.op === 'batch') {
+      for (const sub of record.ops) {
+        memory = this.applyJournalRecord(memory, sub);
+      }
+    } else if (record.op === 'replace') {
+      memory = record.value;
+    }
+    return memory;
+  }
+
   saveMemory(memory = this.memory) {
     try {
-      fs.writeFileSync(this.memoryPath, JSON.stringify(memory, null, 2));
+      acquireLock(this.lockPath);
+    } catch (e) {
+      console.error('Failed to save memory:', e.message);
+      return false;
+    }
+    try {
+      // Another session may have written since this one loaded: merge its
+      // changes in rather than overwrite them. The lock keeps every other
+      // writer out from this read until the journal it folds in is removed.
+      const disk = this.readDisk();
+      if (disk && memory.metadata && 'revision' in memory.metadata &&
+          revisionOf(disk) !== revisionOf(memory)) {
+        const base = this.base && this.base.revision === revisionOf(memory) ? this.base.features : null;
+        memory = mergeMemory(base, memory, disk);
+      }
+      if (!memory.metadata) memory.metadata = {};
+      memory.metadata.revision = Math.max(revisionOf(memory), revisionOf(disk)) + 1;
+      // Full snapshot via temp file + rename, folding any journal into it
+      const tmpPath = `${this.memoryPath}.${process.pid}.tmp`;
+      fs.writeFileSync(tmpPath, JSON.stringify(memory, null, 2));
+      fs.renameSync(tmpPath, this.memoryPath);
+      if (fs.existsSync(this.journalPath)) {
+        fs.unlinkSync(this.journalPath);
+      }
       this.memory = memory;
+      this.rememberBase(memory);
       return true;
     } catch (e) {
       console.error('Failed to save memory:', e.message);
       return false;
+    } finally {
+      releaseLock(this.lockPath);
     }
   }
 
@@ -44,11 +389,37 @@ class CCOM {
       metadata: {
         version: '0.2',
         created: new Date().toISOString(),
-        lastCleanup: new Date().toISOString()
+        lastCleanup: new Date().toISOString(),
+        tokens: tokenState()
       }
     };
   }
 
+  // Recount every feature when metadata.tokens is missing or out of date
+  ensureTokenCounts() {
+    const features = this.memory.features;
+    const state = this.memory.metadata?.tokens;
+    if (state && state.estimator === ESTIMATOR_VERSION &&
+        state.features === Object.keys(features).length) {
+      return false;
+    }
+    let total = 0;
+    for (const [name, data] of Object.entries(features)) {
+      data.tokens = featureTokens(name, data);
+      total += data.tokens;
+    }
+    if (!this.memory.metadata) this.memory.metadata = {};
+    this.memory.metadata.tokens = tokenState(total, Object.keys(features).length);
+    this.saveMemory();
+    return true;
+  }
+
+  // Update the running total by delta tokens and featureDelta features
+  addTokens(delta, featureDelta = 0) {
+    const state = this.memory.metadata.tokens;
+    this.memory.metadata.tokens = tokenState(state.total + delta, state.features + featureDelta);
+  }
+
   // Feature management
   rememberFeature(name, data = {}) {
     // Check for exact duplicate
@@ -63,6 +434,9 @@ class CCOM {
       files: data.files || [],
       userTerm: data.userTerm || name
     };
+    const feature = this.memory.features[name];
+    feature.tokens = featureTokens(name, feature);
+    this.addTokens(feature.tokens, 1);
 
     this.saveMemory();
     console.log(`✅ Remembered: ${name}`);
@@ -91,10 +465,18 @@ class CCOM {
   getMemoryStats() {
     const features = this.memory.features;
     const featureCount = Object.keys(features).length;
-    const memoryStr = JSON.stringify(this.memory);
-    const bytes = Buffer.byteLength(memoryStr, 'utf8');
-    const tokens = Math.ceil(bytes / 4); // Approximate tokens
-    const percentage = (tokens / 200000) * 100; // Claude's 200k context
+    const version = this.memory.metadata?.version || '0.1';
+    let bytes = 0;
+    for (const file of [this.memoryPath, this.journalPath]) {
+      try {
+        bytes += fs.statSync(file).size;
+      } catch (e) {
+        // No journal yet
+      }
+    }
+    const tokens = (this.memory.metadata?.tokens?.total || 0) +
+      summaryOverhead(this.memory.project.name, version, featureCount);
+    const percentage = (tokens / CONTEXT_WINDOW_TOKENS) * 100;
 
     // Get oldest and newest features
     const dates = Object.values(features).map(f => new Date(f.created));
@@ -108,7 +490,7 @@ class CCOM {
       percentage,
       oldest: oldest ? oldest.toISOString().split('T')[0] : null,
       newest: newest ? newest.toISOString().split('T')[0] : null,
-      version: this.memory.metadata?.version || '0.1'
+      version
     };
   }
 
@@ -167,8 +549,6 @@ class CCOM {
       return 0;
     }
 
-    // Create archive file
-    const archiveFile = path.join(this.archivePath, `archive-${new Date().toISOString().split('T')[0]}.json`);
     const archiveData = {
       archivedDate: new Date().toISOString(),
       cutoffDays: days,
@@ -176,7 +556,9 @@ class CCOM {
     };
 
     // Move features to archive
+    let freed = 0;
     for (const feature of toArchive) {
+      freed += feature.tokens || featureTokens(feature.name, feature);
       archiveData.features[feature.name] = {
         created: feature.created,
         description: feature.description,
@@ -188,17 +570,15 @@ class CCOM {
 
     // Save archive
     try {
-      if (!fs.existsSync(this.archivePath)) {
-        fs.mkdirSync(this.archivePath, { recursive: true });
-      }
-      fs.writeFileSync(archiveFile, JSON.stringify(archiveData, null, 2));
+      const archiveFile = this.writeArchiveSegment(archiveData);
 
       // Update metadata
       if (!this.memory.metadata) this.memory.metadata = {};
       this.memory.metadata.lastCleanup = new Date().toISOString();
+      this.addTokens(-freed, -toArchive.length);
 
       this.saveMemory();
-      console.log(`📁 Archived ${toArchive.length} features older than ${days} days to ${path.basename(archiveFile)}`);
+      console.log(`📁 Archived ${toArchive.length} features older than ${days} days to ${path.basename(archiveFile)} (~${freed} context tokens freed)`);
       return toArchive.length;
     } catch (e) {
       console.error('Failed to create archive:', e.message);
@@ -206,11 +586,54 @@ class CCOM {
     }
   }
 
+  // Write archived features as a gzip segment and list it in archive/index.json
+  // (same layout as cco/archive.py, which searches and restores from them)
+  writeArchiveSegment(archiveData) {
+    if (!fs.existsSync(this.archivePath)) {
+      fs.mkdirSync(this.archivePath, { recursive: true });
+    }
+    const stamp = new Date().toISOString().replace(/[-:]/g, '').replace('T', '-').slice(0, 15);
+    let name = `segment-${stamp}.json.gz`;
+    for (let counter = 2; fs.existsSync(path.join(this.archivePath, name)); counter++) {
+      name = `segment-${stamp}-${counter}.json.gz`;
+    }
+    const segmentFile = path.join(this.archivePath, name);
+    fs.writeFileSync(segmentFile + '.tmp', zlib.gzipSync(JSON.stringify(archiveData, null, 2)));
+    fs.renameSync(segmentFile + '.tmp', segmentFile);
+
+    const indexFile = path.join(this.archivePath, 'index.json');
+    let index = { version: 1, segments: {} };
+    try {
+      const existing = JSON.parse(fs.readFileSync(indexFile, 'utf8'));
+      if (existing.version === 1) index = existing;
+    } catch (e) {
+      // Missing or unreadable - the Python engine re-indexes unlisted segments
+    }
+    const words = new Set();
+    const created = {};
+    for (const [featureName, data] of Object.entries(archiveData.features)) {
+      const text = [featureName, data.userTerm || '', data.description || '', (data.files || []).join(' ')].join(' ');
+      for (const word of text.toLowerCase().match(/[a-z0-9]+/g) || []) words.add(word);
+      created[featureName] = data.created;
+    }
+    index.segments[name] = {
+      archived: archiveData.archivedDate,
+      bytes: fs.statSync(segmentFile).size,
+      features: created,
+      words: [...words].sort().join(' ')
+    };
+    fs.writeFileSync(indexFile + '.tmp', JSON.stringify(index));
+    fs.renameSync(indexFile + '.tmp', indexFile);
+    return segmentFile;
+  }
+
   removeFeature(name) {
     const normalized = name.toLowerCase().trim();
 
     for (const existing of Object.keys(this.memory.features)) {
       if (existing.toLowerCase().trim() === normalized) {
+        const data = this.memory.features[existing];
+        this.addTokens(-(data.tokens || featureTokens(existing, data)), -1);
         delete this.memory.features[existing];
         this.saveMemory();
         console.log(`🗑️ Removed feature: ${existing}`);
@@ -224,12 +647,16 @@ class CCOM {
 
   compactMemory() {
     let compacted = 0;
+    let saved = 0;
     const maxDescLength = 100;
 
     for (const [name, data] of Object.entries(this.memory.features)) {
       if (data.description && data.description.length > maxDescLength) {
         const original = data.description;
+        const cost = data.tokens || featureTokens(name, data);
         data.description = data.description.substring(0, maxDescLength - 3) + '...';
+        data.tokens = featureTokens(name, data);
+        saved += cost - data.tokens;
         compacted++;
         console.log(`✂️ Truncated description for "${name}"`);
         console.log(`   From: ${original}`);
@@ -238,8 +665,9 @@ class CCOM {
     }
 
     if (compacted > 0) {
+      this.addTokens(-saved);
       this.saveMemory();
-      console.log(`🗜️ Compacted ${compacted} feature descriptions`);
+      console.log(`🗜️ Compacted ${compacted} feature descriptions (~${saved} context tokens saved)`);
     } else {
       console.log('✅ No descriptions need compacting');
     }
@@ -332,10 +760,7 @@ class CCOM {
     }
 
     const features = Object.entries(this.memory.features)
-      .map(([name, data]) => {
-        const userTerm = data.userTerm !== name ? ` (aka "${data.userTerm}")` : '';
-        return `• ${name}${userTerm}: ${data.description || 'No description'}`;
-      })
+      .map(([name, data]) => summaryLine(name, data))
       .join('\n');
 
     let warning = '';
@@ -355,6 +780,56 @@ ${features}
     `.trim();
   }
 
+  // Context summary of the features most relevant to query, within budget tokens
+  packContext(query = null, budget = PACK_BUDGET_TOKENS) {
+    const features = this.memory.features;
+    const featureCount = Object.keys(features).length;
+    const projectName = this.memory.project.name;
+    if (featureCount === 0) {
+      return `Starting fresh project: ${projectName}`;
+    }
+    if (query === null) query = sessionQuery();
+
+    let ranked = query ? rankFeatures(features, query) : [];
+    let basis = `most relevant to "${query}"`;
+    if (ranked.length === 0) {
+      ranked = Object.entries(features)
+        .sort((a, b) => new Date(b[1].created) - new Date(a[1].created))
+        .map(([name]) => [0, name]);
+      basis = 'newest first';
+    }
+
+    const version = this.memory.metadata?.version || '0.1';
+    const frame = (shown, hidden, tokens) => {
+      const header = `🧠 Memory Loaded: ${projectName} (v${version})\n` +
+        `Memory: ${tokens} of ${budget} tokens packed ` +
+        `(${(tokens / CONTEXT_WINDOW_TOKENS * 100).toFixed(1)}% of context)\n` +
+        `Features built (${shown} of ${featureCount}, ${basis}):`;
+      let footer = '';
+      if (hidden) {
+        footer += `\n💡 ${hidden} more features in memory - ` +
+          "use 'ccom search <words>' before building something new";
+      }
+      return [header, footer + '\n⚠️ Check for duplicates before creating new features!'];
+    };
+
+    // Upper bound: the counts printed never have more digits than these
+    const overhead = estimateTokens(frame(featureCount, featureCount, budget).join('\n'));
+    const available = Math.max(0, budget - overhead);
+    const lines = [];
+    let used = 0;
+    for (const [, name] of ranked) {
+      if (used >= available) break;
+      const cost = features[name].tokens || featureTokens(name, features[name]);
+      if (used + cost > available) continue;
+      lines.push(summaryLine(name, features[name]));
+      used += cost;
+    }
+
+    const [header, footer] = frame(lines.length, featureCount - lines.length, used + overhead);
+    return [header, ...lines, footer].join('\n');
+  }
+
   // Display functions
   showMemory() {
     console.log('\n📝 Memory Contents');
@@ -391,8 +866,16 @@ ${features}
     // For v0.1, we just provide the methods
 
     // On session start
+    // With context.budget in config.json, only the most relevant features are packed
     this.onSessionStart = () => {
-      const context = this.getContextSummary();
+      let budget = null;
+      try {
+        const config = JSON.parse(fs.readFileSync(path.join(__dirname, 'config.json'), 'utf8'));
+        budget = config.context?.budget;
+      } catch (e) {
+        // No config - show every feature
+      }
+      const context = budget ? this.packContext(null, parseInt(budget)) : this.getContextSummary();
       console.log(context);
       return context;
     };
@@ -479,6 +962,15 @@ if (require.main === module) {
     case 'compact':
       ccom.compactMemory();
       break;
+    case 'pack':
+      let words = args.slice(1);
+      let budget = PACK_BUDGET_TOKENS;
+      if (words.length > 0 && /^\d+$/.test(words[0])) {
+        budget = parseInt(words[0]);
+        words = words.slice(1);
+      }
+      console.log(ccom.packContext(words.join(' ') || null, budget));
+      break;
     default:
       console.log(`
 CCOM v0.2 - Memory System with Management Features
@@ -495,6 +987,7 @@ Memory Management:
   node ccom.js archive [days]     - Archive features older than N days (default: 30)
   node ccom.js remove <name>      - Delete specific feature
   node ccom.js compact            - Truncate long descriptions to save space
+  node ccom.js pack [budget] [topic] - Most relevant features within a token budget
 
 Memory Limits:
   Warning: 5,000 tokens (2.5% of context)
@@ -0,0 +1,87 @@
+"""Context-cost estimate for CCOM memory
+
+Memory reaches Claude as the session-start summary (get_context_summary),
+one "• name: description" line per feature, not as memory.json. So a
+feature's cost is the estimated token count of its summary line. It is
+stored in the feature ("tokens"), and metadata.tokens keeps the running
+total, so stats need neither a JSON dump nor a pass over the features.
+
+estimate_tokens approximates a BPE tokenizer without a vocabulary. It
+splits text the way BPE pre-tokenizers do (words, digit groups,
+punctuation runs, whitespace) and prices each piece:
+- a word costs one token per six letters, and camelCase humps split
+- digits go in groups of three
+- punctuation costs one token per two characters
+- a single space joins the next piece; other whitespace runs cost one
+- non-ASCII characters cost one each, two outside the BMP (emoji)
+Unlike bytes / 4, it does not charge for JSON keys and timestamps that
+never reach the context, and it tracks how short words and symbols
+tokenize. The same rules are implemented in templates/ccom.js
+(estimateTokens) so both engines agree.
+"""
+
+import re
+
+# Bump when the rules change so stored counts are recomputed
+ESTIMATOR_VERSION = 1
+CONTEXT_WINDOW_TOKENS = 200000
+# Default context pack size (ccom pack, session start)
+PACK_BUDGET_TOKENS = 2000
+
+_PIECES = re.compile(r'[A-Za-z]+|[0-9]+|[ \t\n\r\f\v]+|[!-/:-@\[-`{-~]+|[^\x00-\x7f]|[\x00-\x7f]')
+_HUMPS = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+')
+
+LETTERS_PER_TOKEN = 6
+DIGITS_PER_TOKEN = 3
+PUNCTUATION_PER_TOKEN = 2
+
+
+def _word_tokens(word):
+    return sum(1 + (len(hump) - 1) // LETTERS_PER_TOKEN for hump in _HUMPS.findall(word))
+
+
+def estimate_tokens(text):
+    """Approximate token count of text"""
+    tokens = 0
+    for piece in _PIECES.findall(text or ""):
+        first = piece[0]
+        if first.isascii() and first.isalpha():
+            tokens += _word_tokens(piece)
+        elif first.isascii() and first.isdigit():
+            tokens += -(-len(piece) // DIGITS_PER_TOKEN)
+        elif first in " \t\n\r\f\v":
+            tokens += 0 if piece == " " else 1
+        elif first.isascii() and first.isprintable():
+            tokens += -(-len(piece) // PUNCTUATION_PER_TOKEN)
+        elif ord(first) > 0xFFFF:
+            tokens += 2
+        else:
+            tokens += 1
+    return tokens
+
+
+def summary_line(name, data):
+    """A feature's line in the context summary"""
+    user_term = f' (aka "{data.get("userTerm")}")' if data.get("userTerm") != name else ""
+    return f"• {name}{user_term}: {data.get('description') or 'No description'}"
+
+
+def feature_tokens(name, data):
+    """Context cost of one feature: its summary line and line break"""
+    return estimate_tokens(summary_line(name, data)) + 1
+
+
+def summary_overhead(project_name, version, feature_count):
+    """Tokens of the summary around the feature lines"""
+    if not feature_count:
+        return estimate_tokens(f"Starting fresh project: {project_name}")
+    return estimate_tokens(
+        f"🧠 Memory Loaded: {project_name} (v{version})\n"
+        f"Memory: 0 tokens (0.0% of context)\n"
+        f"Features built ({feature_count}):\n"
+        f"\n⚠️ Check for duplicates before creating new features!")
+
+
+def token_state(total=0, features=0):
+    """metadata.tokens value: the running total over features"""
+    return {"total": total, "features": features, "estimator": ESTIMATOR_VERSION}
@@ -0,0 +1,204 @@
+"""Span tracing for CCOM workflows, exported as Chrome trace JSON
+
+    with span("lint", "gate", command="npm run lint") as s:
+        ...
+        s.set(returncode=0)
+
+Spans nest through a context variable, so a span opened inside another
+(including in asyncio tasks and in executor calls made with
+contextvars.copy_context) becomes its child. Each span is drawn on a
+track; a span without an explicit track inherits its parent's, so
+concurrent gates, each started with track=f"gate {name}", get a lane of
+their own.
+
+Tracing is off until start_tracing() is called: span() then returns a
+shared no-op object and traced functions cost one global lookup.
+write_trace saves .claude/traces/<timestamp>-<label>.json, which opens in
+about://tracing (Chrome) or ui.perfetto.dev.
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+
+TRACES_DIR = "traces"
+
+_tracer = None
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+class Tracer:
+    """Collects completed spans as Chrome trace events"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.started = time.time()
+        self.events = []
+        self._tracks = {}
+        self._lock = threading.Lock()
+
+    def track_id(self, track):
+        with self._lock:
+            tid = self._tracks.get(track)
+            if tid is None:
+                tid = self._tracks[track] = len(self._tracks) + 1
+                self.events.append({"ph": "M", "name": "thread_name", "pid": self.pid,
+                                    "tid": tid, "args": {"name": track}})
+                self.events.append({"ph": "M", "name": "thread_sort_index", "pid": self.pid,
+                                    "tid": tid, "args": {"sort_index": tid}})
+        return tid
+
+    def add(self, name, category, track, start, end, args):
+        event = {"ph": "X", "name": name, "cat": category, "pid": self.pid,
+                 "tid": self.track_id(track),
+                 "ts": round((start - self.origin) * 1e6, 1),
+                 "dur": round((end - start) * 1e6, 1)}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def to_json(self):
+        from datetime import datetime
+
+        return {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started": datetime.fromtimestamp(self.started).isoformat(),
+                          "pid": self.pid},
+        }
+
+
+class Span:
+    """One timed step; use as a context manager"""
+
+    __slots__ = ("tracer", "name", "category", "track", "args", "start", "_token")
+
+    def __init__(self, tracer, name, category, track, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.track = track
+        self.args = args
+        self.start = None
+        self._token = None
+
+    def set(self, **args):
+        """Attach arguments (counts, return codes, ...) shown with the span"""
+        self.args.update(args)
+        return self
+
+    def __enter__(self):
+        if self.track is None:
+            self.track = current_track()
+        self._token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add(self.name, self.category, self.track, self.start, end, self.args)
+        return False
+
+
+class _NullSpan:
+    """Stand-in returned by span() while tracing is off"""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enabled():
+    return _tracer is not None
+
+
+def current_track():
+    """Track of the innermost open span, or the current thread's name"""
+    parent = _current.get()
+    return parent.track if parent is not None else threading.current_thread().name
+
+
+def annotate(**args):
+    """Attach arguments to the innermost open span, if any"""
+    current = _current.get()
+    if current is not None:
+        current.set(**args)
+
+
+def span(name, category="ccom", track=None, **args):
+    """A span for a with block, or a no-op when tracing is off"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return Span(_tracer, name, category, track, args)
+
+
+def record(name, category, start, end, track=None, **args):
+    """Add a span timed elsewhere (start and end from time.perf_counter())"""
+    if _tracer is not None:
+        _tracer.add(name, category, track or current_track(), start, end, args)
+
+
+def traced(name=None, category="ccom"):
+    """Decorator wrapping every call of a function in a span"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with Span(_tracer, label, category, None, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_tracing():
+    """Start collecting spans; returns the Tracer"""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing():
+    """Stop collecting spans and return the Tracer that was active, if any"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def write_trace(claude_dir, label="ccom", tracer=None):
+    """Write the collected spans to .claude/traces/ and return the file path"""
+    tracer = tracer or _tracer
+    if tracer is None:
+        return None
+    # Imported here: every ccom process imports this module, few write a trace
+    import json
+    from pathlib import Path
+
+    from cco.journal import write_atomic
+
+    directory = Path(claude_dir) / TRACES_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_label = "".join(c if c.isalnum() or c in "-_" else "-" for c in label)[:40] or "ccom"
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(tracer.started))
+    path = directory / f"{stamp}-{safe_label}.json"
+    write_atomic(path, json.dumps(tracer.to_json(), separators=(',', ':')))
+    return path
@@ -0,0 +1,210 @@
+"""File-trigger handshake with Claude Code agents
+
+CCOM asks for an agent by writing .claude/trigger_<agent>.txt and
+expects an answer in .claude/response_<agent>.txt. wait_for_files
+returns as soon as the awaited files appear instead of sleeping a fixed
+time: on Linux it blocks on inotify (through ctypes), elsewhere it polls
+with a short, growing interval. Several agents can be triggered and
+awaited at once with trigger_agents.
+
+Files should be written with a rename (cco.journal.write_atomic) or at
+least closed before being read; the watcher reports a name when a file
+is closed after writing or moved into place, never on creation.
+
+python -m cco.responder answers triggers locally for testing.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from cco.journal import write_atomic
+
+DEFAULT_TIMEOUT = 2.0
+POLL_INTERVAL = 0.01
+MAX_POLL_INTERVAL = 0.1
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+
+
+def _inotify():
+    """libc with inotify, or None where it is unavailable"""
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                libc.inotify_init1
+                libc.inotify_add_watch
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc or None
+
+
+def trigger_name(agent_name):
+    return f"trigger_{agent_name}.txt"
+
+
+def response_name(agent_name):
+    return f"response_{agent_name}.txt"
+
+
+class DirectoryWatcher:
+    """Reports names of files written or moved into one directory
+
+    Uses inotify when available (use_inotify=None) and falls back to
+    comparing directory listings.
+    """
+
+    def __init__(self, directory, use_inotify=None):
+        self.directory = Path(directory)
+        self._fd = None
+        libc = _inotify() if use_inotify is not False else None
+        if libc is not None:
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd >= 0:
+                mask = _IN_CLOSE_WRITE | _IN_MOVED_TO
+                if libc.inotify_add_watch(fd, os.fsencode(str(self.directory)), mask) >= 0:
+                    self._fd = fd
+                else:
+                    os.close(fd)
+        self._listing = None if self._fd is not None else self._snapshot()
+
+    @property
+    def uses_inotify(self):
+        return self._fd is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _snapshot(self):
+        listing = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    listing[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return listing
+
+    def changes(self, timeout):
+        """Names written or moved in since the last call; waits up to timeout for one"""
+        if self._fd is not None:
+            return self._read_events(timeout)
+        return self._poll(timeout)
+
+    def _read_events(self, timeout):
+        ready, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names, offset = [], 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def _poll(self, timeout):
+        deadline = time.monotonic() + max(0.0, timeout)
+        interval = POLL_INTERVAL
+        while True:
+            listing = self._snapshot()
+            changed = [name for name, signature in listing.items()
+                       if self._listing.get(name) != signature]
+            self._listing = listing
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+
+def wait_for_files(directory, names, timeout=DEFAULT_TIMEOUT, use_inotify=None):
+    """Wait until every file in names exists in directory or timeout passes
+
+    Returns the set of names that exist.
+    """
+    directory = Path(directory)
+    wanted = set(names)
+    deadline = time.monotonic() + timeout
+    with DirectoryWatcher(directory, use_inotify) as watcher:
+        # Check after the watch is in place so a file written in between is not missed
+        found = {name for name in wanted if (directory / name).exists()}
+        while found != wanted:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            found.update(name for name in watcher.changes(remaining)
+                         if name in wanted and (directory / name).exists())
+    return found
+
+
+def trigger_agents(claude_dir, agent_names, timeout=DEFAULT_TIMEOUT, use_inotify=None):
+    """Write trigger files for agents and collect their responses
+
+    Returns {agent_name: response text or None}. Trigger and response
+    files are removed afterwards.
+    """
+    claude_dir = Path(claude_dir)
+    agent_names = list(agent_names)
+    for agent_name in agent_names:
+        # A response left over from an earlier, timed-out request is stale
+        try:
+            (claude_dir / response_name(agent_name)).unlink()
+        except FileNotFoundError:
+            pass
+        write_atomic(claude_dir / trigger_name(agent_name),
+                     f"CCOM requesting {agent_name} execution at {datetime.now()}")
+
+    responses = {}
+    try:
+        arrived = wait_for_files(claude_dir, [response_name(a) for a in agent_names],
+                                 timeout, use_inotify)
+        for agent_name in agent_names:
+            response_file = claude_dir / response_name(agent_name)
+            if response_name(agent_name) in arrived:
+                with open(response_file, encoding='utf-8', errors='replace') as f:
+                    responses[agent_name] = f.read()
+                response_file.unlink()
+            else:
+                responses[agent_name] = None
+    finally:
+        for agent_name in agent_names:
+            try:
+                (claude_dir / trigger_name(agent_name)).unlink()
+            except FileNotFoundError:
+                pass
+    return responses
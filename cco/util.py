@@ -0,0 +1,72 @@
+"""Shared helpers for the CCOM memory engine and stores
+
+Both CLIs import this module before knowing the command, so the date
+helpers import datetime when first called instead.
+"""
+
+import sys
+
+
+def emit(text="", file=None):
+    """Print text, falling back to ASCII on consoles without UTF-8 support"""
+    stream = file or sys.stdout
+    try:
+        print(text, file=stream)
+    except UnicodeEncodeError:
+        print(text.encode('ascii', 'replace').decode('ascii'), file=stream)
+
+
+def configure_console():
+    """Make Windows consoles accept the emoji output instead of raising"""
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+        sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+
+def now_iso():
+    """Current UTC time formatted like JavaScript's Date.toISOString()"""
+    from datetime import datetime, timezone
+
+    return iso_timestamp(datetime.now(timezone.utc))
+
+
+def iso_timestamp(date):
+    """An aware datetime formatted like JavaScript's Date.toISOString()"""
+    from datetime import timezone
+
+    date = date.astimezone(timezone.utc)
+    return date.strftime("%Y-%m-%dT%H:%M:%S.") + "%03dZ" % (date.microsecond // 1000)
+
+
+def parse_date(value):
+    """Parse an ISO date string into an aware datetime, or None if invalid"""
+    if not value or not isinstance(value, str):
+        return None
+    from datetime import datetime
+
+    text = value.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        try:
+            parsed = datetime.strptime(text[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        # JavaScript treats date-times without an offset as local time
+        parsed = parsed.astimezone()
+    return parsed
+
+
+def iso_day(date):
+    """UTC calendar day of an aware datetime, like toISOString().split('T')[0]"""
+    from datetime import timezone
+
+    return date.astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+
+def normalize_name(name):
+    """Normalize a feature name or user term for duplicate comparison"""
+    return (name or "").lower().strip()
@@ -0,0 +1,173 @@
+"""Repository walker shared by the CCOM scanners
+
+walk_files uses os.scandir and prunes excluded directories before
+descending into them, so node_modules and friends are never listed or
+stat'ed. It honors .gitignore files (at any depth) and .claude/ignore,
+which uses the same syntax, and yields files for several extensions in
+one pass. With use_git=True the file list comes from `git ls-files`
+instead, falling back to the walk outside a git checkout.
+"""
+
+import os
+import re
+import subprocess
+
+SCAN_EXTENSIONS = (".js", ".ts", ".jsx", ".tsx", ".py", ".env")
+DEFAULT_EXCLUDED_DIRS = frozenset({
+    "node_modules", ".git", ".hg", ".svn", "__pycache__", ".venv", "venv", ".tox",
+})
+CLAUDE_IGNORE_FILE = os.path.join(".claude", "ignore")
+
+
+def _glob_to_regex(pattern):
+    """Translate a gitignore glob (without negation or trailing slash) to a regex"""
+    i, out = 0, []
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+            continue
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """Ordered gitignore rules; the last matching rule wins"""
+
+    def __init__(self):
+        self.rules = []  # (regex, negate, dir_only)
+
+    def add_file(self, path, base=""):
+        """Add rules from an ignore file whose patterns are relative to base"""
+        try:
+            with open(path, encoding='utf-8', errors='ignore') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            self.add_pattern(line, base)
+
+    def add_pattern(self, line, base=""):
+        """Add one gitignore pattern line"""
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            return
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+        prefix = re.escape(base + "/") if base else ""
+        if anchored:
+            regex = f"^{prefix}{_glob_to_regex(line)}$"
+        else:
+            regex = f"^{prefix}(?:.*/)?{_glob_to_regex(line)}$"
+        self.rules.append((re.compile(regex), negate, dir_only))
+
+    def ignored(self, rel_path, is_dir):
+        """Whether a project-relative path (with / separators) is ignored"""
+        result = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+def load_ignore_rules(root):
+    """Rules from the root .gitignore and .claude/ignore"""
+    rules = IgnoreRules()
+    rules.add_file(os.path.join(root, ".gitignore"))
+    rules.add_file(os.path.join(root, CLAUDE_IGNORE_FILE))
+    return rules
+
+
+def _wanted(name, extensions):
+    return extensions is None or name.endswith(extensions)
+
+
+def walk_files(root, extensions=SCAN_EXTENSIONS, exclude_dirs=DEFAULT_EXCLUDED_DIRS,
+               use_gitignore=True, use_git=False):
+    """Yield paths of files under root with the given extensions, pruning ignored directories"""
+    root = os.fspath(root)
+    extensions = tuple(extensions) if extensions is not None else None
+
+    if use_git:
+        files = _git_files(root)
+        if files is not None:
+            for rel_path in files:
+                parts = rel_path.split("/")
+                if _wanted(parts[-1], extensions) and not exclude_dirs.intersection(parts[:-1]):
+                    yield os.path.join(root, *parts)
+            return
+
+    rules = load_ignore_rules(root) if use_gitignore else IgnoreRules()
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        if use_gitignore and rel_dir:
+            nested = os.path.join(directory, ".gitignore")
+            if os.path.isfile(nested):
+                rules.add_file(nested, rel_dir)
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name in exclude_dirs or rules.ignored(rel_path, True):
+                    continue
+                subdirs.append((entry.path, rel_path))
+            elif _wanted(entry.name, extensions) and not rules.ignored(rel_path, False):
+                yield entry.path
+        # Reversed so directories are visited in name order
+        stack.extend(reversed(subdirs))
+
+
+def _git_files(root):
+    """Tracked and untracked-but-not-ignored files from git, or None outside a checkout"""
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return [name for name in result.stdout.decode('utf-8', errors='replace').split("\0") if name]
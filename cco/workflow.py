@@ -0,0 +1,487 @@
+"""Declarative workflows: step graphs run on a bounded worker pool
+
+A workflow is a JSON file, .claude/workflows/<name>.json:
+
+    {"description": "Lint and build, then ship",
+     "steps": [
+       {"id": "lint", "run": "npm run lint", "cache": true},
+       {"id": "build", "run": "npm run build", "timeout": 120, "retries": 1},
+       {"id": "ship", "subagent": "deployment-specialist", "needs": ["lint", "build"]}]}
+
+Every step does one thing: run a shell command, call an action the
+orchestrator provides by name (WorkflowContext.actions) or invoke a
+subagent. needs lists the steps that have to finish first. run_workflow
+starts each step as soon as its needs are met, at most `concurrency` at
+a time, so independent steps overlap and a workflow takes about as long
+as its critical path. Steps run as cco.gates gates: shell output is
+streamed and logged the same way, and a step with "cache": true is
+memoized in the gate cache, reporting its recorded result instead of
+running while its command and inputs are unchanged. Its inputs are every
+file the gate cache hashes, or the files matching its "inputs" patterns
+("src/*.ts", "package.json"). A step listing "outputs" directories
+("dist") reruns when they were deleted or changed since it ran. Steps
+with retries only reuse passing results, so a flaky failure is tried
+again on the next run.
+
+"when" names conditions ("!name" negates them), checked once the step's
+needs are met; a step whose conditions do not hold is skipped and counts
+as done. A failed step is retried `retries` times, waiting retry_delay
+seconds and doubling the wait each time. A required step (the default)
+that still fails stops the workflow: running steps are cancelled and no
+others start. A step with "required": false only warns, and steps that
+need it still run. Fix commands rewrite files other steps read, so a
+failed step with a fix waits until nothing else is running, and fixes
+run one at a time.
+
+DEFAULT_WORKFLOWS holds the built-in deploy, quality and security
+workflows; a file of the same name replaces one. Built-in deploy hands
+quality and security to the quality-enforcer and security-guardian
+subagents, like deploy_sequence did; its lint, audit and code scan shell
+steps are their fallback, run side by side when the "subagents"
+condition finds no Claude Code integration.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from cco.gates import (CANCELLED, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, FAILED, FIXED, PASSED,
+                       Gate, run_fix, run_gate, use_executor)
+
+WORKFLOW_DIR = "workflows"
+DEFAULT_RETRY_DELAY = 1.0
+BUILTIN = "built-in"
+
+SKIPPED = "skipped"
+
+Step = namedtuple("Step", "id label run action subagent needs when timeout retries retry_delay "
+                          "required cache fix evaluate echo inputs outputs",
+                  defaults=(None, None, None, None, (), (), None, 0, DEFAULT_RETRY_DELAY, True,
+                            False, None, None, True, (), ()))
+Step.__doc__ = """One node of a workflow
+
+Exactly one of run (shell command), action (WorkflowContext.actions
+name) and subagent is set. when holds condition names, "!name" negated.
+timeout None means no limit. fix, evaluate (WorkflowContext.evaluators
+name), cache and echo apply to shell steps, as for cco.gates.Gate;
+inputs are the fnmatch patterns a cached step's result is keyed on,
+outputs the directories it writes, which must still be as it left them.
+"""
+
+Workflow = namedtuple("Workflow", "name description steps concurrency source")
+StepResult = namedtuple("StepResult", "step status duration output attempts cached")
+WorkflowReport = namedtuple("WorkflowReport",
+                            "workflow passed results wall_time critical_path total_time")
+
+WorkflowContext = namedtuple("WorkflowContext", "actions conditions evaluators subagent",
+                             defaults=(None, None, None, None))
+WorkflowContext.__doc__ = """What step names refer to
+
+actions map names to callables taking the results of the step's needs
+({step id: StepResult}, skipped ones included), conditions map names to
+callables taking no arguments, evaluators map names to
+evaluate(returncode, stdout) checks, and subagent(name) invokes a
+subagent. Each returns True on success.
+"""
+
+STEP_KINDS = ("run", "action", "subagent")
+WORKFLOW_FIELDS = frozenset({"description", "concurrency", "steps"})
+STEP_FIELDS = frozenset(Step._fields)
+
+
+class WorkflowError(ValueError):
+    """An unknown, unreadable or invalid workflow"""
+
+
+DEFAULT_WORKFLOWS = {
+    "deploy": {
+        "description": "Quality, security, build and test checks side by side, then deployment",
+        "steps": [
+            {"id": "quality", "label": "Quality enforcement", "subagent": "quality-enforcer",
+             "when": "subagents"},
+            {"id": "security", "label": "Security scan", "action": "security-check",
+             "when": "subagents"},
+            # Without Claude Code integration, the subagents' checks as shell steps
+            {"id": "lint", "label": "Code quality", "run": "npm run lint",
+             "when": ["package-json", "!subagents"], "timeout": 30,
+             "fix": "npm run lint -- --fix", "cache": True},
+            {"id": "audit", "label": "Dependency audit", "run": "npm audit --json",
+             "when": ["package-json", "!offline-audit", "!subagents"], "timeout": 60,
+             "fix": "npm audit fix", "evaluate": "npm-audit", "echo": False},
+            {"id": "offline-audit", "label": "Dependency audit", "action": "offline-audit",
+             "when": ["package-json", "offline-audit", "!subagents"], "timeout": 60},
+            {"id": "code-scan", "label": "Code security scan", "action": "code-scan",
+             "when": "!subagents", "timeout": 120, "required": False},
+            {"id": "build", "label": "Build", "run": "npm run build", "when": "build-script",
+             "timeout": 120, "cache": True, "outputs": ["dist", "build", "out", ".next"]},
+            {"id": "test", "label": "Tests", "run": "npm test", "when": "test-script",
+             "timeout": 60, "required": False, "cache": True},
+            {"id": "deploy", "label": "Deployment", "action": "deploy",
+             "needs": ["quality", "security", "lint", "audit", "offline-audit", "code-scan",
+                       "build", "test"]},
+        ],
+    },
+    "quality": {
+        "description": "Quality analysis and fixes by the quality enforcer",
+        "steps": [
+            {"id": "quality", "label": "Quality enforcement", "subagent": "quality-enforcer"},
+        ],
+    },
+    "security": {
+        "description": "Security scan by the security guardian",
+        "steps": [
+            {"id": "security", "label": "Security scan", "action": "security-check"},
+        ],
+    },
+}
+
+
+def _names(value, what):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) and v for v in value):
+        raise ValueError(f"{what} must be a name or a list of names")
+    return tuple(value)
+
+
+def _number(value, what, allow_none=False):
+    if value is None and allow_none:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{what} must be a non-negative number")
+    return value
+
+
+def _flag(value, what):
+    if not isinstance(value, bool):
+        raise ValueError(f"{what} must be true or false")
+    return value
+
+
+def _parse_step(data):
+    if not isinstance(data, dict):
+        raise ValueError("must be an object")
+    unknown = sorted(set(data) - STEP_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields {', '.join(unknown)}")
+    kinds = [kind for kind in STEP_KINDS if data.get(kind) is not None]
+    if len(kinds) != 1:
+        raise ValueError(f"needs exactly one of {', '.join(STEP_KINDS)}")
+    kind = kinds[0]
+    if not isinstance(data[kind], str) or not data[kind].strip():
+        raise ValueError(f"{kind} must be a non-empty string")
+    if kind != "run":
+        shell_only = [field for field in ("fix", "evaluate", "cache", "inputs", "outputs")
+                      if data.get(field)]
+        if shell_only:
+            raise ValueError(f"{', '.join(shell_only)} only apply to run steps")
+    for field in ("label", "fix", "evaluate"):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise ValueError(f"{field} must be a string")
+    for field in ("inputs", "outputs"):
+        if data.get(field) and not data.get("cache"):
+            raise ValueError(f"{field} only apply to cached steps")
+    retries = data.get("retries", 0)
+    if isinstance(retries, bool) or not isinstance(retries, int) or retries < 0:
+        raise ValueError("retries must be a non-negative integer")
+    return Step(
+        id=data["id"],
+        label=data.get("label") or data["id"],
+        run=data.get("run"),
+        action=data.get("action"),
+        subagent=data.get("subagent"),
+        needs=_names(data.get("needs", []), "needs"),
+        when=_names(data.get("when", []), "when"),
+        timeout=_number(data.get("timeout", DEFAULT_TIMEOUT if kind == "run" else None),
+                        "timeout", allow_none=True),
+        retries=retries,
+        retry_delay=_number(data.get("retry_delay", DEFAULT_RETRY_DELAY), "retry_delay"),
+        required=_flag(data.get("required", True), "required"),
+        cache=_flag(data.get("cache", False), "cache"),
+        fix=data.get("fix"),
+        evaluate=data.get("evaluate"),
+        echo=_flag(data.get("echo", True), "echo"),
+        inputs=_names(data.get("inputs", []), "inputs"),
+        outputs=_names(data.get("outputs", []), "outputs"),
+    )
+
+
+def _check_graph(steps):
+    """Raise ValueError for unknown needs or a cycle (Kahn's algorithm)"""
+    ids = {step.id for step in steps}
+    for step in steps:
+        unknown = [need for need in step.needs if need not in ids]
+        if unknown:
+            raise ValueError(f"step {step.id!r} needs unknown steps {', '.join(unknown)}")
+    waiting = {step.id: set(step.needs) for step in steps}
+    ready = [step_id for step_id, needs in waiting.items() if not needs]
+    while ready:
+        done = ready.pop()
+        del waiting[done]
+        for step_id, needs in waiting.items():
+            if done in needs:
+                needs.discard(done)
+                if not needs:
+                    ready.append(step_id)
+    if waiting:
+        raise ValueError(f"steps {', '.join(sorted(waiting))} depend on each other in a cycle")
+
+
+def parse_workflow(name, data, source=BUILTIN):
+    """Workflow from its JSON definition, raises WorkflowError when it is invalid"""
+    try:
+        if not isinstance(data, dict):
+            raise ValueError("a workflow must be a JSON object")
+        unknown = sorted(set(data) - WORKFLOW_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown fields {', '.join(unknown)}")
+        concurrency = data.get("concurrency")
+        if concurrency is not None and (isinstance(concurrency, bool)
+                                        or not isinstance(concurrency, int) or concurrency < 1):
+            raise ValueError("concurrency must be a positive integer")
+        if not isinstance(data.get("steps"), list) or not data["steps"]:
+            raise ValueError("steps must be a non-empty list")
+        steps = []
+        for position, step in enumerate(data["steps"], 1):
+            step_id = step.get("id") if isinstance(step, dict) else None
+            if not isinstance(step_id, str) or not step_id:
+                raise ValueError(f"step {position} has no id")
+            if any(existing.id == step_id for existing in steps):
+                raise ValueError(f"duplicate step id {step_id!r}")
+            try:
+                steps.append(_parse_step(step))
+            except ValueError as e:
+                raise ValueError(f"step {step_id!r}: {e}") from None
+        _check_graph(steps)
+    except ValueError as e:
+        raise WorkflowError(f"workflow {name} ({source}): {e}") from None
+    return Workflow(name, data.get("description", ""), tuple(steps), concurrency, source)
+
+
+def available_workflows(claude_dir):
+    """{name: source} of every workflow, a file path or "built-in\""""
+    workflows = dict.fromkeys(DEFAULT_WORKFLOWS, BUILTIN)
+    directory = os.path.join(claude_dir, WORKFLOW_DIR)
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        names = []
+    for filename in names:
+        if filename.endswith(".json"):
+            workflows[filename[:-len(".json")]] = os.path.join(directory, filename)
+    return workflows
+
+
+def load_workflow(claude_dir, name):
+    """The named workflow, from .claude/workflows/<name>.json or built in"""
+    source = available_workflows(claude_dir).get(name)
+    if source is None:
+        raise WorkflowError(f"no workflow named {name}")
+    if source == BUILTIN:
+        return parse_workflow(name, DEFAULT_WORKFLOWS[name])
+    try:
+        with open(source, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise WorkflowError(f"workflow {name} ({source}): {e}") from None
+    return parse_workflow(name, data, source)
+
+
+def _check_context(workflow, context):
+    """Raise WorkflowError for names the context does not provide, before anything runs"""
+    missing = []
+    for step in workflow.steps:
+        if step.action and step.action not in (context.actions or {}):
+            missing.append(f"action {step.action}")
+        if step.subagent and context.subagent is None:
+            missing.append("subagents")
+        if step.evaluate and step.evaluate not in (context.evaluators or {}):
+            missing.append(f"evaluator {step.evaluate}")
+        for condition in step.when:
+            if condition.lstrip("!") not in (context.conditions or {}):
+                missing.append(f"condition {condition.lstrip('!')}")
+    if missing:
+        names = ", ".join(sorted(set(missing)))
+        raise WorkflowError(f"workflow {workflow.name} ({workflow.source}) uses unknown {names}")
+
+
+def _holds(step, context):
+    for condition in step.when:
+        negated = condition.startswith("!")
+        if bool(context.conditions[condition.lstrip("!")]()) == negated:
+            return False
+    return True
+
+
+def _gate(step, context, results):
+    if step.run is not None:
+        command = step.run
+    elif step.action is not None:
+        needs = {need: results[need] for need in step.needs}
+        command = functools.partial(context.actions[step.action], needs)
+    else:
+        command = functools.partial(context.subagent, step.subagent)
+    evaluate = context.evaluators[step.evaluate] if step.evaluate else None
+    return Gate(step.id, step.label, command, step.timeout, step.required, step.fix, evaluate,
+                step.cache, step.echo, step.inputs or None, cache_failures=not step.retries,
+                outputs=step.outputs or None)
+
+
+def _blocks(result):
+    return result.step.required and result.status not in (PASSED, FIXED, SKIPPED, CANCELLED)
+
+
+async def _run_step(step, gate, cwd, cache, settings):
+    """Run a step with its retries, returning (GateResult, attempts)"""
+    start = time.perf_counter()
+    delay = step.retry_delay
+    attempts = 0
+    while True:
+        attempts += 1
+        result = await run_gate(gate, cwd, cache, settings)
+        if result.status in (PASSED, CANCELLED) or attempts > step.retries:
+            break
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            result = result._replace(status=CANCELLED)
+            break
+        delay *= 2
+    # The step took every attempt and the waits between them
+    return result._replace(duration=time.perf_counter() - start), attempts
+
+
+def _critical_path(workflow, results):
+    """Longest chain of step durations through the graph"""
+    finished = {}
+
+    def finish_time(step):
+        if step.id not in finished:
+            start = max((finish_time(steps[need]) for need in step.needs), default=0.0)
+            finished[step.id] = start + results[step.id].duration
+        return finished[step.id]
+
+    steps = {step.id: step for step in workflow.steps}
+    return max((finish_time(step) for step in workflow.steps), default=0.0)
+
+
+async def run_workflow_async(workflow, context, concurrency=None, cwd=None, on_result=None,
+                             cache=None, settings=None):
+    """Run a workflow's steps as their needs are met and return a WorkflowReport
+
+    concurrency applies to workflows that do not set their own.
+    on_result(result) is called as each step finishes (skipped steps
+    excepted). cache is an optional cco.gate_cache.GateCache for steps
+    with "cache": true, settings the cco.runner.RunnerSettings for
+    streaming output and logs.
+    """
+    _check_context(workflow, context)
+    started = time.perf_counter()
+    limit = max(1, workflow.concurrency or concurrency or DEFAULT_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+        use_executor(executor)
+        return await _run_steps(workflow, context, limit, cwd, on_result, cache, settings,
+                                started)
+
+
+async def _run_steps(workflow, context, limit, cwd, on_result, cache, settings, started):
+    pending = list(workflow.steps)
+    running = {}
+    results = {}
+    to_fix = []
+
+    def finish(result):
+        results[result.step.id] = result
+        if on_result and result.status != SKIPPED:
+            on_result(result)
+
+    def start_ready():
+        # Skipping a step can make others ready, so look again until none start
+        progressed = True
+        while progressed and len(running) < limit:
+            progressed = False
+            for step in pending:
+                if all(need in results for need in step.needs):
+                    pending.remove(step)
+                    if not _holds(step, context):
+                        finish(StepResult(step, SKIPPED, 0.0, "", 0, False))
+                    else:
+                        task = asyncio.ensure_future(
+                            _run_step(step, _gate(step, context, results), cwd, cache,
+                                      settings))
+                        running[task] = step
+                    progressed = True
+                    break
+
+    stopped = False
+    while not stopped and (pending or running or to_fix):
+        start_ready()
+        if not running:
+            if not to_fix:
+                break
+            # Nothing else runs while a fix rewrites the tree
+            step, result, attempts = to_fix.pop(0)
+            fixed = await run_fix(result, cwd, settings)
+            if cache is not None:
+                # The fix rewrote inputs, so later results need fresh keys
+                cache.invalidate()
+            finish(StepResult(step, fixed.status, fixed.duration, fixed.output, attempts, False))
+            stopped = _blocks(results[step.id])
+            continue
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            step = running.pop(task)
+            result, attempts = task.result()
+            if result.status == FAILED and step.fix:
+                to_fix.append((step, result, attempts))
+                continue
+            finish(StepResult(step, result.status, result.duration, result.output, attempts,
+                              result.cached))
+            stopped = stopped or _blocks(results[step.id])
+
+    if running:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for task, step in running.items():
+            if task.cancelled():
+                # Cancelled before its first step, so it never produced a result
+                finish(StepResult(step, CANCELLED, 0.0, "", 0, False))
+            else:
+                result, attempts = task.result()
+                finish(StepResult(step, result.status, result.duration, result.output,
+                                  attempts, result.cached))
+    for step, result, attempts in to_fix:
+        finish(StepResult(step, result.status, result.duration, result.output, attempts,
+                          result.cached))
+    for step in pending:
+        finish(StepResult(step, CANCELLED, 0.0, "", 0, False))
+
+    ordered = [results[step.id] for step in workflow.steps]
+    return WorkflowReport(
+        workflow=workflow,
+        passed=not any(_blocks(result) for result in ordered),
+        results=ordered,
+        wall_time=time.perf_counter() - started,
+        critical_path=_critical_path(workflow, results),
+        total_time=sum(result.duration for result in ordered),
+    )
+
+
+def run_workflow(workflow, context, concurrency=None, cwd=None, on_result=None, cache=None,
+                 settings=None):
+    """Synchronous wrapper around run_workflow_async"""
+    if sys.platform == "win32" and sys.version_info < (3, 8):
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    return asyncio.run(run_workflow_async(workflow, context, concurrency, cwd, on_result, cache,
+                                          settings))
+
+
+def failures(report):
+    """Results of required steps that failed, timed out or errored"""
+    return [result for result in report.results if _blocks(result)]
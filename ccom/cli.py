@@ -2,15 +2,51 @@
 """
 Enhanced CCOM CLI v0.3 - Vibe Coder Interface
 Advanced natural language processing and enterprise automation
+
+The orchestrator and its agents are imported and constructed only once a
+command needs them: help, --init and --dry-run return without loading
+them, and the orchestrator itself reads memory on first use.
+
+When the project's daemon is running (ccom daemon start, see
+cco.daemon), --status, --memory, --remember and natural language
+commands run in its already loaded orchestrator instead.
 """
 
 import sys
-import argparse
-from pathlib import Path
-from orchestrator import CCOMOrchestrator
+import time
+
+from cco.util import configure_console
+
+# (flags, argparse keywords) of every option; create_enhanced_cli builds
+# the parser from this table and fast_parse reads its on/off switches
+OPTIONS = [
+    # Traditional commands
+    (('--status',), {'action': 'store_true', 'help': 'Show CCOM and project status'}),
+    (('--memory',), {'action': 'store_true', 'help': 'Show memory contents'}),
+    (('--stats',), {'action': 'store_true', 'help': 'Show memory statistics'}),
+    (('--remember',), {'type': str, 'help': 'Remember a feature: --remember "auth system"'}),
+    (('--init',), {'action': 'store_true', 'help': 'Initialize CCOM in current directory'}),
+    (('--import-advisories',), {'metavar': 'FILE',
+                                'help': 'Import an advisory snapshot for offline dependency audits'}),
+    (('--workflow',), {'metavar': 'NAME',
+                       'help': 'Run a workflow from .claude/workflows (or deploy, quality, security)'}),
+    (('--workflows',), {'action': 'store_true', 'help': 'List the workflows --workflow can run'}),
+    (('--force',), {'action': 'store_true',
+                    'help': 'Force refresh CCOM configuration even if v0.3 exists'}),
+
+    # Advanced options
+    (('--verbose', '-v'), {'action': 'store_true', 'help': 'Verbose output for debugging'}),
+    (('--dry-run',), {'action': 'store_true', 'help': 'Show what would be done without executing'}),
+    (('--reprobe',), {'action': 'store_true',
+                      'help': 'Re-probe Claude Code integration methods instead of using the cache'}),
+    (('--trace',), {'action': 'store_true',
+                    'help': 'Write a Chrome trace of this run to .claude/traces/'}),
+]
 
 def create_enhanced_cli():
     """Create enhanced CLI with natural language support"""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="CCOM v0.3 - Claude Code Orchestrator and Memory",
         epilog="Natural language examples: 'deploy my app', 'check security', 'quality audit'",
@@ -21,47 +57,128 @@ def create_enhanced_cli():
     parser.add_argument('command', nargs='*',
                        help='Natural language command or traditional command')
 
-    # Traditional commands
-    parser.add_argument('--status', action='store_true',
-                       help='Show CCOM and project status')
-    parser.add_argument('--memory', action='store_true',
-                       help='Show memory contents')
-    parser.add_argument('--stats', action='store_true',
-                       help='Show memory statistics')
-    parser.add_argument('--remember', type=str,
-                       help='Remember a feature: --remember "auth system"')
-    parser.add_argument('--init', action='store_true',
-                       help='Initialize CCOM in current directory')
-    parser.add_argument('--force', action='store_true',
-                       help='Force refresh CCOM configuration even if v0.3 exists')
-
-    # Advanced options
-    parser.add_argument('--verbose', '-v', action='store_true',
-                       help='Verbose output for debugging')
-    parser.add_argument('--dry-run', action='store_true',
-                       help='Show what would be done without executing')
+    for flags, options in OPTIONS:
+        parser.add_argument(*flags, **options)
 
     return parser
 
-def handle_traditional_commands(args, orchestrator):
+def fast_parse(argv):
+    """Arguments for a line of only words and on/off switches, else None for argparse
+
+    Covers the common "ccom --status" and "ccom deploy my app [--dry-run]"
+    lines without importing argparse; options taking a value, --help and
+    anything unknown or abbreviated go through create_enhanced_cli.
+    """
+    from types import SimpleNamespace
+
+    args = SimpleNamespace(command=[])
+    switches = {}
+    for flags, options in OPTIONS:
+        dest = flags[0].lstrip('-').replace('-', '_')
+        setattr(args, dest, False if options.get('action') == 'store_true' else None)
+        if options.get('action') == 'store_true':
+            switches.update(dict.fromkeys(flags, dest))
+    for position, word in enumerate(argv):
+        if not word.startswith('-'):
+            if args.command and argv[position - 1].startswith('-'):
+                return None  # argparse takes the words as one run
+            args.command.append(word)
+        elif word in switches:
+            setattr(args, switches[word], True)
+        else:
+            return None
+    return args
+
+def handle_traditional_commands(args, get_orchestrator):
     """Handle traditional flag-based commands"""
     if args.status:
-        orchestrator.show_status()
+        get_orchestrator().show_status()
         return True
     elif args.memory:
-        orchestrator.show_memory()
+        get_orchestrator().show_memory()
         return True
     elif args.remember:
-        orchestrator.handle_memory_command(f"remember {args.remember}")
+        get_orchestrator().handle_memory_command(f"remember {args.remember}")
         return True
     elif args.init:
         init_ccom_project(force=args.force)
         return True
+    elif args.import_advisories:
+        get_orchestrator().import_advisories(args.import_advisories)
+        return True
+    elif args.workflows:
+        get_orchestrator().list_workflows()
+        return True
+    elif args.workflow:
+        if args.dry_run:
+            print(f"🧪 Dry run: Would run workflow '{args.workflow}'")
+        else:
+            get_orchestrator().run_workflow(args.workflow)
+        return True
 
     return False
 
+def serve_from_daemon(args):
+    """Run the command in the project's daemon if one serves it, returns whether it did
+
+    Tracing, dry runs, verbose output, re-probing and the setup commands
+    always run in this process.
+    """
+    if any((args.trace, args.dry_run, args.verbose, args.reprobe, args.init, args.import_advisories)):
+        return False
+    if args.status:
+        method, params = "orchestrator.status", {}
+    elif args.memory:
+        method, params = "orchestrator.memory", {}
+    elif args.remember:
+        method, params = "orchestrator.remember", {"name": args.remember}
+    elif args.command:
+        method, params = "orchestrator.run", {"text": " ".join(args.command)}
+    else:
+        return False
+    from cco.daemon_client import run_in_daemon
+    return run_in_daemon(method, params) is not None
+
+def orchestrator_loader():
+    """Function returning the orchestrator, importing and constructing it on first call"""
+    loaded = []
+
+    def get_orchestrator():
+        if not loaded:
+            from cco.tracing import span
+            with span("load orchestrator", "cli"):
+                from orchestrator import CCOMOrchestrator
+                loaded.append(CCOMOrchestrator())
+        return loaded[0]
+    return get_orchestrator
+
+def trace_label(args):
+    """Short name for a traced run: the command text or the flag used"""
+    if args.command:
+        return " ".join(args.command)
+    if args.workflow:
+        return f"workflow {args.workflow}"
+    for flag in ("status", "memory", "remember", "init", "import_advisories", "workflows",
+                 "reprobe"):
+        if getattr(args, flag, None):
+            return flag.replace("_", "-")
+    return "ccom"
+
+def finish_trace(args, started):
+    """Close the root span and save the trace collected with --trace"""
+    from pathlib import Path
+    from cco.tracing import record, stop_tracing, write_trace
+
+    label = trace_label(args)
+    record(f"ccom {label}", "cli", started, time.perf_counter())
+    tracer = stop_tracing()
+    path = write_trace(Path.cwd() / ".claude", label, tracer)
+    print(f"🧭 Trace written to {path} (open in about://tracing or ui.perfetto.dev)")
+
 def init_ccom_project(force=False):
     """Initialize CCOM v0.3 in current project"""
+    from pathlib import Path
+
     print("🚀 Initializing CCOM v0.3 in current project...")
 
     current_dir = Path.cwd()
@@ -118,6 +235,7 @@ def init_ccom_project(force=False):
         print("✅ Created CLAUDE.md v0.3 configuration")
 
     # Initialize memory
+    from orchestrator import CCOMOrchestrator
     orchestrator = CCOMOrchestrator()
     orchestrator.save_memory()
     print("✅ Initialized memory system")
@@ -306,6 +424,11 @@ TRADITIONAL COMMANDS:
   ccom --memory                     → Show remembered features
   ccom --remember "feature name"    → Add feature to memory
   ccom --init                       → Initialize/refresh CCOM in project
+  ccom --reprobe                    → Re-detect Claude Code integration methods
+  ccom --import-advisories FILE     → Load advisories for offline dependency audits
+  ccom --workflow NAME              → Run a workflow from .claude/workflows/NAME.json
+  ccom --workflows                  → List workflows (deploy, quality, security built in)
+  ccom "deploy" --trace             → Save a timing trace to .claude/traces/
 
 EXAMPLES:
   ccom "deploy"                     → Quick deployment
@@ -327,20 +450,36 @@ For more info: https://github.com/your-repo/ccom
 
 def main():
     """Enhanced main CLI entry point"""
-    parser = create_enhanced_cli()
+    configure_console()
 
     # Handle no arguments
     if len(sys.argv) == 1:
         show_help()
         return
 
-    args = parser.parse_args()
+    args = fast_parse(sys.argv[1:]) or create_enhanced_cli().parse_args()
+
+    started = time.perf_counter()
+    if args.trace:
+        from cco.tracing import start_tracing
+        start_tracing()
 
     try:
-        orchestrator = CCOMOrchestrator()
+        get_orchestrator = orchestrator_loader()
+
+        if args.reprobe:
+            get_orchestrator().probe_cache.clear()
+            print("🔄 Integration probe cache cleared - methods will be re-probed")
+            if not args.command and not any((args.status, args.memory, args.remember, args.init,
+                                                 args.import_advisories, args.workflow,
+                                                 args.workflows)):
+                return
+
+        if serve_from_daemon(args):
+            return
 
         # Handle traditional commands first
-        if handle_traditional_commands(args, orchestrator):
+        if handle_traditional_commands(args, get_orchestrator):
             return
 
         # Handle natural language commands
@@ -354,7 +493,7 @@ def main():
                 print(f"🧪 Dry run: Would execute '{command_text}'")
                 return
 
-            orchestrator.handle_natural_language(command_text)
+            get_orchestrator().handle_natural_language(command_text)
         else:
             print("❓ No command provided. Use 'ccom --help' for usage.")
 
@@ -365,6 +504,9 @@ def main():
         if args.verbose:
             import traceback
             traceback.print_exc()
+    finally:
+        if args.trace:
+            finish_trace(args, started)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,39 +2,113 @@
 """
 CCOM Orchestrator v0.3 - Claude Code Integration Layer
 Provides orchestration capabilities that Claude Code lacks
+
+Status and memory commands only read memory, so the workflow engine
+and gate runner (asyncio), scanner (process pool), advisory, trigger
+and cache modules are imported by the methods that use them, and
+memory, the manifest, the caches and the runner settings are created on
+first use. pathlib and datetime are deferred the same way: --status
+needs neither.
 """
 
 import os
 import sys
 import json
-import subprocess
-from pathlib import Path
-from datetime import datetime
 
-# Handle Windows console encoding
-if sys.platform == "win32":
-    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
-    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+from cco.config import load_config
+from cco.journal import apply_record, set_op
+from cco.store import open_store
+from cco.tracing import annotate, span, traced
+from cco.util import configure_console
+
+ADVISORY_INDEX = "advisories.json"
+# (package.json script, command) validate_deployment_readiness runs
+READINESS_SCRIPTS = (("build", "npm run build"), ("test", "npm test"))
 
 class CCOMOrchestrator:
     """Core orchestration engine for CCOM + Claude Code integration"""
 
     def __init__(self):
-        self.project_root = Path.cwd()
-        self.claude_dir = self.project_root / ".claude"
-        self.ccom_dir = self.project_root / ".claude"
-        self.memory = self.load_memory()
+        self.root = os.getcwd()
+        self._project_root = None
+        self.memory_store = open_store(os.path.join(self.root, ".claude"))
+        self._memory = None
+        self.config = load_config(os.path.join(self.root, ".claude"))
+        self._manifest = None
+        self.gates_passed = False
+        self._runner_settings = None
+        self._gate_cache = None
+        self._probe_cache = None
+
+    @property
+    def project_root(self):
+        """Project directory (the working directory) as a Path"""
+        if self._project_root is None:
+            from pathlib import Path
+            self._project_root = Path(self.root)
+        return self._project_root
+
+    @property
+    def claude_dir(self):
+        return self.project_root / ".claude"
+
+    ccom_dir = claude_dir
+
+    @property
+    def manifest(self):
+        """package.json of the project, read on first use"""
+        if self._manifest is None:
+            from cco.manifest import ProjectManifest
+            self._manifest = ProjectManifest(self.root)
+        return self._manifest
+
+    @property
+    def runner_settings(self):
+        """Gate runner settings from the runner section of the config"""
+        if self._runner_settings is None:
+            from cco.runner import runner_settings
+            self._runner_settings = runner_settings(self.config.get("runner"),
+                                                    self.claude_dir / "logs")
+        return self._runner_settings
+
+    @property
+    def gate_cache(self):
+        """Gate result cache, or None when gate_cache.enabled is false"""
+        if self._gate_cache is None and self.config.get("gate_cache", {}).get("enabled", True):
+            from cco.gate_cache import GateCache
+            self._gate_cache = GateCache(self.project_root)
+        return self._gate_cache
+
+    @property
+    def probe_cache(self):
+        """Cache of integration probe results"""
+        if self._probe_cache is None:
+            from cco.probe import ProbeCache
+            self._probe_cache = ProbeCache(self.claude_dir,
+                                           self.config.get("probe", {}).get("ttl_hours"))
+        return self._probe_cache
+
+    @property
+    def memory(self):
+        """Project memory, read from the active backend on first use"""
+        if self._memory is None:
+            self._memory = self.load_memory()
+        return self._memory
+
+    @memory.setter
+    def memory(self, value):
+        self._memory = value
 
     def load_memory(self):
-        """Load existing CCOM memory"""
-        memory_file = self.ccom_dir / "memory.json"
-        if memory_file.exists():
-            with open(memory_file) as f:
-                return json.load(f)
+        """Load existing CCOM memory from the active backend"""
+        if self.memory_store.open():
+            return self.memory_store.memory
         return self.create_empty_memory()
 
     def create_empty_memory(self):
         """Create empty memory structure"""
+        from datetime import datetime
+
         return {
             "project": {
                 "name": self.project_root.name,
@@ -49,14 +123,21 @@ class CCOMOrchestrator:
         }
 
     def save_memory(self):
-        """Save memory to file"""
+        """Save a full memory snapshot to file"""
         try:
-            memory_file = self.ccom_dir / "memory.json"
-            self.ccom_dir.mkdir(exist_ok=True)
-
-            with open(memory_file, 'w') as f:
-                json.dump(self.memory, f, indent=2)
+            return self.memory_store.snapshot(self.memory)
+        except Exception as e:
+            print(f"⚠️  Could not save memory: {e}")
+            return False
 
+    def journal_memory_change(self, path, value):
+        """Persist a single memory change by appending it to the journal"""
+        try:
+            if not self.memory_store.open():
+                self.memory = apply_record(self.memory, set_op(path, value))
+                return self.save_memory()
+            self.memory_store.set(path, value)
+            self.memory = self.memory_store.memory
             return True
         except Exception as e:
             print(f"⚠️  Could not save memory: {e}")
@@ -88,47 +169,273 @@ class CCOMOrchestrator:
             print(f"❓ Unknown command. Try: deploy, quality, security, or memory commands")
             return False
 
+    @traced("deploy")
     def deploy_sequence(self):
-        """Full enterprise deployment sequence"""
+        """Full enterprise deployment sequence: the deploy workflow"""
         print("🚀 Starting enterprise deployment sequence...")
 
-        # Step 1: Quality check via Claude Code subagent
-        print("Step 1: Running quality checks...")
-        quality_result = self.invoke_subagent("quality-enforcer")
-
-        if not quality_result:
-            print("❌ Deployment blocked - quality issues found")
+        # Quality, security, build and test checks run concurrently, then the deployment
+        if self.run_workflow("deploy"):
+            print("🎉 Enterprise deployment complete!")
+            return True
+        else:
+            print("❌ Deployment failed")
             return False
 
-        # Step 2: Basic security check
-        print("Step 2: Running security scan...")
-        security_result = self.run_security_check()
+    def workflow_context(self):
+        """Actions, conditions and evaluators workflow steps can name (see cco.workflow)"""
+        from cco.workflow import WorkflowContext
 
-        if not security_result:
-            print("❌ Deployment blocked - security issues found")
+        return WorkflowContext(
+            actions={
+                "offline-audit": lambda needs: not self.offline_audit(),
+                "code-scan": lambda needs: self.code_security_gate(),
+                "security-check": lambda needs: self.run_security_check(),
+                "deploy": self.deploy_after_checks,
+            },
+            conditions={
+                "package-json": lambda: self.manifest.exists,
+                "offline-audit": self.use_offline_audit,
+                "build-script": self.has_build_script,
+                "test-script": self.has_test_script,
+                "subagents": self.subagents_available,
+            },
+            evaluators={"npm-audit": self.audit_passed},
+            subagent=self.invoke_subagent,
+        )
+
+    def subagents_available(self):
+        """Whether to hand checks to subagents: yes unless a cached probe found no integration
+
+        Without a probe result the subagents are tried, which probes and
+        records what works for the next run.
+        """
+        methods = self.probe_cache.methods()
+        return methods is None or any(methods.values())
+
+    @traced("workflow")
+    def run_workflow(self, name):
+        """Run a workflow from .claude/workflows or a built-in one; False if a required step failed"""
+        from cco.workflow import WorkflowError, failures, load_workflow, run_workflow
+
+        try:
+            workflow = load_workflow(self.claude_dir, name)
+        except WorkflowError as e:
+            print(f"❌ {e}")
+            return False
+        annotate(workflow=name, steps=len(workflow.steps))
+        # runner.timeouts overrides step timeouts by step id
+        workflow = workflow._replace(steps=tuple(
+            step._replace(timeout=self.gate_timeout(step.id, step.timeout))
+            for step in workflow.steps))
+        if self.gate_cache is not None:
+            # Hash inputs up front, before any step can touch the tree
+            for step in workflow.steps:
+                if step.cache:
+                    self.gate_cache.inputs_digest(step.inputs or None)
+
+        concurrency = self.config.get("workflows", {}).get("concurrency") or \
+            self.config.get("gates", {}).get("concurrency")
+        try:
+            report = run_workflow(workflow, self.workflow_context(), concurrency=concurrency,
+                                  cwd=str(self.project_root), on_result=self.print_step_result,
+                                  cache=self.gate_cache, settings=self.runner_settings)
+        except WorkflowError as e:
+            print(f"❌ {e}")
             return False
+        print(f"⏱️  Workflow {name} took {report.wall_time:.1f}s "
+              f"(critical path {report.critical_path:.1f}s, {report.total_time:.1f}s in sequence)")
 
-        # Step 3: Deploy via deployment specialist
-        print("Step 3: Coordinating deployment...")
-        deploy_result = self.invoke_subagent("deployment-specialist")
+        failed = failures(report)
+        if failed:
+            labels = ", ".join(result.step.label.lower() for result in failed)
+            print(f"❌ Workflow {name} stopped - {labels} failed")
+            return False
+        return True
 
-        if deploy_result:
-            print("🎉 Enterprise deployment complete!")
-            return True
+    def list_workflows(self):
+        """Show the workflows ccom --workflow can run"""
+        from cco.workflow import BUILTIN, WorkflowError, available_workflows, load_workflow
+
+        print("\n🔀 CCOM Workflows")
+        print("=" * 40)
+        for name, source in available_workflows(self.claude_dir).items():
+            try:
+                workflow = load_workflow(self.claude_dir, name)
+            except WorkflowError as e:
+                print(f"❌ {e}")
+                continue
+            origin = "" if source == BUILTIN else f" ({os.path.relpath(source, self.project_root)})"
+            count = len(workflow.steps)
+            print(f"• {name}{origin}: {count} step{'' if count == 1 else 's'}")
+            if workflow.description:
+                print(f"  {workflow.description}")
+        print("=" * 40)
+        return True
+
+    def deploy_after_checks(self, needs):
+        """Deploy workflow step: hand over to the deployment specialist
+
+        The specialist's fallback skips its own build and test run only when
+        this step needs steps that ran the project's build and test scripts
+        and passed; a workflow leaving them out, or letting them fail, still
+        gets the readiness check.
+        """
+        from cco.workflow import FIXED, PASSED
+
+        passed = {result.step.run for result in needs.values()
+                  if result.status in (PASSED, FIXED)}
+        self.gates_passed = all(command in passed
+                                for script, command in READINESS_SCRIPTS
+                                if self.manifest.has_script(script))
+        try:
+            return self.invoke_subagent("deployment-specialist")
+        finally:
+            # A daemon's orchestrator outlives this run
+            self.gates_passed = False
+
+    @traced()
+    def run_gate_command(self, name, command, timeout, outputs=None):
+        """Run a gate's shell command, reusing the cached result when its inputs are unchanged
+
+        outputs are directories the command writes; the cached result is
+        only reused while they are as the last run left them.
+        """
+        import subprocess
+
+        if self.gate_cache is not None:
+            entry = self.gate_cache.lookup(name, command, outputs=outputs)
+            if entry is not None:
+                annotate(gate=name, cached=True)
+                print(f"⚡ {command}: inputs unchanged - reusing last result")
+                return subprocess.CompletedProcess(command, entry["returncode"],
+                                                   entry["stdout"], entry["stderr"])
+        result = self.run_command(name, command, timeout)
+        if self.gate_cache is not None:
+            self.gate_cache.store(name, command, result.returncode, result.stdout,
+                                  result.stderr, result.duration, outputs=outputs)
+        return result
+
+    def run_command(self, name, command, timeout, keep_stdout=False, echo=None):
+        """Run a gate command with streamed output, logged to .claude/logs/<name>.log"""
+        from cco.runner import run_streaming
+
+        return run_streaming(command, name, self.gate_timeout(name, timeout),
+                             cwd=str(self.project_root), settings=self.runner_settings,
+                             keep_stdout=keep_stdout, echo=echo)
+
+    def gate_timeout(self, name, default):
+        """Timeout for a gate, overridable with runner.timeouts in .claude/config.json"""
+        return self.config.get("runner", {}).get("timeouts", {}).get(name, default)
+
+    def print_step_result(self, result):
+        """Report one finished workflow step"""
+        from cco.gates import output_tail
+        from cco.workflow import CANCELLED, FIXED, PASSED
+
+        label = result.step.label
+        if result.cached:
+            print(f"⚡ {label} inputs unchanged - reusing last result")
+        if result.attempts > 1:
+            label = f"{label} (attempt {result.attempts})"
+        if result.status == PASSED:
+            print(f"✅ {label} passed ({result.duration:.1f}s)")
+        elif result.status == FIXED:
+            print(f"✅ {label} issues fixed automatically ({result.duration:.1f}s)")
+        elif result.status == CANCELLED:
+            print(f"⏹️  {label} cancelled")
+        elif not result.step.required:
+            print(f"⚠️  {label} {result.status} - proceeding with caution")
         else:
-            print("❌ Deployment failed")
+            print(f"❌ {label} {result.status} ({result.duration:.1f}s)")
+            if result.output.strip():
+                print(output_tail(result.output))
+
+    @staticmethod
+    def audit_passed(returncode, output):
+        """npm audit gate check: no high or critical vulnerabilities"""
+        try:
+            vulnerabilities = json.loads(output).get('vulnerabilities', {})
+        except (ValueError, AttributeError):
+            print("⚠️  Dependency scan error: unreadable npm audit output")
+            return True
+        high_critical = sum(1 for v in vulnerabilities.values()
+                            if v.get('severity') in ['high', 'critical'])
+        if high_critical:
+            print(f"🚨 {high_critical} high/critical vulnerabilities found")
+        return high_critical == 0
+
+    def use_offline_audit(self):
+        """Whether to audit dependencies against the local advisory index instead of npm audit
+
+        audit.offline in .claude/config.json: "auto" (default) uses the index
+        when both it and package-lock.json exist; true or false forces it.
+        """
+        setting = self.config.get("audit", {}).get("offline", "auto")
+        if setting == "auto":
+            return (self.claude_dir / ADVISORY_INDEX).exists() and \
+                self.manifest.lockfile is not None
+        return bool(setting)
+
+    @traced("offline audit")
+    def offline_audit(self):
+        """Match package-lock.json against the advisory index; returns the high/critical count"""
+        from cco.advisories import AdvisoryIndex, audit_packages, high_critical_count
+
+        try:
+            index = AdvisoryIndex(self.claude_dir / ADVISORY_INDEX)
+            report = audit_packages(index, self.manifest.lock_packages())
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Dependency scan error: {e}")
+            return 0
+
+        annotate(packages=report.packages_checked, advisories=report.advisories,
+                 vulnerable=len(report.vulnerabilities))
+        print(f"🔍 Checked {report.packages_checked} packages against {report.advisories} "
+              f"advisories offline in {report.duration * 1000:.0f}ms")
+        for name, entry in sorted(report.vulnerabilities.items()):
+            if entry["severity"] in ("high", "critical"):
+                titles = "; ".join(a["title"] for a in entry["advisories"][:2] if a["title"])
+                print(f"🚨 {name}@{', '.join(entry['versions'])} ({entry['severity']}): {titles}")
+        high_critical = high_critical_count(report)
+        if not report.vulnerabilities:
+            print("✅ No known vulnerabilities in dependencies")
+        return high_critical
+
+    def import_advisories(self, snapshot_path):
+        """Build the offline advisory index from a snapshot file"""
+        from cco.advisories import import_snapshot
+
+        try:
+            count, packages, skipped = import_snapshot(snapshot_path,
+                                                       self.claude_dir / ADVISORY_INDEX)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not import advisories: {e}")
             return False
+        print(f"✅ Imported {count} advisories for {packages} packages")
+        if skipped:
+            print(f"⚠️  Skipped {skipped} records without a package, severity or valid range")
+        return True
 
+    def code_security_gate(self):
+        """Source and configuration security checks (advisory, never blocks)"""
+        self.scan_for_security_issues()
+        self.check_security_configuration()
+        return True
+
+    @traced("quality")
     def quality_sequence(self):
-        """Run quality checks and fixes"""
+        """Run quality checks and fixes: the quality workflow"""
         print("🔧 Running quality analysis and fixes...")
-        return self.invoke_subagent("quality-enforcer")
+        return self.run_workflow("quality")
 
+    @traced("security")
     def security_sequence(self):
-        """Run security checks"""
+        """Run security checks: the security workflow"""
         print("🔒 Running security scan...")
-        return self.run_security_check()
+        return self.run_workflow("security")
 
+    @traced("invoke_subagent")
     def invoke_subagent(self, agent_name):
         """
         Invoke Claude Code subagent - Testing multiple integration methods
@@ -140,56 +447,85 @@ class CCOMOrchestrator:
             return False
 
         print(f"🤖 Invoking Claude Code subagent: {agent_name}")
+        annotate(agent=agent_name)
+
+        # Skip integration methods a previous probe found unavailable
+        cached = self.probe_cache.methods()
+        if cached is not None and not any(cached.values()):
+            annotate(probe="cached")
+            print("⚡ Cached probe: no Claude Code integration available (refresh with --reprobe)")
+            return self.invoke_subagent_fallback(agent_name)
+
+        outcomes = {}
+        for key, description, attempt in self.integration_methods(agent_name, agent_file):
+            if cached is not None and not cached.get(key):
+                continue
+            if description:
+                print(description)
+            with span(f"probe {key}", "probe") as probe_span:
+                try:
+                    result = attempt()
+                except Exception as e:
+                    print(f"⚠️  {key} method failed: {e}")
+                    result = None
+                probe_span.set(available=bool(result))
+            outcomes[key] = bool(result)
+            if result:
+                self.probe_cache.record(outcomes)
+                return result
+
+        self.probe_cache.record(outcomes)
 
-        # Method 1: Test if we can use Task tool to invoke agent
-        print("🔍 Testing Method 1: Task tool integration...")
-        try:
-            # This would be the ideal integration - using Claude Code's Task tool
-            # to invoke subagents programmatically
-            task_result = self.test_task_tool_integration(agent_name)
-            if task_result:
-                return task_result
-        except Exception as e:
-            print(f"⚠️  Task tool method failed: {e}")
+        # Fallback: Use manual implementation
+        print("🔄 All Claude Code integration methods failed - using CCOM fallback")
+        return self.invoke_subagent_fallback(agent_name)
+
+    def integration_methods(self, agent_name, agent_file):
+        """(cache key, description, attempt) for each Claude Code integration method, in order"""
+        # Method 1: Task tool integration - the ideal integration, using
+        # Claude Code's Task tool to invoke subagents programmatically
+        methods = [("task_tool", "🔍 Testing Method 1: Task tool integration...",
+                    lambda: self.test_task_tool_integration(agent_name))]
 
-        # Method 2: Test direct Claude Code CLI variations
-        print("🔍 Testing Method 2: Claude Code CLI variations...")
+        # Method 2: Direct Claude Code CLI variations
         cli_methods = [
             ["claude-code", "--agent", str(agent_file)],
             ["claude", "code", "--agent", str(agent_file)],
             ["claude-code", "invoke", str(agent_file)],
             ["claude-code", "--subagent", agent_name],
         ]
-
-        for method in cli_methods:
-            try:
-                result = subprocess.run(method, capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    print("✅ Claude Code CLI method successful!")
-                    print(f"Command: {' '.join(method)}")
-                    print(f"Output: {result.stdout}")
-                    return True
-                else:
-                    print(f"❌ CLI method failed: {' '.join(method)}")
-                    if result.stderr:
-                        print(f"   Error: {result.stderr}")
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                continue
-            except Exception as e:
-                print(f"   Exception: {e}")
-
-        # Method 3: Test if we can trigger agent via file system interaction
-        print("🔍 Testing Method 3: File system trigger...")
+        for i, method in enumerate(cli_methods):
+            description = "🔍 Testing Method 2: Claude Code CLI variations..." if i == 0 else None
+            methods.append((f"cli:{' '.join(method[:2])}", description,
+                            lambda method=method: self.test_cli_method(method)))
+
+        # Method 3: Trigger the agent via file system interaction
+        methods.append(("file_trigger", "🔍 Testing Method 3: File system trigger...",
+                        lambda: self.test_file_trigger_method(agent_name)))
+        return methods
+
+    @traced("probe cli")
+    def test_cli_method(self, method):
+        """Try one Claude Code CLI invocation; None when the CLI is unavailable"""
+        import subprocess
+
+        annotate(command=" ".join(method))
         try:
-            trigger_result = self.test_file_trigger_method(agent_name)
-            if trigger_result:
-                return trigger_result
+            result = subprocess.run(method, capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                print("✅ Claude Code CLI method successful!")
+                print(f"Command: {' '.join(method)}")
+                print(f"Output: {result.stdout}")
+                return True
+            else:
+                print(f"❌ CLI method failed: {' '.join(method)}")
+                if result.stderr:
+                    print(f"   Error: {result.stderr}")
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            return None
         except Exception as e:
-            print(f"⚠️  File trigger method failed: {e}")
-
-        # Fallback: Use manual implementation
-        print("🔄 All Claude Code integration methods failed - using CCOM fallback")
-        return self.invoke_subagent_fallback(agent_name)
+            print(f"   Exception: {e}")
+        return None
 
     def test_task_tool_integration(self, agent_name):
         """Test if we can use Claude Code's Task tool to invoke subagents"""
@@ -197,36 +533,24 @@ class CCOMOrchestrator:
         # Return None for now - would need actual Task tool access
         return None
 
+    @traced("probe file trigger")
     def test_file_trigger_method(self, agent_name):
         """Test if creating/modifying files can trigger agent execution"""
-        # Create a trigger file that might cause Claude Code to invoke the agent
-        trigger_file = self.claude_dir / f"trigger_{agent_name}.txt"
-        try:
-            with open(trigger_file, 'w') as f:
-                f.write(f"CCOM requesting {agent_name} execution at {datetime.now()}")
-
-            # Wait briefly to see if anything happens
-            import time
-            time.sleep(2)
-
-            # Check if any response files were created
-            response_file = self.claude_dir / f"response_{agent_name}.txt"
-            if response_file.exists():
-                with open(response_file) as f:
-                    response = f.read()
-                print(f"✅ File trigger successful: {response}")
-                # Clean up
-                trigger_file.unlink()
-                response_file.unlink()
-                return True
+        # Write a trigger file that might cause Claude Code to invoke the agent,
+        # and return as soon as a response file appears
+        from cco.trigger import DEFAULT_TIMEOUT as DEFAULT_TRIGGER_TIMEOUT, trigger_agents
 
+        timeout = self.config.get("trigger", {}).get("timeout_seconds", DEFAULT_TRIGGER_TIMEOUT)
+        try:
+            response = trigger_agents(self.claude_dir, [agent_name], timeout)[agent_name]
         except Exception as e:
             print(f"File trigger error: {e}")
+            return None
 
-        # Clean up trigger file
-        if trigger_file.exists():
-            trigger_file.unlink()
-
+        annotate(responded=response is not None)
+        if response is not None:
+            print(f"✅ File trigger successful: {response}")
+            return True
         return None
 
     def invoke_subagent_fallback(self, agent_name):
@@ -246,37 +570,35 @@ class CCOMOrchestrator:
             print(f"❌ No fallback available for {agent_name}")
             return False
 
+    @traced()
     def quality_enforcer_fallback(self):
         """Manual implementation of quality enforcement"""
+        import subprocess
+
         print("🔧 Running quality checks manually...")
 
         # Check if we have package.json with lint script
-        package_json = self.project_root / "package.json"
-        if package_json.exists():
+        if self.manifest.exists:
             try:
                 # Try running lint with shell=True for Windows compatibility
-                result = subprocess.run("npm run lint",
-                                      shell=True, capture_output=True, text=True, timeout=30)
+                result = self.run_gate_command("lint", "npm run lint", timeout=30)
 
                 if result.returncode == 0:
                     print("✅ Code quality: Enterprise grade")
                     return True
                 else:
                     print("🔧 Found quality issues, attempting auto-fix...")
-                    print(f"Lint output: {result.stdout}")
-                    if result.stderr:
-                        print(f"Lint errors: {result.stderr}")
 
                     # Try auto-fix
-                    fix_result = subprocess.run("npm run lint -- --fix",
-                                              shell=True, capture_output=True, text=True, timeout=30)
+                    fix_result = self.run_command("lint-fix", "npm run lint -- --fix", timeout=30)
+                    if self.gate_cache is not None:
+                        self.gate_cache.invalidate()
 
                     if fix_result.returncode == 0:
                         print("✅ Quality issues fixed automatically")
                         return True
                     else:
                         print("⚠️  Some quality issues need manual attention")
-                        print(f"Fix output: {fix_result.stdout}")
                         return False
 
             except subprocess.TimeoutExpired:
@@ -289,6 +611,7 @@ class CCOMOrchestrator:
             print("ℹ️  No package.json found - skipping lint checks")
             return True
 
+    @traced()
     def security_guardian_fallback(self):
         """Enhanced security scanning implementation"""
         print("🔒 Running comprehensive security audit...")
@@ -296,34 +619,53 @@ class CCOMOrchestrator:
         security_issues = []
 
         # 1. Dependency vulnerability scanning
-        try:
-            result = subprocess.run("npm audit --json",
-                                  shell=True, capture_output=True, text=True, timeout=30)
-
-            if result.returncode == 0:
-                audit_data = json.loads(result.stdout)
-                vulnerabilities = audit_data.get('vulnerabilities', {})
-
-                if vulnerabilities:
-                    high_critical = sum(1 for v in vulnerabilities.values()
-                                      if v.get('severity') in ['high', 'critical'])
-                    if high_critical > 0:
-                        security_issues.append(f"🚨 {high_critical} high/critical vulnerabilities found")
-                        print("🛠️  Attempting to fix vulnerabilities...")
-
-                        # Try auto-fix
-                        fix_result = subprocess.run("npm audit fix",
-                                                  shell=True, capture_output=True, text=True, timeout=60)
-                        if fix_result.returncode == 0:
-                            print("✅ Vulnerabilities automatically fixed")
-                        else:
-                            print("⚠️  Some vulnerabilities require manual attention")
-                            return False
+        if self.use_offline_audit():
+            high_critical = self.offline_audit()
+            if high_critical:
+                security_issues.append(f"🚨 {high_critical} high/critical vulnerabilities found")
+                print("⚠️  Some vulnerabilities require manual attention "
+                      "(npm audit fix needs the registry)")
+                return False
+        else:
+            try:
+                result = self.run_command("audit", "npm audit --json", timeout=30,
+                                          keep_stdout=True, echo=False)
+
+                # npm audit exits non-zero when it finds vulnerabilities, so read
+                # its report whatever the exit status; only a missing or
+                # unreadable report is an error
+                try:
+                    audit_data = json.loads(result.stdout)
+                except ValueError:
+                    audit_data = None
+                error = audit_data.get("error") if isinstance(audit_data, dict) else None
+                if not isinstance(audit_data, dict) or error:
+                    summary = error.get("summary") if isinstance(error, dict) else None
+                    if isinstance(audit_data, dict):
+                        summary = summary or audit_data.get("message")
+                    print(f"⚠️  Dependency scan error: {summary or 'unreadable npm audit output'}")
                 else:
-                    print("✅ No known vulnerabilities in dependencies")
+                    vulnerabilities = audit_data.get('vulnerabilities', {})
+
+                    if vulnerabilities:
+                        high_critical = sum(1 for v in vulnerabilities.values()
+                                          if v.get('severity') in ['high', 'critical'])
+                        if high_critical > 0:
+                            security_issues.append(f"🚨 {high_critical} high/critical vulnerabilities found")
+                            print("🛠️  Attempting to fix vulnerabilities...")
+
+                            # Try auto-fix
+                            fix_result = self.run_command("audit-fix", "npm audit fix", timeout=60)
+                            if fix_result.returncode == 0:
+                                print("✅ Vulnerabilities automatically fixed")
+                            else:
+                                print("⚠️  Some vulnerabilities require manual attention")
+                                return False
+                    else:
+                        print("✅ No known vulnerabilities in dependencies")
 
-        except Exception as e:
-            print(f"⚠️  Dependency scan error: {e}")
+            except Exception as e:
+                print(f"⚠️  Dependency scan error: {e}")
 
         # 2. Code security analysis
         self.scan_for_security_issues()
@@ -338,46 +680,47 @@ class CCOMOrchestrator:
             print("🚨 Security issues detected - securing your app...")
             return False
 
+    @traced("code scan")
     def scan_for_security_issues(self):
         """Scan source code for security anti-patterns"""
-        security_patterns = [
-            (r'password\s*=\s*["\'].*["\']', "Hardcoded password detected"),
-            (r'api[_-]?key\s*=\s*["\'].*["\']', "Hardcoded API key detected"),
-            (r'secret\s*=\s*["\'].*["\']', "Hardcoded secret detected"),
-            (r'eval\s*\(', "Dangerous eval() usage detected"),
-            (r'innerHTML\s*=', "Potential XSS vulnerability"),
-            (r'document\.write\s*\(', "Dangerous document.write usage"),
-        ]
+        from cco.scan_cache import ScanCache
+        from cco.scanner import SECURITY_RULES, scan_files, scan_limits
+        from cco.walker import walk_files
 
+        settings = self.config.get("scan") or {}
         try:
-            import re
-            for file_path in self.project_root.rglob("*.js"):
-                if "node_modules" in str(file_path):
-                    continue
-
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                for pattern, message in security_patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        print(f"⚠️  {message} in {file_path.name}")
+            with span("walk", "scanner") as walk_span:
+                # scan.use_git lists files with git ls-files, falling back to the walk
+                files = list(walk_files(self.project_root,
+                                        use_git=bool(settings.get("use_git", False))))
+                walk_span.set(files=len(files))
+
+            cache = ScanCache(self.project_root, SECURITY_RULES)
+            skipped = []
+            findings = scan_files(files, cache=cache, limits=scan_limits(settings),
+                                  skipped=skipped)
+            annotate(files=len(files), findings=len(findings), skipped=len(skipped),
+                     cache_hits=cache.hits)
+            if cache.hits:
+                print(f"⚡ Reused cached scan results for {cache.hits} unchanged files")
+            if skipped:
+                print(f"ℹ️  Skipped {len(skipped)} large, binary or minified files")
+            for finding in findings:
+                location = os.path.relpath(finding.path, self.root)
+                print(f"⚠️  {finding.message} in {location}:{finding.line}:{finding.column}")
+            return findings
 
         except Exception as e:
             print(f"ℹ️  Code security scan skipped: {e}")
+            return []
 
+    @traced("configuration check")
     def check_security_configuration(self):
         """Check for security configuration issues"""
-        package_json = self.project_root / "package.json"
-
-        if package_json.exists():
+        if self.manifest.exists:
             try:
-                with open(package_json) as f:
-                    data = json.load(f)
-
                 # Check for security-related dependencies
-                dependencies = data.get('dependencies', {})
-                dev_dependencies = data.get('devDependencies', {})
-                all_deps = {**dependencies, **dev_dependencies}
+                all_deps = self.manifest.all_dependencies
 
                 security_packages = ['helmet', 'express-rate-limit', 'cors', 'express-validator']
                 missing_security = [pkg for pkg in security_packages if pkg not in all_deps]
@@ -388,13 +731,16 @@ class CCOMOrchestrator:
             except Exception as e:
                 print(f"ℹ️  Configuration check skipped: {e}")
 
+    @traced()
     def deployment_specialist_fallback(self):
         """Enhanced deployment coordination"""
         print("🚀 Coordinating enterprise deployment...")
 
-        # 1. Pre-deployment validation
+        # 1. Pre-deployment validation (already covered when the deploy workflow ran)
         print("Step 1: Pre-deployment validation...")
-        if not self.validate_deployment_readiness():
+        if self.gates_passed:
+            print("✅ Build and tests already checked by the deploy workflow")
+        elif not self.validate_deployment_readiness():
             print("❌ Deployment validation failed")
             return False
 
@@ -414,13 +760,16 @@ class CCOMOrchestrator:
         self.record_successful_deployment()
         return True
 
+    @traced()
     def validate_deployment_readiness(self):
         """Validate that the application is ready for deployment"""
         try:
             # Check if build succeeds
             if self.has_build_script():
-                result = subprocess.run("npm run build",
-                                      shell=True, capture_output=True, text=True, timeout=120)
+                from cco.gate_cache import BUILD_OUTPUT_DIRS
+
+                result = self.run_gate_command("build", "npm run build", timeout=120,
+                                               outputs=BUILD_OUTPUT_DIRS)
                 if result.returncode != 0:
                     print("❌ Build failed")
                     return False
@@ -428,8 +777,7 @@ class CCOMOrchestrator:
 
             # Check if tests pass
             if self.has_test_script():
-                result = subprocess.run("npm test",
-                                      shell=True, capture_output=True, text=True, timeout=60)
+                result = self.run_gate_command("test", "npm test", timeout=60)
                 if result.returncode != 0:
                     print("⚠️  Some tests failed - proceeding with caution")
                 else:
@@ -441,17 +789,13 @@ class CCOMOrchestrator:
             print(f"⚠️  Validation error: {e}")
             return True  # Don't block deployment on validation errors
 
+    @traced()
     def execute_deployment(self):
         """Execute the actual deployment"""
         try:
-            package_json = self.project_root / "package.json"
-            if package_json.exists():
-                with open(package_json) as f:
-                    data = json.load(f)
-
-                if "deploy" in data.get("scripts", {}):
-                    result = subprocess.run("npm run deploy",
-                                          shell=True, capture_output=True, text=True, timeout=300)
+            if self.manifest.exists:
+                if "deploy" in self.manifest.scripts:
+                    result = self.run_command("deploy", "npm run deploy", timeout=300)
 
                     if result.returncode == 0:
                         print("✅ Deployment command executed successfully")
@@ -476,6 +820,7 @@ class CCOMOrchestrator:
             print(f"❌ Deployment error: {e}")
             return False
 
+    @traced()
     def verify_deployment(self):
         """Verify that the deployment was successful"""
         print("🔍 Running post-deployment health checks...")
@@ -500,30 +845,17 @@ class CCOMOrchestrator:
 
     def has_build_script(self):
         """Check if project has a build script"""
-        package_json = self.project_root / "package.json"
-        if package_json.exists():
-            try:
-                with open(package_json) as f:
-                    data = json.load(f)
-                return "build" in data.get("scripts", {})
-            except:
-                return False
-        return False
+        return self.manifest.has_script("build")
 
     def has_test_script(self):
         """Check if project has a test script"""
-        package_json = self.project_root / "package.json"
-        if package_json.exists():
-            try:
-                with open(package_json) as f:
-                    data = json.load(f)
-                return "test" in data.get("scripts", {})
-            except:
-                return False
-        return False
+        return self.manifest.has_script("test")
 
+    @traced()
     def record_successful_deployment(self):
         """Record deployment in memory for tracking"""
+        from datetime import datetime
+
         try:
             deployment_record = {
                 "timestamp": datetime.now().isoformat(),
@@ -532,16 +864,9 @@ class CCOMOrchestrator:
                 "security_checks": "passed"
             }
 
-            # Add to memory
-            if "deployments" not in self.memory:
-                self.memory["deployments"] = []
-
-            self.memory["deployments"].append(deployment_record)
-
             # Keep only last 10 deployments
-            self.memory["deployments"] = self.memory["deployments"][-10:]
-
-            self.save_memory()
+            deployments = self.memory.get("deployments", []) + [deployment_record]
+            self.journal_memory_change(("deployments",), deployments[-10:])
 
         except Exception as e:
             print(f"ℹ️  Could not record deployment: {e}")
@@ -550,21 +875,14 @@ class CCOMOrchestrator:
         """Run enhanced security checks via security-guardian"""
         return self.invoke_subagent("security-guardian")
 
+    @traced()
     def run_deployment(self):
         """Run basic deployment"""
         try:
             # Check if we have a deploy script
-            package_json = self.project_root / "package.json"
-            if package_json.exists():
-                with open(package_json) as f:
-                    data = json.load(f)
-
-                if "deploy" in data.get("scripts", {}):
-                    result = subprocess.run("npm run deploy",
-                                          shell=True, capture_output=True, text=True, timeout=120)
-                    print(f"Deploy output: {result.stdout}")
-                    if result.stderr:
-                        print(f"Deploy errors: {result.stderr}")
+            if self.manifest.exists:
+                if "deploy" in self.manifest.scripts:
+                    result = self.run_command("deploy", "npm run deploy", timeout=120)
                     return result.returncode == 0
                 else:
                     print("ℹ️  No deploy script found in package.json")
@@ -596,12 +914,11 @@ class CCOMOrchestrator:
         print(f"Version: {self.memory['metadata']['version']}")
 
         # Check Claude Code integration
-        agents_dir = self.claude_dir / "agents"
-        if agents_dir.exists():
-            agent_count = len(list(agents_dir.glob("*.md")))
-            print(f"Claude Code Agents: {agent_count}")
-        else:
-            print("Claude Code Agents: 0")
+        try:
+            agents = os.listdir(os.path.join(self.root, ".claude", "agents"))
+        except OSError:
+            agents = []
+        print(f"Claude Code Agents: {sum(1 for name in agents if name.endswith('.md'))}")
 
         print("=" * 40)
         return True
@@ -632,6 +949,7 @@ def main():
         print("  python orchestrator.py 'status'")
         return
 
+    configure_console()
     command = " ".join(sys.argv[1:])
     orchestrator = CCOMOrchestrator()
     orchestrator.handle_natural_language(command)